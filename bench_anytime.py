@@ -0,0 +1,121 @@
+"""
+Benchmark: deadline-bounded (anytime) grounding vs running to the end.
+
+Grounds the Notepad icon on synthetic desktops with locate_notepad, first
+without a budget (strategies in the adaptive order until one finds the
+icon), then with each --budgets deadline (cheapest strategies first, best
+candidate when time runs out). Reports the hit rate, median and worst
+latency, mean confidence and the strategies skipped for lack of time.
+A second pass repeats find_notepad_icon on an unchanged desktop with
+--repeat-budget (the whole call, capture included): after the first
+confirmed detection the cached position answers within it. Exits non-zero if a budgeted call overruns its
+deadline by more than --slack.
+
+Usage:
+    python bench_anytime.py [--frames 12] [--icons 60] [--budgets 10 30 100 300] [--slack 20]
+                            [--repeat-budget 30]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+import numpy as np
+from PIL import Image
+
+import config
+from icon_grounding import GroundingFrame, IconGrounding
+from synthetic_desktop import render_desktop
+
+WALLPAPERS = ["gradient", "textured", "flat"]
+
+
+class ScreenSource:
+    """Bot stand-in returning the same desktop on every capture."""
+
+    def __init__(self, frame):
+        self.image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def get_screenshot(self):
+        return self.image
+
+
+def run(grounding, frames, budget, tolerance):
+    """(hits, latencies, confidences of hits, skipped strategy counts)."""
+    hits, latencies, confidences, skipped = 0, [], [], Counter()
+    for frame, center in frames:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = grounding.locate_notepad(frame, budget)
+        latencies.append(time.perf_counter() - started)
+        skipped.update(result.skipped)
+        if result.found and np.hypot(result.position[0] - center[0], result.position[1] - center[1]) <= tolerance:
+            hits += 1
+            confidences.append(result.confidence)
+    return hits, latencies, confidences, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anytime grounding benchmark")
+    parser.add_argument("--frames", type=int, default=12)
+    parser.add_argument("--icons", type=int, default=60)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[10, 30, 100, 300], help="ms")
+    parser.add_argument("--tolerance", type=float, default=12.0)
+    parser.add_argument("--slack", type=float, default=20.0, help="ms a budgeted call may overrun")
+    parser.add_argument("--repeat-budget", type=float, default=30.0, help="ms per repeated find_notepad_icon call")
+    args = parser.parse_args()
+
+    frames = []
+    for seed in range(args.frames):
+        frame, truth = render_desktop(seed=seed, n_icons=args.icons, wallpaper=WALLPAPERS[seed % len(WALLPAPERS)])
+        frames.append((GroundingFrame(frame), next(icon for icon in truth if icon.label == "Notepad").center))
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the run's statistics and harvested templates out of the project
+        config.STRATEGY_STATS_PATH = Path(tmp) / "strategy_stats.json"
+        config.TEMPLATE_CACHE_DIR = None
+        grounding = IconGrounding(bot=None)
+        run(grounding, frames, None, args.tolerance)  # warm-up: lazy imports and measured latencies
+
+        print("=" * 78)
+        print(f"{args.frames} frames, {args.icons} icons each")
+        print(f"{'budget':>8s} {'found':>7s} {'median ms':>10s} {'max ms':>8s} {'confidence':>11s}  skipped")
+        for budget in [None] + args.budgets:
+            seconds = budget / 1000 if budget is not None else None
+            hits, latencies, confidences, skipped = run(grounding, frames, seconds, args.tolerance)
+            worst = max(latencies) * 1000
+            if budget is not None and worst > budget + args.slack:
+                ok = False
+            label = "none" if budget is None else f"{budget:.0f} ms"
+            confidence = f"{np.mean(confidences):11.2f}" if confidences else f"{'-':>11s}"
+            names = ", ".join(f"{name} x{count}" for name, count in skipped.most_common(3)) or "-"
+            print(f"{label:>8s} {hits:3d}/{len(frames):<3d} {np.median(latencies) * 1000:10.1f} "
+                  f"{worst:8.1f} {confidence}  {names}")
+
+        # Unchanged desktop: the confirmed position answers the next calls
+        grounding = IconGrounding(ScreenSource(frames[0][0].image))
+        budget = args.repeat_budget / 1000
+        strategies = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(5):
+                grounding.find_notepad_icon(retry_attempts=1, retry_delay=0, budget=None if not strategies else budget)
+                strategies.append(grounding.last_result.strategy if grounding.last_result else None)
+                grounding.confirm_detection()
+        print("-" * 78)
+        print(f"Repeated calls on one desktop ({budget * 1000:.0f} ms after the first): {', '.join(map(str, strategies))}")
+        ok = ok and strategies[-1] == "cached_position"
+    print("=" * 78)
+    print("[OK] Budgeted calls met their deadlines" if ok else "[FAIL] Deadline overrun or position cache unused")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: APIClient request policy against a local stub server.
+
+Runs fetch_posts against src/stub_api_server.py in three scenarios and
+compares the previous client (one request with a 10 s timeout, [] on any
+error) with the configured policy (short timeouts, jittered retries,
+hedging, circuit breaker, last good response as fallback):
+
+- slow tail: every 10th response takes --slow seconds
+- flaky: every 3rd response is a 503 or a dropped connection
+- outage: the API fails every request after one good response
+
+Reports calls that returned no posts, p50/p95/max time per call, requests
+the stub received and the client's retry/hedge counters. Exits non-zero if
+the policy loses a call in any scenario.
+
+Usage:
+    python bench_api_client.py [--calls 40] [--slow 1.5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import requests
+
+from api_client import APIClient
+from stage_timer import percentile
+from stub_api_server import Fault, StubAPIServer
+
+
+class BaselineClient:
+    """fetch_posts as it was before the request policy."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.metrics = "-"
+
+    def fetch_posts(self, limit=10):
+        try:
+            response = self.session.get(f"{self.base_url}/posts", timeout=10)
+            response.raise_for_status()
+            return response.json()[:limit]
+        except requests.exceptions.RequestException:
+            return []
+
+
+def scenarios(slow):
+    return {
+        "slow tail": lambda n: Fault(delay=slow if n % 10 == 9 else 0.01),
+        "flaky": lambda n: Fault(status=503) if n % 6 == 2 else Fault(drop=True) if n % 6 == 5 else Fault(delay=0.01),
+        "outage": lambda n: Fault(delay=0.01) if n == 0 else Fault(status=500),
+    }
+
+
+def run(fault_for, make_client, calls):
+    """(failed calls, seconds per call, requests sent, client metrics) over calls fetch_posts calls."""
+    with StubAPIServer(fault_for=fault_for) as server:
+        client = make_client(server.url)
+        failed, times = 0, []
+        for _ in range(calls):
+            started = time.perf_counter()
+            posts = client.fetch_posts(limit=10)
+            times.append(time.perf_counter() - started)
+            failed += not posts
+        return failed, times, server.requests, client.metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIClient request policy benchmark")
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--slow", type=float, default=1.5, help="Delay of the slow responses (seconds)")
+    args = parser.parse_args()
+
+    clients = {"baseline": BaselineClient, "policy": lambda url: APIClient(url, cache_path=None)}
+    ok = True
+    print("=" * 78)
+    print(f"{'scenario':10s} {'policy':9s} {'failed':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s} "
+          f"{'sent':>5s}  counters")
+    for name, fault_for in scenarios(args.slow).items():
+        for label, make_client in clients.items():
+            failed, times, sent, metrics = run(fault_for, make_client, args.calls)
+            print(f"{name:10s} {label:9s} {failed:6d} {percentile(times, 50) * 1000:8.1f} "
+                  f"{percentile(times, 95) * 1000:8.1f} {max(times) * 1000:8.1f} {sent:5d}  {metrics}")
+            if label == "policy" and failed:
+                ok = False
+    print("=" * 78)
+    print("[OK] Policy answered every call" if ok else "[FAIL] Policy lost calls")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
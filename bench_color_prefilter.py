@@ -0,0 +1,79 @@
+"""
+Benchmark: hue-saturation prefilter in front of the heuristic strategies.
+
+Renders synthetic desktops crowded with distractor icons and runs the
+label-text and characteristics strategies (candidate extraction, label
+measurement/OCR, classifier) with and without the colour prefilter.
+Reports how many candidates the prefilter prunes, whether the strategies
+still land on the Notepad icon, and the end-to-end time per frame.
+
+Usage:
+    python bench_color_prefilter.py [--frames 12] [--icons 60]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import numpy as np
+
+import config
+from icon_grounding import IconGrounding
+from synthetic_desktop import render_desktop
+
+WALLPAPERS = ["gradient", "textured", "flat"]
+
+
+def run(grounding, frames, prefilter, tolerance):
+    """(hits, median seconds per frame, candidates, positions pruned by colour) over all frames."""
+    config.ICON_COLOR_PREFILTER = prefilter
+    hits, times, candidates, pruned = 0, [], 0, 0
+    for frame, center in frames:
+        grounding.screenshot = frame
+        grounding._grid_models.clear()  # every synthetic frame is a new layout
+        started = time.perf_counter()
+        result = (grounding._find_icon_by_label_text("Notepad", grounding._notepad_icon_candidates())
+                  or grounding._find_notepad_by_characteristics())
+        times.append(time.perf_counter() - started)
+        candidates += len(grounding._notepad_icon_candidates())
+        pruned += grounding.prefilter_stats[0] - grounding.prefilter_stats[1]
+        if result and np.hypot(result[0] - center[0], result[1] - center[1]) <= tolerance:
+            hits += 1
+    return hits, float(np.median(times)), candidates, pruned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Colour prefilter benchmark")
+    parser.add_argument("--frames", type=int, default=12)
+    parser.add_argument("--icons", type=int, default=60)
+    parser.add_argument("--tolerance", type=float, default=12.0)
+    args = parser.parse_args()
+
+    frames = []
+    for seed in range(args.frames):
+        frame, truth = render_desktop(seed=seed, n_icons=args.icons,
+                                      wallpaper=WALLPAPERS[seed % len(WALLPAPERS)])
+        frames.append((frame, next(icon for icon in truth if icon.label == "Notepad").center))
+
+    # Every frame is a new desktop: the wallpaper model would be relearned
+    # per frame (bench_background.py measures it)
+    config.ICON_BACKGROUND_MODEL = False
+    grounding = IconGrounding(bot=None)
+    run(grounding, frames[:1], True, args.tolerance)  # warm-up (model, classifier load)
+    base_hits, base_time, base_candidates, _ = run(grounding, frames, False, args.tolerance)
+    hits, elapsed, candidates, pruned = run(grounding, frames, True, args.tolerance)
+
+    print("=" * 60)
+    print(f"{args.frames} frames, {args.icons} icons each")
+    print(f"Candidates: {base_candidates} -> {candidates} "
+          f"({1 - candidates / max(base_candidates, 1):.0%} fewer, {pruned} positions pruned by colour)")
+    print(f"Without prefilter: found {base_hits:3d}/{args.frames}  {base_time * 1000:7.1f} ms/frame")
+    print(f"With prefilter:    found {hits:3d}/{args.frames}  {elapsed * 1000:7.1f} ms/frame "
+          f"({base_time / elapsed:.2f}x)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
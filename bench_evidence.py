@@ -0,0 +1,83 @@
+"""
+Benchmark: evidence mode vs full annotated screenshots.
+
+Simulates a run of --posts posts on a synthetic 1080p desktop: between
+posts the Notepad icon is highlighted (selected) and the clock area
+changes, as on a real desktop. Every post is written once as a full
+annotated PNG (what main.py saved for the first three posts) and once as
+evidence (crop, thumbnail, delta-encoded frame). Reports bytes and encode
+time per post and checks that every archived frame is rebuilt bit-exactly.
+
+Usage:
+    python bench_evidence.py [--posts 10]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+import numpy as np
+
+from evidence_archive import EvidenceArchive, read_index, reconstruct
+from synthetic_desktop import render_desktop
+
+
+def frames(posts):
+    """(frame, Notepad centre) per post."""
+    desktop, truth = render_desktop(seed=7, n_icons=40)
+    notepad = next(icon for icon in truth if icon.label == "Notepad")
+    x, y = notepad.center
+    for post in range(posts):
+        frame = desktop.copy()
+        if post % 2:  # icon selected after the previous post's double-click
+            region = frame[y - 40:y + 50, x - 40:x + 40]
+            region[:] = cv2.addWeighted(region, 0.7, np.full_like(region, (230, 180, 120)), 0.3, 0)
+        cv2.putText(frame, f"10:{post:02d}", (frame.shape[1] - 90, frame.shape[0] - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        yield frame, (x, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evidence mode benchmark")
+    parser.add_argument("--posts", type=int, default=10)
+    args = parser.parse_args()
+
+    full_bytes, full_times = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        archive = EvidenceArchive(Path(directory) / "evidence")
+        originals = []
+        for post, (frame, (x, y)) in enumerate(frames(args.posts), 1):
+            started = time.perf_counter()
+            annotated = frame.copy()
+            cv2.circle(annotated, (x, y), 30, (0, 255, 0), 3)
+            ok, png = cv2.imencode(".png", annotated)
+            (Path(directory) / f"full_{post}.png").write_bytes(png.tobytes())
+            full_times.append(time.perf_counter() - started)
+            full_bytes.append(len(png))
+
+            archive.record(post, frame, (x, y), label="Notepad")
+            originals.append(frame)
+
+        records = read_index(archive.directory)
+        exact = all(np.array_equal(reconstruct(archive.directory, r.frame, records), originals[r.frame])
+                    for r in records)
+
+    evidence_bytes = [r.bytes for r in archive.records]
+    evidence_ms = [r.encode_ms for r in archive.records]
+    print("=" * 60)
+    print(archive.format_summary())
+    print("-" * 60)
+    print(f"Full PNG:  {np.mean(full_bytes) / 1024:8.1f} KB/post  {np.mean(full_times) * 1000:7.1f} ms/post")
+    print(f"Evidence:  {np.mean(evidence_bytes) / 1024:8.1f} KB/post  {np.mean(evidence_ms):7.1f} ms/post "
+          f"({sum(full_bytes) / sum(evidence_bytes):.1f}x fewer bytes)")
+    print(f"Reconstruction: {'bit-exact' if exact else 'MISMATCH'}")
+    print("=" * 60)
+    return 0 if exact else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
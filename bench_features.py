@@ -0,0 +1,70 @@
+"""
+Benchmark: ORB keypoint matching vs exact template matching.
+
+Renders synthetic desktops with the Notepad icon at different scales and
+reports, per scale, how often each strategy lands on the icon and how long
+it takes per frame. Feature-matching time includes frame keypoint
+extraction; the template index comes from the disk cache.
+
+Usage:
+    python bench_features.py [--frames 8] [--scales 0.75 1.0 1.25]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import numpy as np
+
+import config
+from icon_grounding import IconGrounding
+from synthetic_desktop import render_desktop
+
+WALLPAPERS = ["gradient", "textured", "flat"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keypoint vs template matching")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.75, 1.0, 1.25])
+    parser.add_argument("--tolerance", type=float, default=15.0)
+    args = parser.parse_args()
+
+    grounding = IconGrounding(bot=None)
+    start = time.perf_counter()
+    index = grounding.feature_index
+    print(f"Template index: {len(index.names)} templates, loaded in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    template = config.NOTEPAD_ICON_TEMPLATE
+    strategies = {
+        "template": lambda: grounding._template_match(str(template)),
+        "features": lambda: grounding._find_icon_by_features(template.stem),
+    }
+
+    print("=" * 60)
+    for scale in args.scales:
+        hits = {name: 0 for name in strategies}
+        times = {name: [] for name in strategies}
+        for seed in range(args.frames):
+            frame, truth = render_desktop(seed=seed, n_icons=20, notepad_scale=scale,
+                                          wallpaper=WALLPAPERS[seed % len(WALLPAPERS)])
+            notepad = next(icon for icon in truth if icon.label == "Notepad")
+            # The strategies return the template centre, which includes the label
+            x, y, w, h = notepad.bbox
+            target = (notepad.center[0], y + h * 77 / 56.0 / 2.0)
+            for name, strategy in strategies.items():
+                grounding.screenshot = frame
+                started = time.perf_counter()
+                result = strategy()
+                times[name].append(time.perf_counter() - started)
+                if result and np.hypot(result[0] - target[0], result[1] - target[1]) <= args.tolerance:
+                    hits[name] += 1
+        for name in strategies:
+            print(f"scale {scale:4.2f}  {name:9s} found {hits[name]:3d}/{args.frames}  "
+                  f"{np.median(times[name]) * 1000:7.1f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
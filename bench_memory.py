@@ -0,0 +1,98 @@
+"""
+Benchmark: steady-state memory growth per post of the grounding loop.
+
+Runs --posts simulated posts (capture from a synthetic screen source,
+find_notepad_icon, annotated copy, evidence record) with RSS sampled after
+every stage and a tracemalloc snapshot after every post (src/memory_monitor.py).
+After MEMORY_WARMUP_POSTS posts the growth of RSS and traced memory per post
+must stay within MEMORY_GROWTH_BUDGET, otherwise the run fails and the
+allocation sites that grew are printed. --leak keeps every frame alive, as
+a stored traceback or screenshot reference would, to show the guard firing.
+
+Usage:
+    python bench_memory.py [--posts 40] [--budget-kb 512] [--leak]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+from PIL import Image
+
+import config
+from evidence_archive import EvidenceArchive
+from icon_grounding import IconGrounding
+from memory_monitor import MemoryMonitor
+from stage_timer import StageTimer
+from synthetic_desktop import render_desktop
+
+
+class ScreenSource:
+    """Bot stand-in: a new PIL screenshot per call, cycling through a few desktops."""
+
+    def __init__(self, count=3):
+        self.frames = [cv2.cvtColor(render_desktop(seed=seed, n_icons=40)[0], cv2.COLOR_BGR2RGB)
+                       for seed in range(count)]
+        self.calls = 0
+
+    def get_screenshot(self):
+        self.calls += 1
+        return Image.fromarray(self.frames[self.calls % len(self.frames)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory growth per post")
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--budget-kb", type=float, default=config.MEMORY_GROWTH_BUDGET / 1024)
+    parser.add_argument("--leak", action="store_true", help="Keep every frame alive (the guard must fail)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the run's statistics and harvested templates out of the project
+        config.STRATEGY_STATS_PATH = Path(tmp) / "strategy_stats.json"
+        config.TEMPLATE_CACHE_DIR = Path(tmp) / "templates"
+        grounding = IconGrounding(ScreenSource())
+        evidence = EvidenceArchive(Path(tmp) / "evidence")
+        timer = StageTimer(sample_rss=True)
+        retained = []
+
+        with MemoryMonitor(config.MEMORY_TOP_ALLOCATIONS) as memory:
+            for post in range(1, args.posts + 1):
+                with contextlib.redirect_stdout(io.StringIO()):  # strategy progress messages
+                    with timer.stage("capture", post):
+                        grounding.capture_desktop_screenshot()
+                    with timer.stage("ground", post):
+                        position = grounding.find_notepad_icon(retry_attempts=1, retry_delay=0)
+                    with timer.stage("evidence", post):
+                        frame_position = grounding._to_frame(position)
+                        if frame_position is not None:
+                            grounding.annotate_screenshot(frame_position, "Notepad")
+                        evidence.record(post, grounding.screenshot, frame_position, label="Notepad")
+                if args.leak:
+                    retained.append(grounding.screenshot.copy())
+                memory.sample(post)
+
+    warmup = config.MEMORY_WARMUP_POSTS
+    budget = args.budget_kb * 1024
+    ok = memory.within_budget(budget, warmup)
+    print("=" * 60)
+    print(f"{args.posts} posts{' (leaking every frame)' if args.leak else ''}")
+    print(timer.format_summary())
+    print("-" * 60)
+    print(memory.format_summary(warmup))
+    if not ok:
+        print("-" * 60)
+        print(f"Last post: {memory.format_sample(memory.samples[-1])}")
+    print("=" * 60)
+    print(f"[OK] Growth within {args.budget_kb:.0f} KB/post" if ok
+          else f"[FAIL] Growth above {args.budget_kb:.0f} KB/post")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark: coarse-to-fine pyramid and grid-cell candidate search vs full
+resolution.
+
+Renders synthetic desktops, runs the template-free candidate scan with
+ICON_PYRAMID_LEVELS = 0 (full resolution), with pyramid levels 1 and 2, and
+with grid inference (grid fitted once per resolution, then only cells are
+scored), and reports time per frame and recall (planted icons with a
+candidate within the tolerance of their centre).
+
+Usage:
+    python bench_pyramid.py [--frames 3] [--width 1920] [--height 1080]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+import numpy as np
+
+import config
+from icon_grounding import IconGrounding
+from synthetic_desktop import render_desktop
+
+
+def recall(candidates, truth, tolerance):
+    """Fraction of planted icons that have a candidate within tolerance."""
+    if not truth:
+        return 1.0
+    found = 0
+    for icon in truth:
+        tx, ty = icon.center
+        if any(np.hypot(x - tx, y - ty) <= tolerance for x, y, _ in candidates):
+            found += 1
+    return found / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pyramid vs full-resolution candidate search")
+    parser.add_argument("--frames", type=int, default=3)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--icons", type=int, default=15)
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--no-grid", action="store_true", help="Skip the grid inference row")
+    parser.add_argument("--tolerance", type=float, default=24.0)
+    args = parser.parse_args()
+
+    frames = [render_desktop(args.width, args.height, n_icons=args.icons, seed=seed,
+                             wallpaper="textured" if seed % 2 else "gradient")
+              for seed in range(args.frames)]
+    print("=" * 60)
+    print(f"Pyramid benchmark: {args.frames} frames at {args.width}x{args.height}, "
+          f"{args.icons} icons each")
+    print("=" * 60)
+
+    modes = [(levels, False) for levels in args.levels]
+    if not args.no_grid:
+        modes.append((1, True))
+
+    baseline = None
+    for levels, use_grid in modes:
+        config.ICON_PYRAMID_LEVELS = levels
+        config.ICON_GRID_INFERENCE = use_grid
+        grounding = IconGrounding(bot=None)
+        times, recalls, counts = [], [], []
+        for frame, truth in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Every frame is a new layout here: fit the grid outside the
+            # timed section, as it only happens once per layout in a run
+            grounding._grid_models.clear()
+            if use_grid:
+                grounding._grid_model(gray)
+            start = time.perf_counter()
+            candidates = grounding._find_all_icon_candidates(gray)
+            times.append(time.perf_counter() - start)
+            recalls.append(recall(candidates, truth, args.tolerance))
+            counts.append(len(candidates))
+
+        mean_time = float(np.mean(times))
+        if baseline is None:
+            baseline = mean_time
+        if use_grid:
+            label = "grid cells"
+        elif levels == 0:
+            label = "full resolution"
+        else:
+            label = f"pyramid 1/{2 ** levels}"
+        print(f"{label:18s} {mean_time * 1000:9.1f} ms/frame  "
+              f"speedup {baseline / mean_time:5.1f}x  "
+              f"recall {np.mean(recalls):6.1%}  candidates {np.mean(counts):6.1f}")
+
+
+if __name__ == "__main__":
+    main()
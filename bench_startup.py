@@ -0,0 +1,104 @@
+"""
+Startup benchmark based on `python -X importtime`.
+
+Imports the bot entry module in a fresh interpreter several times, reports
+the slowest imports and fails if the cumulative import time of `main` goes
+over the configured budget, or if any heavy dependency is imported eagerly.
+
+Usage:
+    python bench_startup.py [--runs 5] [--budget-ms 300] [--top 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+import config
+
+# Modules that must not be imported just by importing the bot
+HEAVY_MODULES = ["cv2", "numpy", "PIL", "pyautogui", "requests", "pygetwindow"]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        List of (module_name, self_us, cumulative_us, depth) tuples
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_PATH), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bot startup import time")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters")
+    parser.add_argument("--budget-ms", type=float, default=config.STARTUP_IMPORT_BUDGET_MS,
+                        help="Maximum allowed median cumulative import time")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    # Warm-up run so .pyc compilation is not counted
+    run_importtime(args.module)
+
+    totals = []
+    last_entries = []
+    for _ in range(args.runs):
+        last_entries = run_importtime(args.module)
+        total = next((cum for name, _, cum, depth in last_entries
+                      if name == args.module and depth == 0), 0)
+        totals.append(total / 1000.0)
+
+    median_ms = statistics.median(totals)
+    print("=" * 60)
+    print(f"Startup import benchmark: import {args.module}")
+    print("=" * 60)
+    print(f"Runs: {args.runs}  median: {median_ms:.1f} ms  "
+          f"min: {min(totals):.1f} ms  max: {max(totals):.1f} ms")
+    print(f"Budget: {args.budget_ms:.1f} ms")
+
+    print(f"\nSlowest imports (self time, last run):")
+    for name, self_us, cum_us, _ in sorted(last_entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000.0:8.2f} ms self  {cum_us / 1000.0:8.2f} ms cumulative  {name}")
+
+    imported = {name for name, _, _, _ in last_entries}
+    eager = [m for m in HEAVY_MODULES if m in imported]
+
+    failed = False
+    if eager:
+        print(f"\n[FAIL] Heavy modules imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n[FAIL] Median import time {median_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("\n[OK] Startup within budget, no heavy modules imported eagerly")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: global text-label detection vs fixed-offset label boxes.
+
+Renders synthetic desktops with icons of different sizes and, for every
+icon candidate the grounding finds, takes its label region twice: the
+fixed-offset box below the icon (ICON_LABEL_DETECTION = False) and the
+label detected once per frame and joined to the candidate (True). Reports
+how many candidate boxes contain the candidate's true label, labels
+attached to the wrong icon, and the label stage's time per frame (label
+boxes plus matching them against the rendered "Notepad").
+
+Usage:
+    python bench_text_labels.py [--frames 12] [--icons 60]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import numpy as np
+
+import config
+import label_matcher
+from icon_grounding import IconGrounding
+from synthetic_desktop import render_desktop
+
+WALLPAPERS = ["gradient", "textured", "flat"]
+ICON_SIZES = [32, 48, 64]
+
+
+def contains(box, label_bbox):
+    """Whether a (x, y, w, h) box contains the centre of a label box."""
+    x, y, width, height = box
+    lx, ly, lw, lh = label_bbox
+    cx, cy = lx + lw / 2, ly + lh / 2
+    return width > 0 and height > 0 and x <= cx < x + width and y <= cy < y + height
+
+
+def run(grounding, frames, detection):
+    """(candidates on an icon, boxes on their own label, on another label, median seconds per frame)."""
+    config.ICON_LABEL_DETECTION = detection
+    on_icon = own = wrong = 0
+    times = []
+    for frame, truth in frames:
+        grounding.screenshot = frame
+        grounding._grid_models.clear()  # every synthetic frame is a new layout
+        gray = grounding._gray_frame()
+        points = np.array(grounding._find_all_icon_candidates(gray), dtype=np.int64).reshape(-1, 3)
+        started = time.perf_counter()
+        boxes = grounding._label_boxes(points)
+        label_matcher.matcher("Notepad").scores(gray, boxes)
+        times.append(time.perf_counter() - started)
+
+        centers = np.array([icon.center for icon in truth])
+        for (x, y, _), box in zip(points, boxes):
+            distance = np.hypot(*(centers - (x, y)).T)
+            nearest = int(np.argmin(distance))
+            if distance[nearest] > 12:
+                continue
+            on_icon += 1
+            own += contains(box, truth[nearest].label_bbox)
+            wrong += any(contains(box, icon.label_bbox) for i, icon in enumerate(truth) if i != nearest)
+    return on_icon, own, wrong, float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text label detection benchmark")
+    parser.add_argument("--frames", type=int, default=12)
+    parser.add_argument("--icons", type=int, default=60)
+    args = parser.parse_args()
+
+    frames = []
+    for seed in range(args.frames):
+        size = ICON_SIZES[seed % len(ICON_SIZES)]
+        frames.append(render_desktop(seed=seed, n_icons=args.icons, icon_size=size,
+                                     grid_cell=(size + 28, size + 52),
+                                     wallpaper=WALLPAPERS[seed % len(WALLPAPERS)]))
+
+    grounding = IconGrounding(bot=None)
+    run(grounding, frames[:1], True)  # warm-up
+    print("=" * 72)
+    print(f"{args.frames} frames, {args.icons} icons each, icon sizes {ICON_SIZES}")
+    print(f"{'label boxes':16s} {'candidates':>10s} {'own label':>10s} {'other label':>12s} {'ms/frame':>9s}")
+    results = {}
+    for name, detection in (("fixed offset", False), ("detected", True)):
+        on_icon, own, wrong, elapsed = results[name] = run(grounding, frames, detection)
+        print(f"{name:16s} {on_icon:10d} {own / max(on_icon, 1):10.0%} {wrong:12d} {elapsed * 1000:9.2f}")
+    print("=" * 72)
+    on_icon, own, wrong, _ = results["detected"]
+    ok = own >= 0.95 * on_icon and wrong == 0
+    print("[OK] Detected labels cover the candidates' own labels" if ok else "[FAIL] Label association missed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
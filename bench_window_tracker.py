@@ -0,0 +1,196 @@
+"""
+Benchmark: window tracking latency and id stability.
+
+X11 part (needs the Xvfb binary and python-xlib): starts a private Xvfb
+server, tracks it with WindowTracker over X11WindowSource and creates,
+retitles and destroys a top-level window with python-xlib. Reports how
+long the tracker takes to see each change (wait_for_window, the
+title_changed event, wait_for_close) and checks the tracked rectangle, PID
+and that the window keeps its id across the title change. Skipped with a
+message when Xvfb or python-xlib is missing.
+
+Polling part (always runs): PollingWindowSource over a pygetwindow
+stand-in whose window objects have no native handle. Window ids must stay
+the same across polls (a refresh without changes emits no events), two
+windows with the same title must stay apart, and a retitled window
+(Notepad's "Untitled" becoming "post_1.txt" on save) must keep its id.
+
+Usage:
+    python bench_window_tracker.py [--timeout 2.0] [--budget 500]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from window_tracker import (WINDOW_TITLE_CHANGED, PollingWindowSource, WindowTracker,
+                            X11WindowSource)
+
+WINDOW_RECT = (120, 80, 400, 300)  # (left, top, width, height)
+
+
+class FakeWindow:
+    """pygetwindow window without a native handle."""
+
+    def __init__(self, title, rect):
+        self.title = title
+        self.left, self.top, self.width, self.height = rect
+        self.isMinimized = False
+
+    def activate(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeGetWindow:
+    """pygetwindow stand-in returning the same window objects on every call."""
+
+    def __init__(self, windows):
+        self.windows = [FakeWindow(title, rect) for title, rect in windows]
+
+    def getAllWindows(self):
+        return list(self.windows)
+
+    def getActiveWindow(self):
+        return self.windows[0] if self.windows else None
+
+
+def start_xvfb(timeout):
+    """(process, display name) of a new Xvfb server, or (None, reason)."""
+    if shutil.which("Xvfb") is None:
+        return None, "Xvfb not installed"
+    try:
+        from Xlib import display
+    except ImportError:
+        return None, "python-xlib not installed"
+    number = next(n for n in range(99, 200) if not os.path.exists(f"/tmp/.X{n}-lock"))
+    name = f":{number}"
+    process = subprocess.Popen(["Xvfb", name, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            display.Display(name).close()
+            return process, name
+        except Exception:
+            time.sleep(0.05)
+    process.terminate()
+    return None, f"Xvfb {name} did not start"
+
+
+def bench_x11(display_name, timeout):
+    """Rows of (check, ms or None, ok)."""
+    from Xlib import X, Xatom, display
+
+    client = display.Display(display_name)
+    screen = client.screen()
+    tracker = WindowTracker(X11WindowSource(display_name))
+    retitled = threading.Event()
+    tracker.subscribe(lambda event, window: event == WINDOW_TITLE_CHANGED
+                      and window.title == "Untitled - Notepad" and retitled.set())
+    tracker.start()
+    rows = []
+    try:
+        left, top, width, height = WINDOW_RECT
+        window = screen.root.create_window(left, top, width, height, 0, screen.root_depth,
+                                           event_mask=X.StructureNotifyMask)
+        window.set_wm_name("Loading")
+        window.change_property(client.intern_atom("_NET_WM_PID"), Xatom.CARDINAL, 32, [os.getpid()])
+        started = time.perf_counter()
+        window.map()
+        client.flush()
+        info = tracker.wait_for_window(title="Loading", timeout=timeout)
+        rows.append(("window appears", (time.perf_counter() - started) * 1000 if info else None, info is not None))
+        if info is None:
+            return rows
+        rows.append(("rect and pid", None, info.rect == WINDOW_RECT and info.pid == os.getpid()))
+
+        started = time.perf_counter()
+        window.set_wm_name("Untitled - Notepad")
+        client.flush()
+        seen = retitled.wait(timeout)
+        rows.append(("title change", (time.perf_counter() - started) * 1000 if seen else None, seen))
+        renamed = tracker.find(title="Untitled - Notepad", exact=True)
+        rows.append(("same id after retitle", None, [w.window_id for w in renamed] == [info.window_id]))
+
+        started = time.perf_counter()
+        window.destroy()
+        client.flush()
+        closed = tracker.wait_for_close(info, timeout=timeout)
+        rows.append(("window closes", (time.perf_counter() - started) * 1000 if closed else None, closed))
+    finally:
+        tracker.stop()
+        client.close()
+    return rows
+
+
+def bench_polling():
+    """Rows of (check, ms or None, ok)."""
+    gw = FakeGetWindow([("Untitled - Notepad", WINDOW_RECT), ("Untitled - Notepad", (40, 40, 400, 300)),
+                        ("Terminal", (0, 0, 640, 480))])
+    source = PollingWindowSource(gw)
+    first = sorted(w.window_id for w in source.snapshot()[0])
+    second = sorted(w.window_id for w in source.snapshot()[0])
+    rows = [("ids stable across polls", None, first == second),
+            ("same-titled windows kept apart", None, len(set(first)) == 3)]
+
+    tracker = WindowTracker(source)
+    events = []
+    tracker.subscribe(lambda event, window: events.append(event))
+    tracker.refresh()
+    first_events = len(events)  # three windows created, one focused
+    started = time.perf_counter()
+    tracker.refresh()
+    rows.append(("unchanged refresh, no events", (time.perf_counter() - started) * 1000,
+                 events.count("created") == 3 and len(events) == first_events))
+
+    saved = tracker.find(title="Untitled - Notepad", exact=True)[0]
+    next(w for w in gw.windows if source._window_id(w) == saved.window_id).title = "post_1.txt - Notepad"
+    del events[:]
+    tracker.refresh()
+    retitled = [w.window_id for w in tracker.find(title="post_1.txt - Notepad", exact=True)]
+    rows.append(("retitle keeps the id", None, events == [WINDOW_TITLE_CHANGED] and retitled == [saved.window_id]
+                 and not tracker.wait_for_close(saved, timeout=0)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Window tracker benchmark")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds to wait for each change")
+    parser.add_argument("--budget", type=float, default=500.0, help="ms the tracker may take to see a change")
+    args = parser.parse_args()
+
+    sections = [("polling (window objects without handles)", bench_polling())]
+    process, display_name = start_xvfb(args.timeout)
+    if process is None:
+        print(f"Skipping X11 tracking: {display_name}")
+    else:
+        try:
+            sections.append((f"X11 events (Xvfb {display_name})", bench_x11(display_name, args.timeout)))
+        finally:
+            process.terminate()
+            process.wait()
+
+    ok = True
+    print("=" * 60)
+    for title, rows in sections:
+        print(title)
+        for check, ms, passed in rows:
+            passed = passed and (ms is None or ms <= args.budget)
+            ok = ok and passed
+            print(f"  {check:32s} {'-' if ms is None else f'{ms:.1f} ms':>10s}  {'ok' if passed else 'FAIL'}")
+    print("=" * 60)
+    print("[OK] Window changes tracked with stable ids" if ok else "[FAIL] Window change missed or id unstable")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Rebuild full frames from an evidence archive.
+
+Reads an archive written with config.EVIDENCE_DIR (see
+src/evidence_archive.py) and writes the chosen frames as PNGs, rebuilt
+bit-exactly from their keyframe and delta tiles. Without --post or --frame
+every frame is rebuilt.
+
+Usage:
+    python reconstruct_evidence.py evidence --list
+    python reconstruct_evidence.py evidence --post 3 --out frames/
+    python reconstruct_evidence.py evidence --frame 0 --frame 7 --out frames/
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+
+from evidence_archive import read_index, reconstruct
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild frames from an evidence archive")
+    parser.add_argument("archive", type=Path)
+    parser.add_argument("--post", type=int, action="append", default=[], help="Post id (repeatable)")
+    parser.add_argument("--frame", type=int, action="append", default=[], help="Frame number (repeatable)")
+    parser.add_argument("--out", type=Path, default=Path("reconstructed"))
+    parser.add_argument("--list", action="store_true", help="Only list the archived frames")
+    args = parser.parse_args()
+
+    records = read_index(args.archive)
+    if args.list:
+        print(f"{'frame':>6s} {'post':>6s} {'kind':>5s} {'key':>5s} {'tiles':>6s} {'bytes':>10s} {'encode ms':>10s}")
+        for r in records:
+            print(f"{r.frame:6d} {r.post:6d} {r.kind:>5s} {r.keyframe:5d} {r.tiles:6d} {r.bytes:10,d} {r.encode_ms:10.1f}")
+        return 0
+
+    selected = [r for r in records
+                if (not args.post and not args.frame) or r.post in args.post or r.frame in args.frame]
+    if not selected:
+        print("No matching frames in the archive")
+        return 1
+    args.out.mkdir(parents=True, exist_ok=True)
+    for r in selected:
+        path = args.out / f"frame_{r.frame:06d}_post_{r.post}.png"
+        cv2.imwrite(str(path), reconstruct(args.archive, r.frame, records))
+        print(f"{path} ({r.kind}, keyframe {r.keyframe})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Replay recorded grounding sessions against any IconGrounding version.
+
+Reads a recording made with config.GROUNDING_RECORD_DIR (see
+src/session_recorder.py), feeds every recorded frame to the chosen
+version through a fake bot, and diffs positions and latencies against the
+recording. Versions with _ground_notepad run exactly the grounding path
+of find_notepad_icon (capture excluded, like in the recorder), with the
+scheduler statistics and budget recorded for the frame, so strategies run
+in the recorded order and a strategy error ends the frame as it did in
+production. Versions without it are supported too: older versions with
+_notepad_strategies walk the strategies in their default order, and
+versions without those are timed as a whole
+(IconGrounding(bot).find_notepad_icon(), including the screen capture;
+the fake bot serves the recorded area for any capture region). Runs on
+plain Linux; no display or Windows APIs are needed.
+
+Replays are only approximately faithful: apart from the scheduler
+statistics, no state of the recorded IconGrounding is restored. The
+wallpaper (background) and grid models are relearned from the replayed
+frames in order, so they start from scratch even if the recording began
+mid-session, and candidate positions can differ by a few pixels. The
+position cache and the templates harvested on confirm_detection do not
+exist in a replay: cached_position and learned_template never run there,
+and frames the recording answered with them are marked "~" in the table
+(their diff says little about the replayed version).
+
+Usage:
+    python replay_grounding.py recordings/session1                 # working tree
+    python replay_grounding.py recordings/session1 --git HEAD~5    # any commit
+    python replay_grounding.py recordings/session1 --source /path/to/checkout
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from session_recorder import read_recording
+
+# Strategies that answer from state a replay does not have (see above)
+STATEFUL_STRATEGIES = ("cached_position", "learned_template")
+
+# Runs inside the replayed version's tree: reads one JSON line per frame
+# (path, origin, scheduler statistics, budget) on stdin and writes one JSON
+# result per frame
+WORKER = r"""
+import json, sys, time
+sys.path.insert(0, "src")
+import cv2
+from PIL import Image
+import config
+if hasattr(config, "GROUNDING_RECORD_DIR"):
+    config.GROUNDING_RECORD_DIR = None
+if hasattr(config, "STRATEGY_STATS_PATH"):
+    config.STRATEGY_STATS_PATH = None  # recorded statistics are set per frame, nothing is saved
+from icon_grounding import IconGrounding
+
+
+class ReplayBot:
+    # Serves the recorded frame to both the in-memory and the file-based
+    # screenshot paths of different IconGrounding versions. The frame is
+    # the area captured at origin; a region capture is cut from it
+    frame = None
+    origin = (0, 0)
+
+    def get_screenshot(self, region=None):
+        frame = self.frame
+        if region is not None:
+            left, top = region[0] - self.origin[0], region[1] - self.origin[1]
+            frame = frame[max(0, top):top + region[3], max(0, left):left + region[2]]
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def save_screenshot(self, path):
+        cv2.imwrite(path, self.frame)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StrategyLog:
+    # Recorder stand-in collecting the strategies _ground_notepad runs
+    def __init__(self):
+        self.strategies = []
+
+    def strategy(self, name, position, elapsed, error=None):
+        self.strategies.append({"name": name, "position": position, "elapsed_ms": elapsed * 1000.0,
+                                "error": f"{type(error).__name__}: {error}" if error is not None else None})
+
+
+def timed(call):
+    started = time.perf_counter()
+    try:
+        result, error = call(), None
+    except Exception as e:
+        result, error = None, f"{type(e).__name__}: {e}"
+    return result, (time.perf_counter() - started) * 1000.0, error
+
+
+bot = ReplayBot()
+grounding = IconGrounding(bot)
+for line in sys.stdin:
+    frame = json.loads(line)
+    bot.frame = cv2.imread(frame["path"], cv2.IMREAD_COLOR)
+    bot.origin = tuple(frame["origin"])
+    if hasattr(grounding, "_ground_notepad"):
+        # The production path on the recorded frame and scheduler state
+        if frame["stats"] is not None:
+            from strategy_scheduler import StrategyStats
+            grounding.scheduler.stats = {name: StrategyStats(*s) for name, s in frame["stats"].items()}
+        grounding.screenshot = bot.frame
+        grounding.origin = bot.origin
+        log = grounding.recorder = StrategyLog()
+        result, elapsed, error = timed(lambda: grounding._ground_notepad(frame["budget"]))
+        position = grounding._to_frame(result.position) if result is not None else None
+        strategies = log.strategies
+    elif hasattr(grounding, "_notepad_strategies"):
+        # Mirror find_notepad_icon of these versions (strategies in order
+        # until the first hit or error, capture excluded like in the
+        # recorder), then keep going so every strategy's result on this
+        # frame can be diffed
+        grounding.capture_desktop_screenshot()
+        position, elapsed, error, done = None, 0.0, None, False
+        strategies = []
+        for name, strategy, _ in grounding._notepad_strategies():
+            result, ms, err = timed(strategy)
+            strategies.append({"name": name, "position": result, "elapsed_ms": ms, "error": err})
+            if not done:
+                elapsed += ms
+                position, error = result, err
+                done = bool(result) or err is not None
+    else:
+        # Older versions: time the whole call (includes the screen capture)
+        position, elapsed, error = timed(lambda: grounding.find_notepad_icon(retry_attempts=1, retry_delay=0))
+        strategies = []
+    print(json.dumps({"position": position, "elapsed_ms": elapsed, "error": error,
+                      "strategies": strategies}), flush=True)
+"""
+
+
+def export_revision(revision, destination):
+    """Write src/ and resources/ of a git revision into destination."""
+    archive = subprocess.run(["git", "archive", revision, "src", "resources"],
+                             cwd=str(ROOT), capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(destination)], input=archive, check=True)
+
+
+def replay(tree, frames):
+    """Run the worker in a version's tree on (path, record) pairs; one result dict per frame."""
+    lines = [json.dumps({"path": str(path), "origin": record.origin, "stats": record.stats,
+                         "budget": record.budget}) for path, record in frames]
+    process = subprocess.run([sys.executable, "-c", WORKER], cwd=str(tree), text=True,
+                             input="\n".join(lines) + "\n", capture_output=True)
+    results = []
+    for line in process.stdout.splitlines():
+        if line.startswith("{"):
+            results.append(json.loads(line))
+    if len(results) != len(frames):
+        sys.stderr.write(process.stderr)
+        raise RuntimeError(f"Replay produced {len(results)} results for {len(frames)} frames")
+    return results
+
+
+def distance(a, b):
+    if a is None or b is None:
+        return None if a is None and b is None else float("inf")
+    return float(np.hypot(a[0] - b[0], a[1] - b[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a grounding recording and diff the results")
+    parser.add_argument("recording", type=Path)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--git", metavar="REV", help="Replay the IconGrounding of a git revision")
+    source.add_argument("--source", type=Path, help="Checkout root containing src/ and resources/")
+    parser.add_argument("--tolerance", type=float, default=5.0, help="Max position change in px")
+    parser.add_argument("--limit", type=int, help="Replay only the first N frames")
+    parser.add_argument("--verbose", action="store_true", help="Show per-strategy diffs")
+    args = parser.parse_args()
+
+    records = list(read_recording(args.recording))[:args.limit]
+    if not records:
+        print("Recording is empty")
+        return 1
+    frames = [((args.recording / r.frame).resolve(), r) for r in records]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.git:
+            export_revision(args.git, tmp)
+            tree, label = Path(tmp), args.git
+        else:
+            tree = args.source or ROOT
+            label = str(tree)
+        print(f"Replaying {len(records)} frames from {args.recording} with {label}")
+        results = replay(tree, frames)
+
+    print("=" * 78)
+    print(f"{'frame':14s} {'recorded':>14s} {'replayed':>14s} {'moved':>7s} "
+          f"{'rec ms':>9s} {'new ms':>9s}")
+    changed = stateful_changed = 0
+    recorded_ms, replayed_ms = [], []
+    for record, result in zip(records, results):
+        position = tuple(result["position"]) if result["position"] else None
+        moved = distance(record.result, position)
+        differs = moved is not None and moved > args.tolerance
+        stateful = any(s.name in STATEFUL_STRATEGIES and s.position for s in record.strategies)
+        if stateful:
+            stateful_changed += differs
+        else:
+            changed += differs
+        recorded_ms.append(record.elapsed_ms)
+        replayed_ms.append(result["elapsed_ms"])
+        name = ("~" if stateful else "") + Path(record.frame).name
+        print(f"{name:14s} {str(record.result):>14s} {str(position):>14s} "
+              f"{'-' if moved is None else f'{moved:.1f}':>7s} "
+              f"{record.elapsed_ms:9.1f} {result['elapsed_ms']:9.1f}{'  CHANGED' if differs else ''}")
+        if args.verbose:
+            replayed = {s["name"]: s for s in result["strategies"]}
+            for strategy in record.strategies:
+                new = replayed.get(strategy.name)
+                if new is None:
+                    print(f"    {strategy.name:16s} not in replayed version")
+                    continue
+                new_position = tuple(new["position"]) if new["position"] else None
+                print(f"    {strategy.name:16s} {str(strategy.position):>14s} {str(new_position):>14s} "
+                      f"{strategy.elapsed_ms:9.1f} {new['elapsed_ms']:9.1f} ms")
+
+    print("=" * 78)
+    print(f"Positions changed (> {args.tolerance:g} px): {changed}/{len(records)}"
+          + (f", plus {stateful_changed} on ~ frames (recorded state not replayed)" if stateful_changed else ""))
+    print(f"Latency p50: {np.median(recorded_ms):.1f} -> {np.median(replayed_ms):.1f} ms, "
+          f"p95: {np.percentile(recorded_ms, 95):.1f} -> {np.percentile(replayed_ms, 95):.1f} ms")
+    return 1 if changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
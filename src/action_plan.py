@@ -0,0 +1,200 @@
+"""
+Batched mouse and keyboard actions.
+
+Every DesktopBot primitive goes through pyautogui with the global
+pyautogui.PAUSE (100 ms) slept after it, and move_to animates for 200 ms.
+An ActionPlan records primitives instead, optimizes the recorded sequence
+(consecutive moves collapse into the last one, zero pauses are dropped and
+adjacent pauses merged, instant moves are fused into the click that follows
+them) and sends the result in one go with the hidden pause disabled.
+Explicit pauses stay, so waits the UI needs are kept.
+
+Usage:
+    with ActionPlan("deselect") as plan:
+        plan.move(100, 100).double_click()
+
+Each run returns a PlanReport with the estimated time of the compiled plan,
+the estimate for sending the same primitives one call at a time, and the
+measured time.
+"""
+import time
+from typing import List, NamedTuple, Optional
+
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import("pyautogui")
+config = lazy_import("config")
+
+# Cost model (seconds)
+EVENT_COST = 0.005  # one synthesized input call
+CALL_PAUSE = 0.1  # pyautogui.PAUSE as set by DesktopBot
+CALL_MOVE_DURATION = 0.2  # DesktopBot.move_to animation
+ANIMATED_MOVE_DURATION = 0.2
+
+
+class Action(NamedTuple):
+    """One input primitive."""
+    kind: str  # "move", "click", "hotkey", "press", "write" or "pause"
+    args: tuple = ()
+    duration: float = 0.0  # move animation, keystroke interval or pause length (s)
+    clicks: int = 1
+    button: str = "left"
+
+
+class PlanReport(NamedTuple):
+    """Timing of one executed plan."""
+    name: str
+    recorded: int  # primitives recorded
+    sent: int  # primitives after compilation
+    estimated: float  # compiled plan (s)
+    per_call_estimate: float  # same primitives sent one call at a time (s)
+    actual: float  # measured (s)
+
+    def __str__(self) -> str:
+        return (f"plan {self.name}: {self.recorded} -> {self.sent} actions, "
+                f"est {self.estimated * 1000:.0f} ms (per-call {self.per_call_estimate * 1000:.0f} ms), "
+                f"took {self.actual * 1000:.0f} ms")
+
+
+def compile_actions(actions: List[Action]) -> List[Action]:
+    """
+    Optimize a recorded sequence without changing what the UI receives.
+
+    - Pauses of zero length are dropped and adjacent pauses merged
+    - A move directly followed by another move is dropped (only the last
+      position matters)
+    - An instant move directly followed by a click becomes a click at that
+      position
+    """
+    compiled: List[Action] = []
+    for action in actions:
+        previous = compiled[-1] if compiled else None
+        if action.kind == "pause":
+            if action.duration <= 0:
+                continue
+            if previous is not None and previous.kind == "pause":
+                compiled[-1] = previous._replace(duration=previous.duration + action.duration)
+                continue
+        elif action.kind == "move":
+            if previous is not None and previous.kind == "move":
+                compiled[-1] = action
+                continue
+        elif action.kind == "click" and not action.args:
+            if previous is not None and previous.kind == "move" and previous.duration == 0:
+                compiled[-1] = action._replace(args=previous.args)
+                continue
+        compiled.append(action)
+    return compiled
+
+
+def estimate(actions: List[Action], call_pause: float = 0.0, move_duration: Optional[float] = None) -> float:
+    """
+    Estimated seconds to send actions.
+
+    Args:
+        actions: Actions to send
+        call_pause: Pause slept after every input call (pyautogui.PAUSE)
+        move_duration: Animation time of every move (None uses each move's own)
+    """
+    total = 0.0
+    for action in actions:
+        if action.kind == "pause":
+            total += action.duration
+            continue
+        total += EVENT_COST + call_pause
+        if action.kind == "move":
+            total += action.duration if move_duration is None else move_duration
+        elif action.kind == "write":
+            total += len(action.args[0]) * (action.duration + EVENT_COST)
+    return total
+
+
+class ActionPlan:
+    """Records input primitives and sends them, optimized, in one batch."""
+
+    def __init__(self, name: str = "actions"):
+        self.name = name
+        self.actions: List[Action] = []
+        self.report: Optional[PlanReport] = None
+
+    def move(self, x: int, y: int, animate: bool = False) -> "ActionPlan":
+        """Move the mouse; instantly unless the movement should be visible."""
+        self.actions.append(Action("move", (int(x), int(y)), ANIMATED_MOVE_DURATION if animate else 0.0))
+        return self
+
+    def click(self, button: str = "left") -> "ActionPlan":
+        """Click at the current mouse position."""
+        self.actions.append(Action("click", button=button))
+        return self
+
+    def double_click(self) -> "ActionPlan":
+        """Double click at the current mouse position."""
+        self.actions.append(Action("click", clicks=2))
+        return self
+
+    def hotkey(self, *keys: str) -> "ActionPlan":
+        """Press a key combination (e.g. hotkey("ctrl", "a"))."""
+        self.actions.append(Action("hotkey", keys))
+        return self
+
+    def press(self, key: str) -> "ActionPlan":
+        """Press and release a single key."""
+        self.actions.append(Action("press", (key,)))
+        return self
+
+    def write(self, text: str, interval: float = 0.0) -> "ActionPlan":
+        """Type text with `interval` seconds between keystrokes."""
+        self.actions.append(Action("write", (text,), interval))
+        return self
+
+    def pause(self, milliseconds: float) -> "ActionPlan":
+        """Wait, e.g. for the UI to react to the previous action."""
+        self.actions.append(Action("pause", duration=milliseconds / 1000.0))
+        return self
+
+    def compile(self) -> List[Action]:
+        """The optimized action sequence."""
+        return compile_actions(self.actions)
+
+    def run(self) -> PlanReport:
+        """Send the compiled plan and report estimated and measured time."""
+        compiled = self.compile()
+        estimated = estimate(compiled)
+        per_call = estimate(self.actions, CALL_PAUSE, CALL_MOVE_DURATION)
+
+        started = time.perf_counter()
+        for action in compiled:
+            _send(action)
+        actual = time.perf_counter() - started
+
+        self.report = PlanReport(self.name, len(self.actions), len(compiled), estimated, per_call, actual)
+        self.actions = []
+        return self.report
+
+    def __enter__(self) -> "ActionPlan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            report = self.run()
+            if config.ACTION_PLAN_REPORT:
+                print(f"  {report}")
+        return False
+
+
+def _send(action: Action):
+    """Send one action through pyautogui without its per-call pause."""
+    if action.kind == "pause":
+        time.sleep(action.duration)
+    elif action.kind == "move":
+        pyautogui.moveTo(*action.args, duration=action.duration, _pause=False)
+    elif action.kind == "click":
+        pyautogui.click(*action.args, clicks=action.clicks, button=action.button, _pause=False)
+    elif action.kind == "hotkey":
+        pyautogui.hotkey(*action.args, _pause=False)
+    elif action.kind == "press":
+        pyautogui.press(action.args[0], _pause=False)
+    elif action.kind == "write":
+        pyautogui.write(action.args[0], interval=action.duration, _pause=False)
+    else:
+        raise ValueError(f"Unknown action: {action.kind}")
@@ -1,48 +1,152 @@
 """API client for fetching blog posts from JSONPlaceholder."""
-import requests
-from typing import List, Dict, Optional
-import time
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, List, Dict, Optional, Union
+
+import config
+from lazy_imports import lazy_import
+from request_policy import (CircuitBreaker, CircuitOpenError, PolicyExecutor, RETRY_STATUS,
+                            RequestPolicy, RetryableError)
+
+requests = lazy_import("requests")
+
+
+def default_policy() -> RequestPolicy:
+    """Request policy from the API settings in config.py."""
+    return RequestPolicy(connect_timeout=config.API_CONNECT_TIMEOUT, read_timeout=config.API_READ_TIMEOUT,
+                         max_attempts=config.API_MAX_ATTEMPTS, deadline=config.API_DEADLINE,
+                         hedge=config.API_HEDGE)
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Connection problems, timeouts and 429/5xx responses are worth another attempt."""
+    return isinstance(error, (RetryableError, requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
 
 class APIClient:
-    """Client for interacting with JSONPlaceholder API."""
-    
-    def __init__(self, base_url: str = "https://jsonplaceholder.typicode.com"):
+    """
+    Client for interacting with JSONPlaceholder API.
+
+    Requests run under a RequestPolicy (short timeouts, jittered retries
+    within a deadline, hedging after the observed p95 latency) and a circuit
+    breaker. The last good response of every path is cached (on disk with
+    config.API_CACHE_PATH) and served when the API fails or the breaker is
+    open. Latency and retry counters are in self.metrics.
+    """
+
+    def __init__(self, base_url: str = "https://jsonplaceholder.typicode.com",
+                 policy: Optional[RequestPolicy] = None,
+                 cache_path: Union[str, Path, None] = config.API_CACHE_PATH):
+        """
+        Args:
+            base_url: API root URL
+            policy: Timeouts, retries and hedging (default: from config.py)
+            cache_path: JSON file of the last good responses (None: memory only)
+        """
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        })
-    
+        self.policy = policy if policy is not None else default_policy()
+        self.executor = PolicyExecutor(self.policy,
+                                       CircuitBreaker(config.API_BREAKER_FAILURES, config.API_BREAKER_RESET))
+        self.metrics = self.executor.metrics
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self._cache: Optional[Dict[str, Any]] = None
+        self._local = threading.local()  # one Session per thread: hedged attempts run concurrently
+
+    @property
+    def session(self) -> "requests.Session":
+        """HTTP session of the calling thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            })
+        return session
+
+    def _get_json(self, path: str) -> Any:
+        """
+        GET base_url + path under the request policy; the cached response
+        is served if that fails.
+
+        Raises:
+            The request error when there is no cached response
+        """
+        url = f"{self.base_url}{path}"
+
+        def send(read_timeout: float):
+            response = self.session.get(url, timeout=(self.policy.connect_timeout, read_timeout))
+            if response.status_code in RETRY_STATUS:
+                raise RetryableError(f"{response.status_code} Server Error for url: {url}")
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            data = self.executor.call(send, _is_retryable)
+        except (requests.exceptions.RequestException, RetryableError, CircuitOpenError, ValueError) as e:
+            cached = self._load_cache().get(path)
+            if cached is None:
+                raise
+            self.metrics.count("cache_served")
+            print(f"Serving cached response for {path} ({e})")
+            return cached
+        self._store_cache(path, data)
+        return data
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path is not None:
+                try:
+                    with open(self.cache_path, encoding="utf-8") as f:
+                        self._cache = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._cache
+
+    def _store_cache(self, path: str, data: Any):
+        cache = self._load_cache()
+        if cache.get(path) == data:
+            return
+        cache[path] = data
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            print(f"Could not save API response cache: {e}")
+
     def fetch_posts(self, limit: int = 10) -> List[Dict]:
         """
         Fetch blog posts from the API.
-        
+
         Args:
             limit: Maximum number of posts to fetch
-            
+
         Returns:
             List of post dictionaries
         """
         try:
-            response = self.session.get(f"{self.base_url}/posts", timeout=10)
-            response.raise_for_status()
-            posts = response.json()
-            
+            posts = self._get_json("/posts")
+
             # Return only the first 'limit' posts
             return posts[:limit]
-            
-        except requests.exceptions.RequestException as e:
+
+        except (requests.exceptions.RequestException, RetryableError, CircuitOpenError, ValueError) as e:
             print(f"Error fetching posts: {e}")
             # Return empty list on error (graceful degradation)
             return []
-    
+
     def get_post(self, post_id: int) -> Optional[Dict]:
         """Fetch a single post by ID."""
         try:
-            response = self.session.get(f"{self.base_url}/posts/{post_id}", timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._get_json(f"/posts/{post_id}")
+        except (requests.exceptions.RequestException, RetryableError, CircuitOpenError, ValueError) as e:
             print(f"Error fetching post {post_id}: {e}")
             return None
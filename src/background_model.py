@@ -0,0 +1,210 @@
+"""
+Learned wallpaper model that isolates foreground (icons, labels) by subtraction.
+
+The wallpaper behind the desktop icons does not change during a session,
+yet every scan evaluates its texture again, and textured wallpaper is what
+the variance and edge thresholds of the candidate scan have to reject.
+BackgroundModel estimates the wallpaper of one screen resolution from the
+frames it observes: pixels hinted as foreground (icons and their labels,
+masked windows) are left out, every other pixel is the median of its last
+BACKGROUND_FRAMES observations, and pixels never observed (under icons that
+never moved) are inpainted from their surroundings at an eighth of the
+resolution (an inpainted pixel has to differ by INPAINTED_MARGIN more, as
+the estimate there lacks the wallpaper's texture). A frame's foreground is
+then one absolute difference and a threshold. Its icon-sized, roughly square blobs (one contour pass) are the
+icon candidates, instead of windows slid over the wallpaper, and
+ForegroundMask answers which fraction of any window is foreground from one
+integral image, so wallpaper grid cells are dropped before they are scanned.
+
+A frame only updates the model if it reveals wallpaper that was never
+observed (an icon or window moved away), so a static desktop costs one
+subtraction per frame. When most of the frame differs from the model the
+wallpaper changed and the model has to be rebuilt (changed()).
+"""
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+import config
+
+FOREGROUND_THRESHOLD = 20  # gray levels a pixel must differ from the wallpaper by
+INPAINTED_MARGIN = 25  # extra gray levels where the wallpaper was inpainted, not observed
+HINT_DILATION = 9  # px grown around hinted foreground before learning the wallpaper
+MIN_REVEALED_PIXELS = 256  # fewer newly revealed wallpaper pixels: the frame is not learned
+INPAINT_SCALE = 8  # unobserved wallpaper is inpainted at 1/scale resolution
+INPAINT_RADIUS = 3  # px at the inpainting scale
+HINT_ICON_SIZE = 96  # px; the area above a text label hinted as its icon (largest icon size)
+MIN_BLOB_SIZE = 16  # px; smaller foreground blobs are not icons
+MAX_BLOB_SIZE = 128  # px
+MAX_BLOB_ASPECT = 1.6  # icons are roughly square, labels are wide
+
+
+def _median(frames) -> np.ndarray:
+    """Per-pixel median of uint8 frames (min/max network up to three frames)."""
+    if len(frames) == 1:
+        return frames[0].copy()
+    if len(frames) == 2:
+        return cv2.addWeighted(frames[0], 0.5, frames[1], 0.5, 0)
+    if len(frames) == 3:
+        a, b, c = frames
+        return cv2.max(cv2.min(a, b), cv2.min(cv2.max(a, b), c))
+    return np.median(np.stack(frames), axis=0).astype(np.uint8)
+
+
+def label_hint(shape: Tuple[int, int], labels: np.ndarray, boxes: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Foreground hint from a frame's text labels: every label with the
+    icon-sized area above it, plus optional (x, y, w, h) boxes (icon-like
+    components, for a frame without a wallpaper model yet).
+
+    Returns:
+        uint8 mask, 255 = foreground
+    """
+    hint = np.zeros(shape, dtype=np.uint8)
+    half = HINT_ICON_SIZE // 2
+    for label in labels:
+        x, y, width, height = int(label["x"]), int(label["y"]), int(label["w"]), int(label["h"])
+        cx = x + width // 2
+        left, right = min(x, cx - half), max(x + width, cx + half)
+        hint[max(0, y - HINT_ICON_SIZE):y + height, max(0, left):right] = 255
+    if boxes is not None:
+        for x, y, width, height in boxes:
+            hint[max(0, y):y + height, max(0, x):x + width] = 255
+    return hint
+
+
+class ForegroundMask:
+    """Foreground of one frame, with the foreground fraction of any window."""
+
+    def __init__(self, mask: np.ndarray):
+        """
+        Args:
+            mask: uint8 mask, 255 = foreground
+        """
+        self.mask = mask
+        self.fraction = cv2.countNonZero(mask) / float(max(mask.size, 1))
+        self._integral = None  # built on the first fractions() call
+
+    def fractions(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Foreground fraction of every square window.
+
+        Args:
+            centers: (N, 2) window centres
+            sizes: (N,) window sizes
+        """
+        height, width = self.mask.shape
+        half = np.asarray(sizes, dtype=np.int64) // 2
+        cx = np.asarray(centers[:, 0], dtype=np.int64)
+        cy = np.asarray(centers[:, 1], dtype=np.int64)
+        x0, x1 = np.clip(cx - half, 0, width), np.clip(cx + half, 0, width)
+        y0, y1 = np.clip(cy - half, 0, height), np.clip(cy + half, 0, height)
+        area = np.maximum((x1 - x0) * (y1 - y0), 1)
+        if self._integral is None:
+            self._integral = cv2.integral(self.mask // 255, sdepth=cv2.CV_32S)
+        integral = self._integral
+        sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        return sums / area
+
+    def blobs(self) -> np.ndarray:
+        """
+        Icon-sized, roughly square foreground blobs.
+
+        Returns:
+            (N, 4) int64 array of (x, y, width, height)
+        """
+        mask = cv2.morphologyEx(self.mask, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = np.array([cv2.boundingRect(contour) for contour in contours], dtype=np.int64).reshape(-1, 4)
+        width, height = boxes[:, 2], boxes[:, 3]
+        size = np.maximum(width, height)
+        square = size <= MAX_BLOB_ASPECT * np.minimum(width, height)
+        return boxes[(size >= MIN_BLOB_SIZE) & (size <= MAX_BLOB_SIZE) & square]
+
+    def keep(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """Windows with at least config.BACKGROUND_MIN_FOREGROUND foreground (candidate filter)."""
+        return self.fractions(centers, sizes) >= config.BACKGROUND_MIN_FOREGROUND
+
+
+class BackgroundModel:
+    """Wallpaper estimate for one screen resolution."""
+
+    def __init__(self, shape: Tuple[int, int], frames: int = 3):
+        """
+        Args:
+            shape: (height, width) of the frames
+            frames: Observations the per-pixel median is taken over
+        """
+        self.shape = tuple(shape)
+        self.background = None  # uint8 wallpaper estimate, None before the first observation
+        self._margin = None  # uint8, INPAINTED_MARGIN where the estimate is inpainted
+        self.observed = np.zeros(self.shape, dtype=bool)  # wallpaper seen at least once
+        self.observations = 0
+        self._frames = deque(maxlen=frames)
+
+    def observe(self, gray: np.ndarray, hint: np.ndarray) -> bool:
+        """
+        Learn the wallpaper from a frame.
+
+        Args:
+            gray: Grayscale frame
+            hint: uint8 mask, 255 where the frame may show something other
+                than wallpaper (grown by HINT_DILATION before use)
+
+        Returns:
+            Whether the frame revealed enough new wallpaper to be learned
+        """
+        hint = cv2.dilate(hint, np.ones((2 * HINT_DILATION + 1,) * 2, np.uint8))
+        valid = hint == 0
+        revealed = valid & ~self.observed
+        if self.background is not None and np.count_nonzero(revealed) < MIN_REVEALED_PIXELS:
+            return False
+
+        frame = gray.copy()
+        if self.background is not None:
+            # Hidden pixels keep the current estimate; newly revealed ones
+            # replace it in the earlier observations too
+            np.copyto(frame, self.background, where=~valid)
+            for earlier in self._frames:
+                np.copyto(earlier, gray, where=revealed)
+        self._frames.append(frame)
+        self.observed |= valid
+        self.observations += 1
+
+        background = _median(list(self._frames))
+        unobserved = ~self.observed
+        if unobserved.any():
+            height, width = self.shape
+            small_size = (max(1, width // INPAINT_SCALE), max(1, height // INPAINT_SCALE))
+            small = cv2.resize(background, small_size, interpolation=cv2.INTER_AREA)
+            # Any block holding an unobserved pixel is filled from its surroundings
+            small_mask = cv2.resize(unobserved.astype(np.uint8) * 255, small_size, interpolation=cv2.INTER_AREA)
+            small_mask = np.where(small_mask > 0, 255, 0).astype(np.uint8)
+            filled = cv2.inpaint(small, small_mask, INPAINT_RADIUS, cv2.INPAINT_TELEA)
+            filled = cv2.resize(filled, (width, height), interpolation=cv2.INTER_LINEAR)
+            np.copyto(background, filled, where=unobserved)
+        self.background = background
+        self._margin = unobserved.astype(np.uint8) * INPAINTED_MARGIN
+        return True
+
+    def foreground(self, gray: np.ndarray, ignore: Optional[np.ndarray] = None) -> ForegroundMask:
+        """
+        Pixels of a frame that differ from the wallpaper.
+
+        Args:
+            gray: Grayscale frame
+            ignore: Optional boolean mask of pixels that are never foreground
+                (masked windows)
+        """
+        difference = cv2.subtract(cv2.absdiff(gray, self.background), self._margin)
+        _, mask = cv2.threshold(difference, FOREGROUND_THRESHOLD, 255, cv2.THRESH_BINARY)
+        if ignore is not None:
+            mask[ignore] = 0
+        return ForegroundMask(mask)
+
+    @staticmethod
+    def changed(foreground: ForegroundMask) -> bool:
+        """Whether so much of a frame differs from the model that the wallpaper changed."""
+        return foreground.fraction > config.BACKGROUND_CHANGE_FRACTION
@@ -2,13 +2,11 @@
 BotCity-compatible wrapper using pyautogui and opencv.
 This allows the code to work even if BotCity packages aren't available.
 """
-import pyautogui
-import cv2
-import numpy as np
-from pathlib import Path
 import time
-from typing import Optional, Tuple
-import os
+
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import("pyautogui")
 
 class BotCityMaestroSDK:
     """Compatible BotCity Maestro SDK stub."""
@@ -25,6 +23,10 @@ class DesktopBot:
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.1
     
+    def get_screenshot(self, region=None):
+        """Screenshot of the screen (or a (left, top, width, height) region) as a PIL image."""
+        return pyautogui.screenshot(region=region)
+    
     def save_screenshot(self, path: str):
         """Save a screenshot of the screen."""
         screenshot = pyautogui.screenshot()
@@ -0,0 +1,54 @@
+"""
+Reusable frame buffers.
+
+Capturing and analysing a full-resolution frame allocates several large
+arrays (the BGR frame, its gray plane, edge maps, annotation copies). The
+pool hands out one buffer per (name, shape, dtype) and returns the same
+array on every later request, so long runs reuse a fixed set of buffers
+instead of churning new ones. Buffers are filled through cv2 dst= outputs
+or np.copyto and handed to callers as read-only views.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class BufferPool:
+    """Buffers keyed by (name, shape, dtype), allocated on first use."""
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, tuple, np.dtype], np.ndarray] = {}
+
+    def get(self, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """
+        Writable buffer for a role (e.g. "frame", "gray", "edges").
+
+        The contents are whatever the previous user left there; the buffer
+        stays valid (and is overwritten) until the next request with the
+        same key.
+        """
+        key = (name, tuple(shape), np.dtype(dtype))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buffer
+        return buffer
+
+    def clear(self):
+        """Drop all buffers (e.g. after a resolution change)."""
+        self._buffers.clear()
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes held by the pool."""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+def readonly(array: np.ndarray) -> np.ndarray:
+    """Read-only view of an array (the array itself stays writable)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,177 @@
+"""
+Batched HOG + linear candidate classifier.
+
+All candidate crops are sampled from the frame with batched cv2.remap calls
+into one (N, S, S) stack, HOG and intensity features are computed for the
+whole stack with numpy, and a logistic model scores every candidate with one
+matrix multiply. The model is trained offline on synthetic desktops (see
+train_candidate_classifier.py) and shipped as a small .npz file.
+"""
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+CROP_SIZE = 24  # side of the resampled candidate crop
+HOG_CELL = 6  # HOG cell size in crop pixels
+HOG_BINS = 9  # unsigned orientation bins over 0-180 degrees
+PROFILE_BANDS = 6  # horizontal/vertical edge profile bands
+CONTEXT = 1.25  # crop side relative to the candidate size
+REMAP_BATCH = 1024  # crops per remap call (OpenCV maps must stay below 32767 rows)
+
+
+def sample_crops(gray: np.ndarray, centers: np.ndarray, sizes: np.ndarray,
+                 crop_size: int = CROP_SIZE, context: float = CONTEXT) -> np.ndarray:
+    """
+    Resample square crops around every candidate with one remap call per
+    REMAP_BATCH candidates.
+
+    Args:
+        gray: Grayscale frame
+        centers: (N, 2) candidate centres
+        sizes: (N,) candidate sizes in pixels
+        crop_size: Output side length
+        context: Crop side relative to candidate size
+
+    Returns:
+        (N, crop_size, crop_size) uint8 stack
+    """
+    n = len(centers)
+    crops = np.empty((n, crop_size, crop_size), dtype=np.uint8)
+    # Sample points at pixel centres of the output grid
+    offsets = (np.arange(crop_size, dtype=np.float32) + 0.5) / crop_size - 0.5
+
+    for start in range(0, n, REMAP_BATCH):
+        batch = slice(start, min(n, start + REMAP_BATCH))
+        count = batch.stop - batch.start
+        sides = sizes[batch].astype(np.float32) * context
+        map_x = centers[batch, 0, None, None].astype(np.float32) + offsets[None, None, :] * sides[:, None, None]
+        map_y = centers[batch, 1, None, None].astype(np.float32) + offsets[None, :, None] * sides[:, None, None]
+        map_x = np.broadcast_to(map_x, (count, crop_size, crop_size)).reshape(count * crop_size, crop_size)
+        map_y = np.broadcast_to(map_y, (count, crop_size, crop_size)).reshape(count * crop_size, crop_size)
+        out = crops[batch].reshape(count * crop_size, crop_size)
+        cv2.remap(gray, np.ascontiguousarray(map_x), np.ascontiguousarray(map_y),
+                  cv2.INTER_LINEAR, dst=out, borderMode=cv2.BORDER_REPLICATE)
+    return crops
+
+
+def batch_features(crops: np.ndarray) -> np.ndarray:
+    """
+    HOG and intensity features for a stack of crops.
+
+    Returns:
+        (N, F) float32 feature matrix
+    """
+    n, size, _ = crops.shape
+    # Gradients of the whole stack as one (N * S, S) image; the rows and
+    # columns on crop borders are zeroed so crops never see each other
+    flat = crops.reshape(n * size, size)
+    gx = cv2.Sobel(flat, cv2.CV_32F, 1, 0, ksize=1).reshape(n, size, size)
+    gy = cv2.Sobel(flat, cv2.CV_32F, 0, 1, ksize=1).reshape(n, size, size)
+    gx[:, :, [0, -1]] = 0
+    gy[:, [0, -1], :] = 0
+    magnitude, angle = cv2.cartToPolar(gx.reshape(n * size, size), gy.reshape(n * size, size),
+                                       angleInDegrees=True)
+
+    # HOG: magnitude-weighted orientation histogram per cell, via one bincount
+    cells = size // HOG_CELL
+    # Unsigned orientation: 0-360 degrees folded onto HOG_BINS bins over 0-180
+    bins = (angle * (HOG_BINS / 180.0)).astype(np.int32) % HOG_BINS
+    cell_index = (np.arange(size) // HOG_CELL).clip(max=cells - 1)
+    cell_ids = cell_index[:, None] * cells + cell_index[None, :]
+    flat_index = (np.arange(n, dtype=np.int32)[:, None, None] * (cells * cells) + cell_ids[None]) * HOG_BINS \
+        + bins.reshape(n, size, size)
+    hog = np.bincount(flat_index.ravel(), weights=magnitude.ravel(),
+                      minlength=n * cells * cells * HOG_BINS).reshape(n, -1)
+    hog /= np.linalg.norm(hog, axis=1, keepdims=True) + 1e-6
+    hog = np.minimum(hog, 0.2)  # L2-Hys clipping
+    hog /= np.linalg.norm(hog, axis=1, keepdims=True) + 1e-6
+
+    # Intensity features: brightness, contrast and edge profiles
+    band = size // PROFILE_BANDS
+    row_profile = np.abs(gy[:, :band * PROFILE_BANDS]).reshape(n, PROFILE_BANDS, -1).mean(axis=2)
+    col_profile = np.abs(gx[:, :, :band * PROFILE_BANDS]).reshape(n, size, PROFILE_BANDS, band).mean(axis=(1, 3))
+    pixels = flat.reshape(n, size * size).astype(np.float32)
+    intensity = np.stack([pixels.mean(axis=1) / 255.0, pixels.std(axis=1) / 128.0], axis=1)
+
+    return np.hstack([hog, intensity, row_profile / 255.0, col_profile / 255.0]).astype(np.float32)
+
+
+class CandidateClassifier:
+    """Logistic model over batch features: p = sigmoid(((X - mean) / std) @ w + b)."""
+
+    def __init__(self, weights: np.ndarray, bias: float,
+                 feature_mean: np.ndarray, feature_std: np.ndarray,
+                 crop_size: int = CROP_SIZE, context: float = CONTEXT):
+        self.crop_size = int(crop_size)
+        self.context = float(context)
+        # Fold the standardisation into the weights: one matmul at run time
+        self.weights = (weights / feature_std).astype(np.float32)
+        self.bias = float(bias - np.dot(feature_mean / feature_std, weights))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CandidateClassifier":
+        """Load a model saved by train_candidate_classifier.py."""
+        data = np.load(str(path))
+        return cls(data["weights"], float(data["bias"]), data["feature_mean"],
+                   data["feature_std"], int(data["crop_size"]), float(data["context"]))
+
+    def predict_features(self, features: np.ndarray) -> np.ndarray:
+        """Probabilities for a precomputed (N, F) feature matrix."""
+        logits = features @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score(self, gray: np.ndarray, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Score every candidate in one batch.
+
+        Args:
+            gray: Grayscale frame
+            centers: (N, 2) candidate centres
+            sizes: (N,) candidate sizes
+
+        Returns:
+            (N,) probabilities that each candidate is the target icon
+        """
+        crops = sample_crops(gray, centers, sizes, self.crop_size, self.context)
+        return self.predict_features(batch_features(crops))
+
+
+_cache = {}
+
+
+def load_classifier(path: Union[str, Path]) -> Optional[CandidateClassifier]:
+    """Load (and cache) a classifier; None if the model file is missing."""
+    path = Path(path)
+    key = str(path)
+    if key not in _cache:
+        _cache[key] = CandidateClassifier.load(path) if path.exists() else None
+    return _cache[key]
+
+
+def train_logistic(features: np.ndarray, labels: np.ndarray, l2: float = 1e-2,
+                   epochs: int = 500, learning_rate: float = 0.5) -> Tuple[np.ndarray, float, np.ndarray, np.ndarray]:
+    """
+    Fit a class-balanced, L2-regularised logistic regression by gradient descent.
+
+    Returns:
+        (weights, bias, feature_mean, feature_std)
+    """
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-6
+    x = (features - mean) / std
+    y = labels.astype(np.float64)
+
+    positives = max(1.0, y.sum())
+    negatives = max(1.0, len(y) - y.sum())
+    sample_weight = np.where(y > 0, len(y) / (2 * positives), len(y) / (2 * negatives))
+
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        error = (p - y) * sample_weight
+        weights -= learning_rate * (x.T @ error / len(y) + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return weights.astype(np.float32), float(bias), mean.astype(np.float32), std.astype(np.float32)
@@ -0,0 +1,139 @@
+"""
+Single-pass icon candidate extraction with connected components.
+
+Builds a binary map (Canny edges or adaptive threshold), closes small gaps
+with morphology and labels it with cv2.connectedComponentsWithStats. Every
+icon-sized, roughly square component is returned as one row of a structured
+numpy array, so the whole frame is processed in one O(pixels) pass.
+"""
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# One row per candidate region, in frame coordinates
+CANDIDATE_DTYPE = np.dtype([
+    ("x", np.int32),
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("area", np.int32),
+    ("score", np.float32),
+])
+
+
+def empty_candidates() -> np.ndarray:
+    """An empty candidate array."""
+    return np.zeros(0, dtype=CANDIDATE_DTYPE)
+
+
+def candidate_centers(candidates: np.ndarray) -> np.ndarray:
+    """(N, 2) int array of candidate centre points."""
+    return np.stack([candidates["x"] + candidates["w"] // 2,
+                     candidates["y"] + candidates["h"] // 2], axis=1)
+
+
+class CandidateExtractor:
+    """
+    Reusable connected-components candidate extractor.
+
+    Structuring elements and intermediate buffers are allocated once and
+    reused across calls with the same frame size.
+    """
+
+    def __init__(self, min_size: int = 20, max_size: int = 150,
+                 min_aspect: float = 0.7, max_aspect: float = 1.3,
+                 method: str = "edges", close_size: int = 3,
+                 block_size: int = 15, threshold_c: int = 5):
+        """
+        Args:
+            min_size: Minimum icon width/height in pixels
+            max_size: Maximum icon width/height in pixels
+            min_aspect: Minimum width/height ratio
+            max_aspect: Maximum width/height ratio
+            method: "edges" (Canny) or "adaptive" (adaptive threshold)
+            close_size: Size of the closing kernel that joins icon parts
+            block_size: Neighbourhood size for the adaptive threshold
+            threshold_c: Constant subtracted in the adaptive threshold
+        """
+        if method not in ("edges", "adaptive"):
+            raise ValueError(f"Unknown candidate extraction method: {method}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_aspect = min_aspect
+        self.max_aspect = max_aspect
+        self.method = method
+        self.block_size = block_size
+        self.threshold_c = threshold_c
+        self._close_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (close_size, close_size))
+        self._binary = None
+        self._closed = None
+
+    def _buffers(self, shape):
+        if self._binary is None or self._binary.shape != shape:
+            self._binary = np.empty(shape, dtype=np.uint8)
+            self._closed = np.empty(shape, dtype=np.uint8)
+        return self._binary, self._closed
+
+    def binary_map(self, gray: np.ndarray) -> np.ndarray:
+        """Foreground map used for labelling (reused buffer, valid until the next call)."""
+        binary, closed = self._buffers(gray.shape[:2])
+        if self.method == "edges":
+            cv2.Canny(gray, 50, 150, edges=binary)
+        else:
+            cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                  self.block_size, self.threshold_c, dst=binary)
+        cv2.morphologyEx(binary, cv2.MORPH_CLOSE, self._close_kernel, dst=closed)
+        return closed
+
+    def extract(self, gray: np.ndarray, scale: int = 1,
+                mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Extract icon candidates.
+
+        Args:
+            gray: Grayscale frame (possibly downsampled)
+            scale: Integer factor the frame was downsampled by; size limits
+                are divided by it and results are mapped back to full-res
+                coordinates
+            mask: Optional uint8 mask, only non-zero pixels are considered
+
+        Returns:
+            Structured array (CANDIDATE_DTYPE), best score first
+        """
+        binary = self.binary_map(gray)
+        if mask is not None:
+            cv2.bitwise_and(binary, mask, dst=binary)
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = stats[1:]  # drop the background component
+
+        x, y = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+        w, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+        pixels = stats[:, cv2.CC_STAT_AREA]
+
+        min_size = self.min_size / float(scale)
+        max_size = self.max_size / float(scale)
+        aspect = w / np.maximum(h, 1)
+        keep = ((w >= min_size) & (w <= max_size) & (h >= min_size) & (h <= max_size) &
+                (aspect >= self.min_aspect) & (aspect <= self.max_aspect))
+
+        candidates = np.zeros(int(np.count_nonzero(keep)), dtype=CANDIDATE_DTYPE)
+        if len(candidates) == 0:
+            return candidates
+
+        w, h, pixels, aspect = w[keep], h[keep], pixels[keep], aspect[keep]
+        box_area = (w * h).astype(np.float32)
+        # Squareness times size, damped for sparse outlines (a lone ring of
+        # edges is less icon-like than a detailed glyph)
+        squareness = 1.0 - np.abs(1.0 - aspect)
+        fill = pixels / box_area
+        score = squareness * np.sqrt(box_area) * np.minimum(1.0, fill / 0.15)
+
+        candidates["x"] = x[keep] * scale
+        candidates["y"] = y[keep] * scale
+        candidates["w"] = w * scale
+        candidates["h"] = h * scale
+        candidates["area"] = pixels * (scale * scale)
+        candidates["score"] = score
+        return candidates[np.argsort(-candidates["score"], kind="stable")]
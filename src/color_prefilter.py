@@ -0,0 +1,80 @@
+"""
+Hue-saturation prefilter for icon candidates.
+
+The gray-level strategies ignore colour, which is the cheapest evidence for
+or against a candidate. A hue-saturation histogram of the target icon is
+built once from its template (background pixels excluded), back-projected
+once over a downsampled copy of the frame, and every candidate box is scored
+by its mean back-projection relative to the template's own score. Candidates
+that hardly contain the icon's colours are dropped before Canny, OCR or
+classifier scoring runs on them.
+"""
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+HUE_BINS = 30
+SATURATION_BINS = 32
+HISTOGRAM_RANGES = [0, 180, 0, 256]
+FOREGROUND_DISTANCE = 60  # L1 BGR distance from the template's border colour
+BACK_PROJECTION_SCALE = 2  # the frame is back-projected at 1/scale resolution
+
+
+def foreground_mask(template: np.ndarray) -> np.ndarray:
+    """Pixels of a BGR template that differ from its (median) border colour."""
+    border = np.concatenate([template[0], template[-1], template[:, 0], template[:, -1]])
+    background = np.median(border, axis=0).astype(np.int16)
+    distance = np.abs(template.astype(np.int16) - background).sum(axis=2)
+    return np.where(distance > FOREGROUND_DISTANCE, 255, 0).astype(np.uint8)
+
+
+class ColorModel(NamedTuple):
+    """Hue-saturation histogram of an icon."""
+    histogram: np.ndarray  # (HUE_BINS, SATURATION_BINS) float32, scaled to 0..255
+    self_score: float  # mean back-projection over the template's foreground (0..255)
+
+    @classmethod
+    def from_template(cls, template: np.ndarray) -> "ColorModel":
+        """Build the model from a BGR template."""
+        mask = foreground_mask(template)
+        if not mask.any():
+            mask = None  # flat template: use every pixel
+        hsv = cv2.cvtColor(template, cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([hsv], [0, 1], mask, [HUE_BINS, SATURATION_BINS], HISTOGRAM_RANGES)
+        cv2.normalize(histogram, histogram, 0, 255, cv2.NORM_MINMAX)
+        projection = cv2.calcBackProject([hsv], [0, 1], histogram, HISTOGRAM_RANGES, 1)
+        self_score = cv2.mean(projection, mask=mask)[0]
+        return cls(histogram, max(float(self_score), 1.0))
+
+    def back_project(self, frame: np.ndarray) -> np.ndarray:
+        """Back-projection (uint8, 255 = icon colour) of a BGR frame at 1/BACK_PROJECTION_SCALE."""
+        scale = BACK_PROJECTION_SCALE
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        return cv2.calcBackProject([hsv], [0, 1], self.histogram, HISTOGRAM_RANGES, 1)
+
+    def scores(self, projection: np.ndarray, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Relative colour score of every candidate box (1.0 = as icon-coloured
+        as the template), from one integral image of the back-projection.
+
+        Args:
+            projection: Output of back_project
+            centers: (N, 2) full-resolution candidate centres
+            sizes: (N,) full-resolution candidate sizes
+        """
+        scale = BACK_PROJECTION_SCALE
+        height, width = projection.shape
+        integral = cv2.integral(projection, sdepth=cv2.CV_64F)
+        half = np.asarray(sizes, dtype=np.float64) / (2.0 * scale)
+        cx = np.asarray(centers[:, 0], dtype=np.float64) / scale
+        cy = np.asarray(centers[:, 1], dtype=np.float64) / scale
+        x0 = np.clip(np.round(cx - half), 0, width).astype(np.int64)
+        x1 = np.clip(np.round(cx + half), 0, width).astype(np.int64)
+        y0 = np.clip(np.round(cy - half), 0, height).astype(np.int64)
+        y1 = np.clip(np.round(cy + half), 0, height).astype(np.int64)
+        area = np.maximum((x1 - x0) * (y1 - y0), 1)
+        sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        return sums / area / self.self_score
@@ -1,5 +1,4 @@
 """Configuration settings for the desktop automation project."""
-import os
 from pathlib import Path
 
 # Desktop paths
@@ -10,29 +9,93 @@ PROJECT_DIR = DESKTOP_PATH / "tjm-project"
 API_BASE_URL = "https://jsonplaceholder.typicode.com"
 POSTS_ENDPOINT = f"{API_BASE_URL}/posts"
 MAX_POSTS = 10
+API_CONNECT_TIMEOUT = 2.0  # seconds
+API_READ_TIMEOUT = 3.0  # seconds per attempt
+API_MAX_ATTEMPTS = 4  # Attempts per request (jittered exponential backoff between them)
+API_DEADLINE = 10.0  # seconds for all attempts of one request
+API_HEDGE = True  # Duplicate an attempt still pending after the observed p95 latency
+API_BREAKER_FAILURES = 3  # Consecutive failed requests that open the circuit breaker
+API_BREAKER_RESET = 30.0  # seconds before an open breaker lets a trial request through
+API_CACHE_PATH = Path(".cache") / "api_responses.json"  # Last good responses, served when the API fails (None: memory only)
 
 # Icon Detection Configuration
-ICON_SEARCH_REGION = None  # None means full screen
+ICON_SEARCH_REGION = None  # (left, top, width, height) in screen pixels; None means full screen
+ICON_MASK_TASKBAR = True  # Clip the search to the desktop work area (excludes the taskbar)
+ICON_MASK_WINDOWS = True  # Mask out visible application windows (needs a window tracker)
+ICON_MASK_IGNORE_TITLES = ("Program Manager",)  # Desktop windows that must not be masked
 ICON_CONFIDENCE = 0.7  # Minimum confidence for icon detection
 ICON_RETRY_ATTEMPTS = 3
 ICON_RETRY_DELAY = 1.0  # seconds
+ICON_GRID_INFERENCE = True  # Score only desktop grid cells once the icon grid is known
+ICON_PYRAMID_LEVELS = 1  # Coarse-to-fine search on a 2**levels downsampled frame (0 = full resolution only)
+FRAME_BUFFER_POOL = True  # Reuse frame, gray and annotation buffers across captures
+ICON_COLOR_PREFILTER = True  # Drop candidates without the Notepad icon's colours before label/classifier checks
+ICON_COLOR_MIN_SCORE = 0.5  # Minimum hue-saturation back-projection score relative to the template's own
+ICON_LABEL_DETECTION = True  # Detect text labels once per frame and join them to candidates (False: fixed-offset box below each icon)
+ICON_BACKGROUND_MODEL = True  # Learn the wallpaper per resolution; candidates come from the blobs that differ from it
+BACKGROUND_FRAMES = 3  # Observations the wallpaper estimate is the per-pixel median of
+BACKGROUND_MIN_FOREGROUND = 0.1  # Minimum fraction of a candidate window that differs from the wallpaper
+BACKGROUND_CHANGE_FRACTION = 0.3  # More of the frame differing from the model means the wallpaper changed (model rebuilt)
+LABEL_FONTS = ("segoeui.ttf", "DejaVuSans.ttf")  # Desktop UI fonts the target label is rendered in for OCR-free matching
+LABEL_MATCH_MIN_SCORE = 0.6  # Minimum correlation of a label with the rendered target string
+STRATEGY_ORDER = None  # e.g. ("template", "label_text", "generic") forces these strategies in this order
+STRATEGY_STATS_PATH = Path(".cache") / "strategy_stats.json"  # Per-strategy latency and hit counts for the adaptive order
+GROUNDING_BUDGET = None  # Seconds per find_notepad_icon call: best candidate found by the deadline, cheapest strategies first (None: no deadline)
+ANYTIME_ACCEPT_CONFIDENCE = 0.7  # With a budget, stop at the first candidate at least this confident
 
 # Notepad Configuration
 NOTEPAD_WINDOW_TITLE = "Notepad"
 NOTEPAD_LAUNCH_TIMEOUT = 5.0  # seconds
 NOTEPAD_CLOSE_DELAY = 0.5  # seconds
 
+# Input actions (see action_plan.py)
+ACTION_PLAN_REPORT = True  # Print estimated vs measured time of every action plan
+
 # Screenshot Configuration
 SCREENSHOT_DIR = Path("screenshots")
-SCREENSHOT_DIR.mkdir(exist_ok=True)
+GROUNDING_RECORD_DIR = None  # e.g. Path("recordings") / "session1" to record frames for replay_grounding.py
+EVIDENCE_DIR = Path("evidence")  # Per-post icon crops, thumbnails and delta-encoded frames; None saves full annotated PNGs of the first 3 posts instead
+TIMINGS_DIR = Path("timings")  # Per-run stage timings (JSONL + Chrome trace); None disables the export
+
+# Memory instrumentation (see memory_monitor.py)
+MEMORY_PROFILE = False  # RSS after every stage, tracemalloc snapshot and top allocation growth after every post (slows the run)
+MEMORY_TOP_ALLOCATIONS = 10  # Allocation sites reported per post
+MEMORY_WARMUP_POSTS = 3  # Posts before growth counts as steady state (caches, pools, lazy imports)
+MEMORY_GROWTH_BUDGET = 512 * 1024  # Bytes per post of steady-state RSS or traced growth; bench_memory.py fails above it
 
 # Icon Template Configuration
 ICON_TEMPLATE_DIR = Path("resources") / "icons"
-ICON_TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
 NOTEPAD_ICON_TEMPLATE = ICON_TEMPLATE_DIR / "notepad_icon.png"
+TEMPLATE_CACHE_DIR = Path(".cache") / "templates"  # Templates harvested from confirmed detections (None disables)
+TEMPLATE_CACHE_MAX_MISSES = 3  # Consecutive misses before a harvested template is evicted
+
+# Keypoint matching against the templates (see feature_index.py)
+FEATURE_INDEX_CACHE = Path(".cache") / "template_features.npz"
+FEATURE_MATCH_MIN_INLIERS = 6
+
+# Candidate classifier (see train_candidate_classifier.py)
+CANDIDATE_MODEL_PATH = Path("resources") / "models" / "notepad_candidate_classifier.npz"
+CANDIDATE_MIN_PROBABILITY = 0.5
 
 # File Format
 FILE_FORMAT = "Title: {title}\n\n{body}"
 
-# Create project directory if it doesn't exist
-PROJECT_DIR.mkdir(parents=True, exist_ok=True)
+# Startup benchmark budget (see bench_startup.py)
+STARTUP_IMPORT_BUDGET_MS = 300
+
+_created_dirs = set()
+
+def ensure_dir(path: Path) -> Path:
+    """
+    Create a directory on first use instead of at import time.
+
+    Args:
+        path: Directory to create (parents included)
+
+    Returns:
+        The same path, for chaining
+    """
+    if path not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(path)
+    return path
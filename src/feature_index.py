@@ -0,0 +1,203 @@
+"""
+ORB keypoint index over the icon templates.
+
+Descriptors for every template in the template directory are computed once
+(on an upscaled copy, so small icons still yield enough keypoints and the
+ORB pyramid covers icons smaller and larger than the template), stored in a
+single LSH (FLANN) matcher and cached on disk. A frame's keypoints are then
+matched against all templates in one knn query, and every template with
+enough consistent matches is localised with a RANSAC similarity transform
+(scale, rotation, translation), which tolerates scaled, re-themed and
+partially covered icons.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import cv2
+import numpy as np
+
+CACHE_VERSION = 1
+
+ORB_PARAMS = dict(scaleFactor=1.2, edgeThreshold=15, patchSize=15, fastThreshold=10)
+TEMPLATE_UPSCALE = 2.0  # templates are described at this scale
+TEMPLATE_LEVELS = 8  # ORB pyramid levels for templates (2.0 down to ~0.56x)
+TEMPLATE_FEATURES = 1000
+FRAME_LEVELS = 3
+FRAME_FEATURES = 5000
+
+LSH_INDEX_PARAMS = dict(algorithm=6, table_number=6, key_size=12, multi_probe_level=1)  # FLANN_INDEX_LSH
+LSH_SEARCH_PARAMS = dict(checks=50)
+
+RATIO_TEST = 0.8  # Lowe's ratio test on the two nearest descriptors
+RANSAC_THRESHOLD = 3.0  # px
+MIN_SCALE = 0.4
+MAX_SCALE = 2.5
+
+
+class FrameFeatures(NamedTuple):
+    """ORB keypoints of one frame."""
+    points: np.ndarray  # (N, 2) float32 keypoint positions
+    descriptors: Optional[np.ndarray]  # (N, 32) uint8, None without keypoints
+
+
+class FeatureMatch(NamedTuple):
+    """A template localised in a frame."""
+    name: str
+    center: tuple  # (x, y) of the template centre in the frame
+    inliers: int
+    scale: float
+    homography: np.ndarray  # 3x3 template -> frame transform
+
+
+def detect_frame_features(gray: np.ndarray, n_features: int = FRAME_FEATURES) -> FrameFeatures:
+    """Detect and describe ORB keypoints of a grayscale frame."""
+    orb = cv2.ORB_create(n_features, nlevels=FRAME_LEVELS, **ORB_PARAMS)
+    keypoints, descriptors = orb.detectAndCompute(gray, None)
+    points = np.float32([kp.pt for kp in keypoints]).reshape(-1, 2)
+    return FrameFeatures(points, descriptors)
+
+
+def _template_files(template_dir: Path) -> List[Path]:
+    return sorted(p for p in Path(template_dir).glob("*.png") if p.is_file())
+
+
+def _cache_key(files: List[Path]) -> str:
+    """Identifies the template set and extraction settings a cache was built from."""
+    stats = [(p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in files]
+    return json.dumps({"version": CACHE_VERSION, "files": stats,
+                       "orb": ORB_PARAMS, "upscale": TEMPLATE_UPSCALE,
+                       "levels": TEMPLATE_LEVELS, "features": TEMPLATE_FEATURES})
+
+
+class FeatureIndex:
+    """ORB descriptors of all templates in one LSH matcher."""
+
+    def __init__(self, names: List[str], sizes: List[tuple],
+                 points: List[np.ndarray], descriptors: List[np.ndarray]):
+        """
+        Args:
+            names: Template names (file stems)
+            sizes: (width, height) of every template
+            points: Per template (N, 2) keypoint positions in template pixels
+            descriptors: Per template (N, 32) ORB descriptors
+        """
+        self.names = names
+        self.sizes = sizes
+        self.points = points
+        self.descriptors = descriptors
+        self._matcher = None  # no templates with keypoints: nothing to match
+        if any(len(d) for d in descriptors):
+            self._matcher = cv2.FlannBasedMatcher(LSH_INDEX_PARAMS, LSH_SEARCH_PARAMS)
+            # Templates without keypoints keep their slot so image indexes line up
+            self._matcher.add([d if len(d) else np.zeros((1, 32), np.uint8) for d in descriptors])
+            self._matcher.train()
+
+    @classmethod
+    def build(cls, template_dir: Union[str, Path]) -> "FeatureIndex":
+        """Describe every template in the directory."""
+        orb = cv2.ORB_create(TEMPLATE_FEATURES, nlevels=TEMPLATE_LEVELS, **ORB_PARAMS)
+        names, sizes, points, descriptors = [], [], [], []
+        for path in _template_files(Path(template_dir)):
+            template = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                continue
+            upscaled = cv2.resize(template, None, fx=TEMPLATE_UPSCALE, fy=TEMPLATE_UPSCALE,
+                                  interpolation=cv2.INTER_CUBIC)
+            keypoints, desc = orb.detectAndCompute(upscaled, None)
+            names.append(path.stem)
+            sizes.append((template.shape[1], template.shape[0]))
+            points.append(np.float32([kp.pt for kp in keypoints]).reshape(-1, 2) / TEMPLATE_UPSCALE)
+            descriptors.append(desc if desc is not None else np.zeros((0, 32), np.uint8))
+        return cls(names, sizes, points, descriptors)
+
+    @classmethod
+    def load_or_build(cls, template_dir: Union[str, Path], cache_path: Union[str, Path]) -> "FeatureIndex":
+        """
+        Load the index from the disk cache, rebuilding (and re-caching) it if
+        the templates or extraction settings changed.
+        """
+        cache_path = Path(cache_path)
+        key = _cache_key(_template_files(Path(template_dir)))
+        if cache_path.exists():
+            try:
+                index = cls.load(cache_path, key)
+                if index is not None:
+                    return index
+            except (OSError, ValueError, KeyError):
+                pass  # corrupt cache, rebuild below
+        index = cls.build(template_dir)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            index.save(cache_path, key)
+        except OSError as e:
+            print(f"Could not cache template features: {e}")
+        return index
+
+    def save(self, path: Path, key: str):
+        """Write descriptors and keypoints to an .npz file."""
+        arrays = {"key": np.array(key), "names": np.array(self.names),
+                  "sizes": np.array(self.sizes, dtype=np.int32).reshape(-1, 2)}
+        for i, (pts, desc) in enumerate(zip(self.points, self.descriptors)):
+            arrays[f"points_{i}"] = pts
+            arrays[f"descriptors_{i}"] = desc
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> Optional["FeatureIndex"]:
+        """Read an index saved with save(); None if it was built from other templates."""
+        with np.load(str(path)) as data:
+            if str(data["key"]) != key:
+                return None
+            names = [str(n) for n in data["names"]]
+            sizes = [tuple(int(v) for v in s) for s in data["sizes"]]
+            points = [data[f"points_{i}"] for i in range(len(names))]
+            descriptors = [data[f"descriptors_{i}"] for i in range(len(names))]
+        return cls(names, sizes, points, descriptors)
+
+    def match(self, frame: FrameFeatures, min_inliers: int = 6) -> Dict[str, FeatureMatch]:
+        """
+        Localise every template in a frame.
+
+        All frame descriptors are matched against all templates in one knn
+        query; matches passing the ratio test are grouped by template and
+        each group is fitted with a RANSAC similarity transform.
+
+        Returns:
+            Template name -> FeatureMatch, for templates with at least
+            min_inliers consistent matches and a plausible scale (empty
+            when the index holds no descriptors)
+        """
+        if self._matcher is None or frame.descriptors is None or len(frame.descriptors) < 2:
+            return {}
+
+        groups = {}
+        for pair in self._matcher.knnMatch(frame.descriptors, k=2):
+            if len(pair) == 2 and pair[0].distance < RATIO_TEST * pair[1].distance:
+                best = pair[0]
+                groups.setdefault(best.imgIdx, []).append((best.queryIdx, best.trainIdx))
+
+        results = {}
+        for image_index, pairs in groups.items():
+            if len(pairs) < min_inliers or not len(self.points[image_index]):
+                continue
+            query, train = np.array(pairs).T
+            src = self.points[image_index][train]
+            dst = frame.points[query]
+            transform, inliers = cv2.estimateAffinePartial2D(
+                src, dst, method=cv2.RANSAC, ransacReprojThreshold=RANSAC_THRESHOLD)
+            if transform is None:
+                continue
+            inlier_count = int(np.count_nonzero(inliers))
+            scale = float(np.hypot(transform[0, 0], transform[1, 0]))
+            if inlier_count < min_inliers or not MIN_SCALE <= scale <= MAX_SCALE:
+                continue
+
+            homography = np.vstack([transform, [0.0, 0.0, 1.0]])
+            width, height = self.sizes[image_index]
+            center = cv2.perspectiveTransform(np.float32([[[width / 2.0, height / 2.0]]]), homography)[0, 0]
+            name = self.names[image_index]
+            results[name] = FeatureMatch(name, (int(round(center[0])), int(round(center[1]))),
+                                         inlier_count, scale, homography)
+        return results
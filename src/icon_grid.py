@@ -0,0 +1,152 @@
+"""
+Desktop icon grid inference.
+
+Desktop icons sit on a regular grid. The grid spacing and origin are fitted
+to the column and row projections of detected icon candidate centres, so
+later scans only need to score the known cell positions instead of sliding
+windows over the whole screen.
+"""
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Plausible grid spacings in pixels (small icons at 100% to large at 200%)
+MIN_SPACING = 40
+MAX_SPACING = 260
+
+# Largest plausible cell size relative to the icon size
+MAX_CELL_TO_ICON_RATIO = 3.0
+
+
+class GridModel(NamedTuple):
+    """A fitted desktop icon grid, in frame coordinates."""
+    origin: Tuple[float, float]  # centre of the icon in the first cell
+    spacing: Tuple[float, float]  # (x, y) distance between cells
+    icon_size: int  # icon window size in pixels
+    frame_size: Tuple[int, int]  # (width, height) the model was fitted on
+    fit_ratio: float  # fraction of candidates that sit on grid nodes
+
+    def cell_centers(self) -> np.ndarray:
+        """(N, 2) array of icon centres for every cell inside the frame."""
+        width, height = self.frame_size
+        half = self.icon_size // 2
+        xs = np.arange(self.origin[0], width - half, self.spacing[0])
+        ys = np.arange(self.origin[1], height - half, self.spacing[1])
+        xs = xs[xs >= half]
+        ys = ys[ys >= half]
+        grid_x, grid_y = np.meshgrid(xs, ys, indexing="ij")
+        return np.round(np.stack([grid_x.ravel(), grid_y.ravel()], axis=1)).astype(np.int32)
+
+
+def _comb_fit(values: np.ndarray, spacing: float, phase: float, tolerance: float):
+    """Fraction of values within tolerance of the comb phase + k * spacing."""
+    distance = np.abs((values - phase + spacing / 2.0) % spacing - spacing / 2.0)
+    on_comb = distance <= tolerance
+    return float(np.count_nonzero(on_comb)) / len(values), on_comb
+
+
+def _refine_comb(values: np.ndarray, spacing: float, phase: float, on_comb: np.ndarray):
+    """Least-squares (spacing, phase) from the values on the comb."""
+    points = values[on_comb]
+    index = np.round((points - phase) / spacing)
+    if len(np.unique(index)) < 2:
+        # All points on one tooth: only the phase can be refined
+        return spacing, float(np.mean(points - index * spacing))
+    new_spacing, new_phase = np.polyfit(index, points, 1)
+    return float(new_spacing), float(new_phase)
+
+
+def estimate_axis(values: np.ndarray, tolerance: int,
+                  min_spacing: int = MIN_SPACING,
+                  max_spacing: int = MAX_SPACING) -> Optional[Tuple[float, float, float]]:
+    """
+    Fit a 1-D comb (spacing, phase) to the projection of icon centres.
+
+    Every integer spacing in range is tried; its phase comes from the folded
+    projection and both are then refined by least squares, so small spacing
+    errors do not accumulate across many cells. Spacings are ranked by the
+    fraction of centres on the comb minus the fraction expected by chance,
+    which penalises sub-multiples (everything fits a tiny spacing) without
+    needing icons in adjacent cells.
+
+    Returns:
+        (spacing, phase, on-grid fraction), or None with fewer than 2 values
+    """
+    if len(values) < 2:
+        return None
+    values = values.astype(np.float64)
+
+    best = None
+    for spacing in range(min_spacing, max_spacing + 1):
+        phase = float(circular_phase(values, spacing, tolerance))
+        fit, on_comb = _comb_fit(values, spacing, phase, tolerance)
+        if not on_comb.any():
+            continue
+        refined_spacing, refined_phase = _refine_comb(values, spacing, phase, on_comb)
+        if min_spacing <= refined_spacing <= max_spacing:
+            refined_fit, _ = _comb_fit(values, refined_spacing, refined_phase, tolerance)
+            if refined_fit >= fit:
+                spacing, phase, fit = refined_spacing, refined_phase, refined_fit
+        score = fit - (2 * tolerance + 1) / float(spacing)
+        if best is None or score > best[0] + 1e-9:
+            best = (score, spacing, phase % spacing, fit)
+    if best is None:
+        return None
+    return best[1], best[2], best[3]
+
+
+def circular_phase(values: np.ndarray, period: int, tolerance: int) -> int:
+    """Phase in [0, period) supported by the most values (within tolerance)."""
+    phases = np.mod(values, period).astype(np.int64)
+    histogram = np.bincount(phases, minlength=period)[:period].astype(np.float64)
+    # Circular box smoothing so phases near 0 and period-1 support each other
+    kernel = np.ones(2 * tolerance + 1)
+    padded = np.concatenate([histogram[-tolerance:], histogram, histogram[:tolerance]])
+    support = np.convolve(padded, kernel, mode="valid")
+    return int(np.argmax(support))
+
+
+def fit_grid(frame_size: Tuple[int, int], centers: np.ndarray, sizes: np.ndarray,
+             min_candidates: int = 3, min_fit_ratio: float = 0.6,
+             tolerance: int = 6) -> Optional[GridModel]:
+    """
+    Fit a desktop icon grid.
+
+    Args:
+        frame_size: (width, height) of the frame
+        centers: (N, 2) icon candidate centres
+        sizes: (N,) icon candidate sizes
+        min_candidates: Minimum candidates on grid nodes for a valid fit
+        min_fit_ratio: Minimum fraction of candidates on grid nodes
+        tolerance: Max distance (px) from a grid node to count as on-grid
+
+    Returns:
+        GridModel, or None if no consistent grid was found
+    """
+    if len(centers) < min_candidates:
+        return None
+
+    width, height = frame_size
+    # A cell holds one icon plus its label, so the spacing is bounded by the
+    # typical icon size; this rules out multiples of the true spacing when
+    # only every other row or column is occupied
+    typical_size = float(np.median(sizes))
+    min_spacing = max(MIN_SPACING, int(typical_size))
+    max_spacing = min(MAX_SPACING, int(typical_size * MAX_CELL_TO_ICON_RATIO))
+    x_axis = estimate_axis(centers[:, 0], tolerance, min_spacing, min(max_spacing, width // 2))
+    y_axis = estimate_axis(centers[:, 1], tolerance, min_spacing, min(max_spacing, height // 2))
+    if x_axis is None or y_axis is None:
+        return None
+    spacing_x, origin_x, _ = x_axis
+    spacing_y, origin_y, _ = y_axis
+
+    dx = np.abs((centers[:, 0] - origin_x + spacing_x / 2.0) % spacing_x - spacing_x / 2.0)
+    dy = np.abs((centers[:, 1] - origin_y + spacing_y / 2.0) % spacing_y - spacing_y / 2.0)
+    on_grid = (dx <= tolerance) & (dy <= tolerance)
+    fit_ratio = float(np.count_nonzero(on_grid)) / len(centers)
+    if np.count_nonzero(on_grid) < min_candidates or fit_ratio < min_fit_ratio:
+        return None
+
+    icon_size = int(np.median(sizes[on_grid]))
+    return GridModel((origin_x, origin_y), (spacing_x, spacing_y), icon_size,
+                     (width, height), fit_ratio)
@@ -1,56 +1,499 @@
-import cv2
-import numpy as np
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+import copy
+import difflib
+import importlib.util
+import sys
+import threading
 import time
-try:
-    from botcity.core import BotCityMaestroSDK, DesktopBot
-    from botcity.core.backend import Backend
-except ImportError:
-    from botcity_compat import DesktopBot, BotCityMaestroSDK
-import pyautogui
-from PIL import Image
-import os
+
+import config
+from lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    from botcity_compat import DesktopBot
+    from window_tracker import WindowTracker
+
+# Heavy imports are deferred until a grounding method actually runs
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+pyautogui = lazy_import("pyautogui")
+candidate_extractor = lazy_import("candidate_extractor")
+icon_grid = lazy_import("icon_grid")
+candidate_classifier = lazy_import("candidate_classifier")
+candidate_measure = lazy_import("candidate_measure")
+feature_index = lazy_import("feature_index")
+buffer_pool = lazy_import("buffer_pool")
+session_recorder = lazy_import("session_recorder")
+search_region = lazy_import("search_region")
+strategy_scheduler = lazy_import("strategy_scheduler")
+template_cache = lazy_import("template_cache")
+color_prefilter = lazy_import("color_prefilter")
+text_labels = lazy_import("text_labels")
+label_matcher = lazy_import("label_matcher")
+background_model = lazy_import("background_model")
+
+# Desktop icon sizes (small, medium, large, extra large) in pixels
+ICON_SIZES = [32, 48, 64, 96]
+
+# Feature ranges for an icon-like window at full resolution
+ICON_WINDOW_THRESHOLDS = {
+    "min_variance": 300, "max_variance": 8000,
+    "min_mean": 40, "max_mean": 220,
+    "min_std": 15,
+    "min_edge_density": 0.05, "max_edge_density": 0.5,
+}
+
+# Looser ranges for proposals on the downsampled pyramid level
+PYRAMID_PROPOSAL_THRESHOLDS = {
+    "min_variance": 150, "max_variance": 9000,
+    "min_mean": 30, "max_mean": 230,
+    "min_std": 10,
+    "min_edge_density": 0.03, "max_edge_density": 0.6,
+}
+
+# Minimum confidence for find_icons to assign a candidate to a target
+MULTI_TARGET_MIN_CONFIDENCE = 0.5
+
+# find_icons score of an OCR label that contains the target but is longer
+# ("Notepad++" for "Notepad"); an exact label scores 1.0
+LABEL_SUBSTRING_SCORE = 0.9
+
+# Whether pytesseract and the tesseract binary work (None until the first OCR)
+_ocr_available = None
+
+# find_notepad_icon strategies that return any icon-like region rather than
+# Notepad specifically; the scheduler always runs them last
+FALLBACK_STRATEGIES = ("grid_text", "generic")
+
+# Strategies whose confirmed detections are not harvested into the template
+# cache: template matches already have a template, fallbacks are not specific
+NO_HARVEST_STRATEGIES = ("cached_position", "template", "learned_template") + FALLBACK_STRATEGIES
+
+# Name of the Notepad icon in the harvested template cache
+NOTEPAD_TEMPLATE_NAME = "notepad"
+
+# Template search on a 2x downsampled frame first (templates smaller than
+# the minimum size are matched at full resolution only)
+COARSE_TEMPLATE_SCALE = 2
+COARSE_TEMPLATE_MIN_SIZE = 24
+
+# Confidence of a detection by a strategy that reports no score of its own
+# (the generic fallbacks)
+UNSCORED_CONFIDENCE = 0.1
+
+# Maximum score of the hand-tuned characteristics rules
+CHARACTERISTICS_MAX_SCORE = 25
+
+# Latency guesses (seconds) that order and budget anytime grounding until
+# the scheduler has measured a strategy
+STRATEGY_LATENCY_PRIOR = {
+    "cached_position": 0.001, "template": 0.01, "learned_template": 0.01, "generic": 0.02,
+    "features": 0.05, "label_text": 0.05, "grid_text": 0.05, "characteristics": 0.08,
+    "windows_api": 0.2,
+}
+DEFAULT_LATENCY_PRIOR = 0.05
+
+# Pixels the icon may move before the cached position no longer matches it
+CACHED_POSITION_SEARCH = 6
+
+
+class IconTarget(NamedTuple):
+    """An icon to locate with find_icons."""
+    name: str
+    label: Optional[str] = None  # text below the icon, defaults to the name
+    template: Optional[str] = None  # template path, defaults to <name>_icon.png if present
+
+
+class IconMatch(NamedTuple):
+    """Result of find_icons for one target."""
+    position: Optional[Tuple[int, int]]
+    confidence: float
+    method: Optional[str]  # "template", "features", "label" (OCR) or "label-glyphs" (rendered text)
+    reason: Optional[str] = None  # why the target was not found
+
+
+class GroundingFrame(NamedTuple):
+    """A captured frame to ground on; never modified once created."""
+    image: np.ndarray  # read-only BGR
+    origin: Tuple[int, int] = (0, 0)  # screen position of the top-left pixel
+    window_mask: Optional[np.ndarray] = None  # True where a window covers the desktop
+
+
+class GroundingResult(NamedTuple):
+    """Result of a locate_* call, in screen coordinates."""
+    position: Optional[Tuple[int, int]]  # icon centre, None if not found
+    bbox: Optional[Tuple[int, int, int, int]]  # (left, top, width, height)
+    confidence: float  # 0..1, as reported by the strategy
+    strategy: Optional[str]  # strategy that found the icon
+    elapsed: float  # seconds spent on the call
+    skipped: Tuple[str, ...] = ()  # strategies left out because they would overrun the budget
+    
+    @property
+    def found(self) -> bool:
+        return self.position is not None
+
 
 class IconGrounding:
     """
     Dynamic icon grounding system that can locate desktop icons
     regardless of their position using computer vision.
+    
+    The find_* methods work on the current screenshot (capturing one when
+    there is none) and are not thread-safe. The locate_* methods take an
+    explicit GroundingFrame instead and run on a private view of this
+    object (_bind), so several threads can ground at once; statistics and
+    caches shared with those views are updated under a lock.
     """
     
-    def __init__(self, bot: DesktopBot):
+    def __init__(self, bot: DesktopBot, pool: Optional[buffer_pool.BufferPool] = None,
+                 recorder: Optional[session_recorder.SessionRecorder] = None,
+                 window_tracker: Optional[WindowTracker] = None):
+        """
+        Args:
+            bot: Desktop bot used for screenshots
+            pool: Buffer pool for frames and derived planes; by default a
+                private pool when config.FRAME_BUFFER_POOL is set
+            recorder: Session recorder for find_notepad_icon; by default one
+                writing to config.GROUNDING_RECORD_DIR when that is set
+            window_tracker: Source of the window rectangles that are masked
+                out of the search (config.ICON_MASK_WINDOWS); no windows are
+                masked without one
+        """
         self.bot = bot
-        self.screenshot = None
+        self.window_tracker = window_tracker
+        if pool is None and config.FRAME_BUFFER_POOL:
+            pool = buffer_pool.BufferPool()
+        self.pool = pool
+        if recorder is None and config.GROUNDING_RECORD_DIR is not None:
+            recorder = session_recorder.SessionRecorder(config.GROUNDING_RECORD_DIR)
+        self.recorder = recorder
+        self._lock = threading.RLock()
+        self._resources = {}  # lazily created objects and caches, shared with frame views
+        self._screenshot = None
+        self._frame_version = 0  # bumped whenever the screenshot changes
+        self._gray = None  # (frame version, gray plane)
+        self._extractor = None
+        self._grid_models = {}  # (width, height) -> GridModel, None if the last fit failed
+        self._frame_features = None  # (frame version, FrameFeatures) of the last described frame
+        self.origin = (0, 0)  # screen position of the frame's top-left pixel
+        self._window_mask = None  # True where the current frame shows a window
+        self.scan_stats = None  # ScanStats of the last capture
+        self._pending_detection = None  # (strategy, BGR crop or None) awaiting launch confirmation
+        self._pending_position = None  # (frame shape, frame position, gray patch) cached on confirmation
+        self.last_result = None  # GroundingResult of the last find_notepad_icon call
+        self._evidence = None  # (confidence, (width, height)) noted by the last strategy hit
+        self._notepad_candidates = None  # (frame version, colour-prefiltered candidates)
+        self._labels = None  # (frame version, LabelIndex of the frame's text labels)
+        self._foreground = None  # (frame version, ForegroundMask or None)
+        self.prefilter_stats = None  # (positions scored, kept) by the colour prefilter on the last frame
+    
+    @property
+    def screenshot(self) -> Optional[np.ndarray]:
+        """
+        The current BGR frame. Captured frames are read-only views of a
+        pooled buffer and are overwritten by the next capture.
+        """
+        return self._screenshot
+    
+    @screenshot.setter
+    def screenshot(self, frame: Optional[np.ndarray]):
+        self._screenshot = frame
+        self._frame_version += 1
+        self.origin = (0, 0)
+        self._window_mask = None
+    
+    @property
+    def frame(self) -> Optional[GroundingFrame]:
+        """The current screenshot as a GroundingFrame (None before the first capture)."""
+        if self._screenshot is None:
+            return None
+        return GroundingFrame(self._screenshot, self.origin, self._window_mask)
+    
+    def _bind(self, frame: GroundingFrame) -> "IconGrounding":
+        """
+        Private view of this object bound to frame.
+        
+        The view shares the bot, grid models and the lock-guarded resources
+        (scheduler, template cache, feature index) but has its own per-frame
+        caches and no buffer pool, extractor buffers or recorder, so it can
+        run on another thread while this object keeps capturing.
+        """
+        view = copy.copy(self)
+        view.pool = None
+        view.recorder = None
+        view._extractor = None
+        view._gray = view._frame_features = view._notepad_candidates = view._labels = view._foreground = None
+        view._pending_detection = view._pending_position = view._evidence = None
+        view.screenshot = frame.image
+        view.origin = tuple(frame.origin)
+        view._window_mask = frame.window_mask
+        return view
+    
+    def _shared(self, name: str, factory: Callable[[], object]):
+        """Resource created once by factory and shared with all frame views."""
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+            return self._resources[name]
+    
+    def _buffer(self, name: str, shape: tuple) -> Optional[np.ndarray]:
+        """Pooled uint8 buffer to use as a cv2 dst=, or None without a pool."""
+        return self.pool.get(name, shape) if self.pool is not None else None
+    
+    def _gray_frame(self) -> np.ndarray:
+        """
+        Gray plane of the current screenshot, converted once per frame.
+        
+        Pixels covered by windows are replaced by the mean of the visible
+        desktop, so no strategy finds edges or matches there.
+        """
+        if self._gray is None or self._gray[0] != self._frame_version:
+            gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY,
+                                dst=self._buffer("gray", self.screenshot.shape[:2]))
+            mask = self._window_mask
+            if mask is not None:
+                visible = gray[::4, ::4][~mask[::4, ::4]]
+                np.copyto(gray, np.uint8(visible.mean()) if visible.size else np.uint8(0), where=mask)
+            self._gray = (self._frame_version, buffer_pool.readonly(gray))
+        return self._gray[1]
+    
+    def _frame_labels(self) -> text_labels.LabelIndex:
+        """Text labels of the current frame, detected and indexed once per frame."""
+        if self._labels is None or self._labels[0] != self._frame_version:
+            self._labels = (self._frame_version, text_labels.LabelIndex.detect(self._gray_frame()))
+        return self._labels[1]
+    
+    def _frame_foreground(self) -> Optional[background_model.ForegroundMask]:
+        """
+        Foreground of the current frame against the wallpaper model of its
+        resolution, computed once per frame (None without
+        config.ICON_BACKGROUND_MODEL).
+        
+        The first frame of a resolution builds the model, with its text
+        labels, the icon area above them and icon-like components as the
+        hint of what is not wallpaper; later frames (hint: labels, icon
+        areas and foreground) are learned when they reveal new wallpaper.
+        A frame that mostly differs from the model means the wallpaper
+        changed, and the model is rebuilt from it.
+        """
+        if not config.ICON_BACKGROUND_MODEL:
+            return None
+        if self._foreground is None or self._foreground[0] != self._frame_version:
+            gray = self._gray_frame()
+            shape = gray.shape[:2]
+            models = self._shared("background_models", dict)  # frame shape -> BackgroundModel
+            with self._lock:
+                model = models.get(shape)
+                foreground = None
+                if model is not None:
+                    foreground = model.foreground(gray, self._window_mask)
+                    if model.changed(foreground):
+                        model = foreground = None
+                labels = self._frame_labels().labels
+                if model is None:
+                    model = models[shape] = background_model.BackgroundModel(shape, config.BACKGROUND_FRAMES)
+                    components = self._extract_candidates(gray)
+                    boxes = np.stack([components[key] for key in ("x", "y", "w", "h")], axis=1)
+                    hint = background_model.label_hint(shape, labels, boxes)
+                else:
+                    # Labelled icons stay hinted, or the wallpaper inpainted
+                    # under them would be learned from its own subtraction
+                    hint = background_model.label_hint(shape, labels)
+                    np.maximum(hint, foreground.mask, out=hint)
+                if self._window_mask is not None:
+                    hint[self._window_mask] = 255
+                if model.observe(gray, hint) or foreground is None:
+                    foreground = model.foreground(gray, self._window_mask)
+            self._foreground = (self._frame_version, foreground)
+        return self._foreground[1]
+    
+    def _label_boxes(self, points: np.ndarray) -> np.ndarray:
+        """
+        Label region of every (x, y, size) candidate.
+        
+        With config.ICON_LABEL_DETECTION this is the detected text label
+        joined to the candidate (zero-sized where the icon has no label),
+        otherwise a fixed-offset box below the icon.
+        
+        Returns:
+            (N, 4) int64 array of (x, y, width, height)
+        """
+        if config.ICON_LABEL_DETECTION:
+            return self._frame_labels().boxes_below(points[:, :2], points[:, 2])
+        return candidate_measure.label_boxes(self._gray_frame().shape, points[:, :2], points[:, 2])
+    
+    @property
+    def scheduler(self) -> strategy_scheduler.StrategyScheduler:
+        """Strategy statistics, loaded from config.STRATEGY_STATS_PATH once (use under the lock)."""
+        return self._shared("scheduler", lambda: strategy_scheduler.StrategyScheduler(config.STRATEGY_STATS_PATH))
+    
+    @property
+    def template_cache(self) -> Optional[template_cache.TemplateCache]:
+        """Harvested templates (None when config.TEMPLATE_CACHE_DIR is None; use under the lock)."""
+        if config.TEMPLATE_CACHE_DIR is None:
+            return None
+        return self._shared("template_cache", lambda: template_cache.TemplateCache(
+            config.TEMPLATE_CACHE_DIR, config.TEMPLATE_CACHE_MAX_MISSES))
+    
+    def _current_screen_key(self) -> str:
+        """Template cache key (resolution and DPI) of the current screen."""
+        shape = self.screenshot.shape[:2]
+        cached = self._resources.get("screen_key")  # (frame shape, key)
+        if cached is None or cached[0] != shape:
+            try:
+                resolution = tuple(pyautogui.size())
+            except Exception:
+                resolution = (shape[1], shape[0])
+            cached = self._resources["screen_key"] = (
+                shape, template_cache.screen_key(resolution, template_cache.screen_dpi()))
+        return cached[1]
+    
+    @property
+    def feature_index(self) -> feature_index.FeatureIndex:
+        """ORB descriptor index of the icon templates, loaded from the disk cache once."""
+        return self._shared("feature_index", lambda: feature_index.FeatureIndex.load_or_build(
+            config.ICON_TEMPLATE_DIR, config.FEATURE_INDEX_CACHE))
+    
+    @property
+    def extractor(self) -> candidate_extractor.CandidateExtractor:
+        """Connected-components candidate extractor, created once and reused."""
+        if self._extractor is None:
+            self._extractor = candidate_extractor.CandidateExtractor()
+        return self._extractor
+    
+    def _extract_candidates(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Extract icon-sized, roughly square regions in one pass.
+        
+        Runs on the coarse pyramid level when ICON_PYRAMID_LEVELS > 0;
+        positions are mapped back to full-resolution coordinates.
+        
+        Returns:
+            Structured candidate array (x, y, w, h, area, score), best first
+        """
+        scale = 2 ** config.ICON_PYRAMID_LEVELS
+        if scale > 1:
+            small = self._buffer("pyramid", (gray.shape[0] // scale, gray.shape[1] // scale))
+            return self.extractor.extract(self._downsample(gray, scale, dst=small), scale=scale)
+        return self.extractor.extract(gray)
         
     def capture_desktop_screenshot(self) -> np.ndarray:
-        """Capture a screenshot of the desktop."""
+        """
+        Capture a screenshot of the desktop search area.
+        
+        Only the search area is captured (see _search_region), so the frame
+        starts at self.origin on the screen. The frame is converted straight
+        from the screen grab into a pooled BGR buffer (no temporary image
+        file) and returned as a read-only view that stays valid until the
+        next capture.
+        """
+        frame = self._capture(self._buffer)
+        self.screenshot = frame.image
+        self.origin = frame.origin
+        self._window_mask = frame.window_mask
+        masked = int(np.count_nonzero(frame.window_mask)) if frame.window_mask is not None else 0
+        self.scan_stats = search_region.ScanStats(frame.image.shape[0] * frame.image.shape[1], masked)
+        return self.screenshot
+    
+    def capture_frame(self) -> GroundingFrame:
+        """
+        Capture the desktop search area into a new GroundingFrame for the
+        locate_* methods. Unlike capture_desktop_screenshot the frame owns
+        its buffer, so it stays valid while later frames are captured.
+        """
+        return self._capture(lambda name, shape: None)
+    
+    def _capture(self, buffer: Callable[[str, tuple], Optional[np.ndarray]]) -> GroundingFrame:
+        """Grab the search area into buffer("frame", shape) (None: a new array)."""
+        region = self._search_region()
+        image = self._grab_screen(region)
+        if image.mode == "RGBA":
+            code = cv2.COLOR_RGBA2BGR
+        else:
+            image = image.convert("RGB")
+            code = cv2.COLOR_RGB2BGR
+        rgb = np.asarray(image)
+        frame = cv2.cvtColor(rgb, code, dst=buffer("frame", rgb.shape[:2] + (3,)))
+        origin = (region[0], region[1]) if region is not None else (0, 0)
+        return GroundingFrame(buffer_pool.readonly(frame), origin, self._mask_windows(frame.shape[:2], origin))
+    
+    def _search_region(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Screen area to capture: config.ICON_SEARCH_REGION clipped to the
+        work area when config.ICON_MASK_TASKBAR is set (None = full screen).
+        """
+        region = config.ICON_SEARCH_REGION
+        if config.ICON_MASK_TASKBAR:
+            # Re-read per capture: the taskbar or the resolution may have changed
+            region = search_region.intersect(region, search_region.work_area())
+        if region is None:
+            return None
+        region = tuple(int(v) for v in region)
+        if region[2] <= 0 or region[3] <= 0:
+            raise ValueError(f"Icon search region is empty: {region}")
+        return region
+    
+    def _mask_windows(self, shape: Tuple[int, int], origin: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Mask of the window rectangles in a frame captured at origin, None if nothing is covered."""
+        if not config.ICON_MASK_WINDOWS or self.window_tracker is None:
+            return None
+        bounds = (origin[0], origin[1], shape[1], shape[0])
+        rects = search_region.window_rects(self.window_tracker.windows(), config.ICON_MASK_IGNORE_TITLES, bounds)
+        return search_region.window_mask(shape, origin, rects)
+    
+    def _grab_screen(self, region: Optional[Tuple[int, int, int, int]] = None):
+        """
+        Screen grab as a PIL image, from the bot or pyautogui.
+        
+        Backends that cannot grab a region return the full screen, which is
+        cropped to the region here.
+        """
+        image = None
         # Use BotCity's screenshot capability
-        screenshot_path = "temp_screenshot.png"
         try:
-            self.bot.save_screenshot(screenshot_path)
+            try:
+                image = self.bot.get_screenshot(region=region) if region else self.bot.get_screenshot()
+            except TypeError:
+                image = self.bot.get_screenshot()
         except:
+            pass
+        if image is None:
             # Fallback to pyautogui
-            screenshot = pyautogui.screenshot()
-            screenshot.save(screenshot_path)
-        
-        # Read the screenshot
-        screenshot = cv2.imread(screenshot_path)
-        
-        if screenshot is None:
-            # Try reading as PIL Image and convert
-            from PIL import Image
-            pil_img = Image.open(screenshot_path)
-            screenshot = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-        
-        # Clean up temp file
-        if os.path.exists(screenshot_path):
-            try:
-                os.remove(screenshot_path)
-            except:
-                pass
-            
-        self.screenshot = screenshot
-        return screenshot
+            image = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        if region is not None and image.size != (region[2], region[3]):
+            left, top, width, height = region
+            image = image.crop((left, top, min(image.width, left + width), min(image.height, top + height)))
+        return image
+    
+    def _to_screen(self, position: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Frame position -> screen position."""
+        if position is None:
+            return None
+        return (int(position[0]) + self.origin[0], int(position[1]) + self.origin[1])
+    
+    def _to_frame(self, position: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Screen position -> frame position."""
+        if position is None:
+            return None
+        return (int(position[0]) - self.origin[0], int(position[1]) - self.origin[1])
+    
+    def _note_evidence(self, confidence: float, size: Tuple[int, int]):
+        """Record the confidence and (width, height) of the hit a strategy is about to return."""
+        self._evidence = (float(min(max(confidence, 0.0), 1.0)), (int(size[0]), int(size[1])))
+    
+    def _result(self, position: Optional[Tuple[int, int]], strategy: Optional[str],
+                started: float) -> GroundingResult:
+        """GroundingResult of a frame position, with the evidence noted for it."""
+        elapsed = time.perf_counter() - started
+        if not position:
+            return GroundingResult(None, None, 0.0, None, elapsed)
+        confidence, (width, height) = self._evidence or (UNSCORED_CONFIDENCE, (ICON_SIZES[1], ICON_SIZES[1]))
+        x, y = self._to_screen(position)
+        return GroundingResult((x, y), (x - width // 2, y - height // 2, width, height),
+                               confidence, strategy, elapsed)
     
     def find_icon_by_text(self, icon_text: str = "Notepad") -> Optional[Tuple[int, int]]:
         """
@@ -61,7 +504,7 @@ class IconGrounding:
             self.capture_desktop_screenshot()
         
         # Convert to grayscale for text detection
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
+        gray = self._gray_frame()
         
         # Use template matching with text detection
         # This is a simplified approach - in production, you'd use OCR
@@ -69,7 +512,7 @@ class IconGrounding:
         
         # Try to find icon by shape characteristics (square/rectangular regions)
         # Desktop icons typically have consistent sizes
-        return self._find_icon_by_shape_and_text(gray, icon_text)
+        return self._to_screen(self._find_icon_by_shape_and_text(gray, icon_text))
     
     def find_icon_by_template(self, template_path: Optional[str] = None) -> Optional[Tuple[int, int]]:
         """
@@ -78,12 +521,20 @@ class IconGrounding:
         """
         if self.screenshot is None:
             self.capture_desktop_screenshot()
-        
+        return self._match_template_or_generic(template_path).position
+    
+    def locate_template(self, frame: GroundingFrame,
+                        template_path: Optional[str] = None) -> GroundingResult:
+        """Re-entrant find_icon_by_template on an explicit frame."""
+        return self._bind(frame)._match_template_or_generic(template_path)
+    
+    def _match_template_or_generic(self, template_path: Optional[str]) -> GroundingResult:
+        started = time.perf_counter()
+        self._evidence = None
         if template_path and Path(template_path).exists():
-            return self._template_match(template_path)
-        else:
-            # Use generic icon detection
-            return self._detect_icon_generic()
+            return self._result(self._template_match(template_path), "template", started)
+        # Use generic icon detection
+        return self._result(self._detect_icon_generic(), "generic", started)
     
     def _find_icon_by_shape_and_text(self, gray: np.ndarray, text: str) -> Optional[Tuple[int, int]]:
         """
@@ -93,43 +544,17 @@ class IconGrounding:
         # Detect potential icon regions (rectangular areas with consistent patterns)
         # Desktop icons are typically arranged in a grid
         
-        # Use edge detection to find rectangular regions
-        edges = cv2.Canny(gray, 50, 150)
-        
-        # Find contours
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Filter contours by size (icons are typically 32x32 to 96x96 pixels)
-        icon_size_min = 20
-        icon_size_max = 150
-        
-        potential_icons = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            
-            # Check if size is reasonable for an icon
-            if icon_size_min <= w <= icon_size_max and icon_size_min <= h <= icon_size_max:
-                # Check aspect ratio (icons are roughly square)
-                aspect_ratio = w / h if h > 0 else 0
-                if 0.7 <= aspect_ratio <= 1.3:
-                    center_x = x + w // 2
-                    center_y = y + h // 2
-                    potential_icons.append((center_x, center_y, area))
-        
-        # Sort by area (larger icons are more likely to be the target)
-        potential_icons.sort(key=lambda x: x[2], reverse=True)
+        # Connected components of the edge map, filtered to icon-sized
+        # (20-150 px), roughly square regions and ranked by score
+        candidates = self._extract_candidates(gray)
         
         # For "Notepad", we can use text detection in the region below icons
         # Desktop icons have text labels below them
-        for x, y, _ in potential_icons:
+        for x, y in candidate_extractor.candidate_centers(candidates):
             # Check region below icon for text (simplified - in production use OCR)
-            # For now, return the largest/most prominent icon
+            # For now, return the most prominent icon
             # In a real implementation, you'd use OCR to verify the text label
-            
-            # Return the first reasonable candidate
-            # In production, you'd verify with OCR or other methods
-            return (x, y)
+            return (int(x), int(y))
         
         return None
     
@@ -141,27 +566,19 @@ class IconGrounding:
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
+        gray = self._gray_frame()
         
         # Method 1: Detect icon grid pattern
         # Desktop icons are arranged in a grid, we can detect this pattern
         
-        # Use blob detection to find icon-like regions
-        params = cv2.SimpleBlobDetector_Params()
-        params.filterByArea = True
-        params.minArea = 400  # Minimum icon area
-        params.maxArea = 10000  # Maximum icon area
-        params.filterByCircularity = False
-        params.filterByConvexity = False
-        params.filterByInertia = False
-        
-        detector = cv2.SimpleBlobDetector_create(params)
-        keypoints = detector.detect(gray)
+        # Use connected components to find icon-like regions (on the coarse
+        # pyramid level when enabled); candidates come back ranked by score
+        candidates = self._extract_candidates(gray)
         
-        if keypoints:
-            # Return the first detected keypoint (center of icon)
-            kp = keypoints[0]
-            return (int(kp.pt[0]), int(kp.pt[1]))
+        if len(candidates):
+            # Return the centre of the best-scoring candidate
+            x, y = candidate_extractor.candidate_centers(candidates[:1])[0]
+            return (int(x), int(y))
         
         # Method 2: Use the shape-based approach
         return self._find_icon_by_shape_and_text(gray, "Notepad")
@@ -175,135 +592,875 @@ class IconGrounding:
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
-        
-        # Perform template matching
-        result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        gray = self._gray_frame()
+        center, max_val = self._find_template(gray, template, 0.7)
         
         # Check confidence threshold
         if max_val >= 0.7:  # config.ICON_CONFIDENCE
-            # Return center of matched region
-            h, w = template.shape
-            center_x = max_loc[0] + w // 2
-            center_y = max_loc[1] + h // 2
-            return (center_x, center_y)
+            self._note_evidence(max_val, template.shape[::-1])
+            return center
         
         return None
     
-    def find_notepad_icon(self, retry_attempts: int = 3, retry_delay: float = 1.0) -> Optional[Tuple[int, int]]:
+    @staticmethod
+    def _locate_template(gray: np.ndarray, template: np.ndarray) -> Tuple[Tuple[int, int], float]:
+        """Best TM_CCOEFF_NORMED match: (centre of the matched region, score)."""
+        result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        h, w = template.shape
+        return (max_loc[0] + w // 2, max_loc[1] + h // 2), float(max_val)
+    
+    @classmethod
+    def _find_template(cls, gray: np.ndarray, template: np.ndarray,
+                       threshold: float) -> Tuple[Tuple[int, int], float]:
+        """
+        Coarse-to-fine _locate_template.
+        
+        The best match on the 2x downsampled frame is refined at full
+        resolution in a small window around it (about 4x faster than a
+        full-resolution search on 1080p). If the refined score is below
+        threshold the full-resolution search runs, so a miss costs about the
+        same as before and a hit is never lost to the coarse level.
+        """
+        h, w = template.shape
+        scale = COARSE_TEMPLATE_SCALE
+        if min(h, w) >= COARSE_TEMPLATE_MIN_SIZE:
+            small_template = cls._downsample(template, scale)
+            (cx, cy), _ = cls._locate_template(cls._downsample(gray, scale), small_template)
+            left = (cx - small_template.shape[1] // 2) * scale
+            top = (cy - small_template.shape[0] // 2) * scale
+            margin = 2 * scale
+            x0, y0 = max(0, left - margin), max(0, top - margin)
+            roi = gray[y0:top + h + margin, x0:left + w + margin]
+            if roi.shape[0] >= h and roi.shape[1] >= w:
+                (x, y), score = cls._locate_template(roi, template)
+                if score >= threshold:
+                    return (x0 + x, y0 + y), score
+        return cls._locate_template(gray, template)
+    
+    def _find_icon_by_features(self, template_name: str) -> Optional[Tuple[int, int]]:
+        """
+        Find an icon by ORB keypoint matching against the template index.
+        
+        Frame keypoints are extracted once per screenshot and matched
+        against all templates in resources/icons at once.
+        """
+        if self.screenshot is None:
+            self.capture_desktop_screenshot()
+        
+        index = self.feature_index
+        if template_name not in index.names:
+            return None
+        
+        match = self._feature_matches().get(template_name)
+        if match is None:
+            return None
+        width, height = index.sizes[index.names.index(template_name)]
+        self._note_evidence(match.inliers / 20.0, (width * match.scale, height * match.scale))
+        return match.center
+    
+    def _feature_matches(self) -> Dict[str, feature_index.FeatureMatch]:
+        """All template keypoint matches in the current screenshot."""
+        if self._frame_features is None or self._frame_features[0] != self._frame_version:
+            gray = self._gray_frame()
+            self._frame_features = (self._frame_version, feature_index.detect_frame_features(gray))
+        return self.feature_index.match(self._frame_features[1], config.FEATURE_MATCH_MIN_INLIERS)
+    
+    def find_notepad_icon(self, retry_attempts: int = 3, retry_delay: float = 1.0,
+                          budget: Optional[float] = None) -> Optional[Tuple[int, int]]:
         """
         Find Notepad icon with retry logic.
         Uses multiple detection strategies, prioritizing Notepad-specific detection.
-        """
-        # Check if template image is available
-        import config
-        template_path = config.NOTEPAD_ICON_TEMPLATE
         
+        Strategies run in the order chosen by _scheduled_strategies, and
+        every run's latency and outcome is fed back to the scheduler. A
+        detection stays pending until confirm_detection() (the click
+        launched Notepad: heuristic detections are harvested into the
+        template cache, and the position is cached for the next call) or
+        reject_detection().
+        
+        With a budget the call is anytime (see _ground_notepad_anytime):
+        the best candidate found before the deadline is returned, even a
+        low-confidence one, and a retry only starts while time remains.
+        The deadline starts before the first capture, so capture time
+        counts against the budget and grounding gets what is left.
+        last_result holds the GroundingResult of the call (confidence,
+        strategy and the strategies skipped for lack of time).
+        
+        With a recorder attached, every captured frame and the result and
+        timing of every strategy that ran on it are recorded (in frame
+        coordinates), with the frame origin, scheduler statistics and
+        remaining budget it was grounded with.
+        
+        Args:
+            retry_attempts: Captures to try
+            retry_delay: Seconds between attempts
+            budget: Seconds for the whole call, screen captures included
+                (None: no deadline)
+        
+        Returns:
+            Screen position of the icon, or None
+        """
+        self._pending_detection = self._pending_position = None
+        self.last_result = None
+        deadline = time.perf_counter() + budget if budget is not None else None
         for attempt in range(retry_attempts):
+            result = None
             try:
                 # Capture fresh screenshot
                 self.capture_desktop_screenshot()
+                remaining = deadline - time.perf_counter() if deadline is not None else None
+                if self.recorder is not None:
+                    with self._lock:
+                        stats = dict(self.scheduler.stats)
+                    self.recorder.begin(self.screenshot, attempt, self.origin, stats, remaining)
                 
-                # Method 0: Template matching (MOST ACCURATE if template available)
-                if template_path.exists():
-                    result = self._template_match(str(template_path))
-                    if result:
-                        print(f"Found Notepad icon using template matching")
-                        return result
-                
-                # Method 1: Find all icons and check text labels
-                result = self._find_icon_by_label_text("Notepad")
-                if result:
-                    print(f"Found Notepad icon using text label detection")
-                    return result
-                
-                # Method 2: Use Windows API to find Notepad shortcut
-                result = self._find_icon_using_windows_api()
-                if result:
-                    print(f"Found Notepad icon using Windows API")
-                    return result
-                
-                # Method 3: Find all icons and filter by characteristics
-                result = self._find_notepad_by_characteristics()
-                if result:
-                    print(f"Found Notepad icon using characteristic matching")
-                    return result
-                
-                # Method 4: Grid-based detection with text region checking
-                result = self._find_icon_in_grid_with_text_check()
-                if result:
-                    print(f"Found Notepad icon using grid detection")
-                    return result
-                
-                # Method 5: Fallback to generic detection (last resort)
-                result = self._detect_icon_generic()
-                if result:
-                    print(f"Warning: Using generic icon detection (may not be Notepad)")
-                    return result
+                result = self.last_result = self._ground_notepad(remaining)
+                if result.found:
+                    messages = {name: message for name, _, message in self._notepad_strategies()}
+                    print(messages[result.strategy])
+                    if result.skipped:
+                        print(f"Best candidate within the budget (confidence {result.confidence:.2f}, "
+                              f"skipped: {', '.join(result.skipped)})")
+                    position = self._to_frame(result.position)
+                    self._pending_detection = self._harvest_candidate(result.strategy, position)
+                    self._pending_position = self._position_patch(position, result.bbox[2:])
+                    return result.position
                 
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed: {e}")
+            finally:
+                with self._lock:
+                    self.scheduler.save()
+                if self.recorder is not None:
+                    self.recorder.end(self._to_frame(result.position) if result is not None else None)
             
             if attempt < retry_attempts - 1:
+                if deadline is not None and time.perf_counter() + retry_delay >= deadline:
+                    break
                 time.sleep(retry_delay)
         
         return None
     
-    def _find_icon_by_label_text(self, target_text: str = "Notepad") -> Optional[Tuple[int, int]]:
+    def locate_notepad(self, frame: GroundingFrame, budget: Optional[float] = None) -> GroundingResult:
+        """
+        Re-entrant find_notepad_icon for one explicit frame: no capture, no
+        retries and no pending detection (harvesting needs the launch
+        confirmation of find_notepad_icon). Strategy statistics are updated
+        and saved as usual. With a budget (seconds) the best candidate
+        found before the deadline is returned.
+        """
+        view = self._bind(frame)
+        try:
+            return view._ground_notepad(budget)
+        finally:
+            with self._lock:
+                self.scheduler.save()
+    
+    def _ground_notepad(self, budget: Optional[float] = None) -> GroundingResult:
+        """
+        Run the scheduled strategies on the current frame until one finds
+        the icon, feeding every run's latency and outcome to the scheduler
+        (and the recorder, in frame coordinates). Strategy exceptions are
+        recorded and re-raised.
+        
+        With a budget (seconds) _ground_notepad_anytime runs instead, which
+        skips failing strategies rather than re-raising.
+        """
+        started = time.perf_counter()
+        # Shared by all strategies: convert up front so the first
+        # strategy is not charged for it in the scheduler statistics
+        self._gray_frame()
+        if budget is not None:
+            return self._ground_notepad_anytime(started, started + budget)
+        
+        for name, strategy, _ in self._scheduled_strategies():
+            self._evidence = None
+            position = self._run_strategy(name, strategy)
+            if position:
+                return self._result(position, name, started)
+        return self._result(None, None, started)
+    
+    def _ground_notepad_anytime(self, started: float, deadline: float) -> GroundingResult:
+        """
+        Anytime grounding on the current frame.
+        
+        Strategies run cheapest first (measured mean latency, or
+        STRATEGY_LATENCY_PRIOR until measured), each only if its expected
+        latency still fits before the deadline. The most confident hit so
+        far is kept; the search stops at the first hit with at least
+        config.ANYTIME_ACCEPT_CONFIDENCE or when no strategy fits any more,
+        and returns that hit with the strategies that did not fit as
+        skipped. The FALLBACK_STRATEGIES, which return any icon, come last
+        and only run if no Notepad-specific strategy found anything. A
+        strategy that overruns its estimate is not interrupted; one that
+        raises is recorded and skipped.
+        """
+        best = None  # (frame position, strategy, evidence)
+        skipped = []
+        for name, strategy, _ in self._scheduled_strategies(cheapest_first=True):
+            if best is not None and name in FALLBACK_STRATEGIES:
+                break
+            with self._lock:
+                expected = self.scheduler.estimated_latency(
+                    name, STRATEGY_LATENCY_PRIOR.get(name, DEFAULT_LATENCY_PRIOR))
+            if time.perf_counter() + expected > deadline:
+                skipped.append(name)
+                continue
+            self._evidence = None
+            try:
+                position = self._run_strategy(name, strategy)
+            except Exception as e:
+                # Already recorded; a retry rarely fits the budget, so keep
+                # the best candidate so far and try the next strategy
+                print(f"Strategy {name} failed: {e}")
+                continue
+            if not position:
+                continue
+            evidence = self._evidence or (UNSCORED_CONFIDENCE, (ICON_SIZES[1], ICON_SIZES[1]))
+            if best is None or evidence[0] > best[2][0]:
+                best = (position, name, evidence)
+            if evidence[0] >= config.ANYTIME_ACCEPT_CONFIDENCE:
+                break
+        
+        if best is None:
+            return self._result(None, None, started)._replace(skipped=tuple(skipped))
+        position, name, self._evidence = best
+        return self._result(position, name, started)._replace(skipped=tuple(skipped))
+    
+    def _run_strategy(self, name: str, strategy: Callable[[], Optional[Tuple[int, int]]]
+                      ) -> Optional[Tuple[int, int]]:
+        """Run one strategy and feed its latency and outcome to the scheduler and recorder."""
+        strategy_started = time.perf_counter()
+        try:
+            position = strategy()
+        except Exception as e:
+            elapsed = time.perf_counter() - strategy_started
+            with self._lock:
+                self.scheduler.record(name, False, elapsed)
+            if self.recorder is not None:
+                self.recorder.strategy(name, None, elapsed, e)
+            raise
+        elapsed = time.perf_counter() - strategy_started
+        with self._lock:
+            self.scheduler.record(name, bool(position), elapsed)
+        if self.recorder is not None:
+            self.recorder.strategy(name, position, elapsed)
+        return position
+    
+    def _scheduled_strategies(self, cheapest_first: bool = False
+                              ) -> List[Tuple[str, Callable[[], Optional[Tuple[int, int]]], str]]:
+        """
+        The strategies find_notepad_icon tries, in order: unavailable ones
+        are dropped, config.STRATEGY_ORDER forces a fixed order, otherwise
+        the scheduler orders them by expected time-to-success, or by
+        expected latency alone with cheapest_first (anytime grounding).
+        """
+        strategies = {name: (name, strategy, message)
+                      for name, strategy, message in self._notepad_strategies()
+                      if self._strategy_available(name)}
+        with self._lock:
+            if cheapest_first and config.STRATEGY_ORDER is None:
+                order = self.scheduler.cheapest_first(list(strategies), STRATEGY_LATENCY_PRIOR,
+                                                      DEFAULT_LATENCY_PRIOR, last=FALLBACK_STRATEGIES)
+            else:
+                order = self.scheduler.order(list(strategies), fixed=config.STRATEGY_ORDER,
+                                             last=FALLBACK_STRATEGIES)
+        return [strategies[name] for name in order]
+    
+    def _strategy_available(self, name: str) -> bool:
+        """Whether a strategy can work on this platform and installation."""
+        if name in ("template", "features"):
+            return config.NOTEPAD_ICON_TEMPLATE.exists()
+        if name == "windows_api":
+            return sys.platform == "win32" and importlib.util.find_spec("win32gui") is not None
+        if name == "cached_position":
+            cached = self._resources.get("notepad_position")
+            return self.screenshot is not None and cached is not None and cached[0] == self.screenshot.shape[:2]
+        if name == "learned_template":
+            if self.screenshot is None or self.template_cache is None:
+                return False
+            with self._lock:
+                return self.template_cache.has(NOTEPAD_TEMPLATE_NAME, self._current_screen_key())
+        return True
+    
+    def _learned_template_match(self) -> Optional[Tuple[int, int]]:
+        """Template matching with the template harvested for this screen configuration."""
+        key = self._current_screen_key()
+        with self._lock:
+            template = self.template_cache.load(NOTEPAD_TEMPLATE_NAME, key)
+        if template is None:
+            return None
+        center, score = self._find_template(self._gray_frame(), template, config.ICON_CONFIDENCE)
+        hit = score >= config.ICON_CONFIDENCE
+        with self._lock:
+            evicted = self.template_cache.record(NOTEPAD_TEMPLATE_NAME, key, hit)
+        if evicted:
+            print("Harvested Notepad template missed repeatedly, evicted")
+        if not hit:
+            return None
+        self._note_evidence(score, template.shape[::-1])
+        return center
+    
+    def _cached_position_match(self) -> Optional[Tuple[int, int]]:
+        """
+        The position of the last confirmed detection, if the icon is still
+        there: its gray patch must match within CACHED_POSITION_SEARCH
+        pixels of where it was.
+        """
+        cached = self._resources.get("notepad_position")  # (frame shape, frame position, gray patch)
+        if cached is None or cached[0] != self.screenshot.shape[:2]:
+            return None
+        _, (x, y), patch = cached
+        height, width = patch.shape
+        left = max(0, x - width // 2 - CACHED_POSITION_SEARCH)
+        top = max(0, y - height // 2 - CACHED_POSITION_SEARCH)
+        window = self._gray_frame()[top:top + height + 2 * CACHED_POSITION_SEARCH,
+                                    left:left + width + 2 * CACHED_POSITION_SEARCH]
+        if window.shape[0] < height or window.shape[1] < width:
+            return None
+        _, score, _, (dx, dy) = cv2.minMaxLoc(cv2.matchTemplate(window, patch, cv2.TM_CCOEFF_NORMED))
+        if score < config.ICON_CONFIDENCE:
+            return None
+        self._note_evidence(score, (width, height))
+        return (left + dx + width // 2, top + dy + height // 2)
+    
+    def _position_patch(self, position: Tuple[int, int], size: Tuple[int, int]):
+        """(frame shape, position, gray patch of size around it) for the cached position, None at the border."""
+        gray = self._gray_frame()
+        width, height = size
+        left, top = position[0] - width // 2, position[1] - height // 2
+        if left < 0 or top < 0 or left + width > gray.shape[1] or top + height > gray.shape[0]:
+            return None
+        return (gray.shape[:2], tuple(position), gray[top:top + height, left:left + width].copy())
+    
+    def _harvest_candidate(self, strategy: str, position: Tuple[int, int]):
+        """
+        Pending detection for confirm_detection/reject_detection: the
+        strategy and, for heuristic detections on a screen configuration
+        without a harvested template, a tight crop of the icon.
+        """
+        cache = self.template_cache
+        if cache is None:
+            return None
+        with self._lock:
+            harvested = cache.has(NOTEPAD_TEMPLATE_NAME, self._current_screen_key())
+        if strategy in NO_HARVEST_STRATEGIES or harvested:
+            return (strategy, None)
+        gray = self._gray_frame()
+        size = ICON_SIZES[1]
+        candidates = self._find_all_icon_candidates(gray)
+        if candidates:
+            points = np.array(candidates, dtype=np.int64)
+            distance = np.hypot(points[:, 0] - position[0], points[:, 1] - position[1])
+            nearest = int(np.argmin(distance))
+            if distance[nearest] <= points[nearest, 2] / 2:
+                size = int(points[nearest, 2])
+        return (strategy, template_cache.tight_crop(self.screenshot, position, size))
+    
+    def confirm_detection(self, harvest: bool = True):
+        """
+        The last find_notepad_icon result launched Notepad: store the
+        pending crop as the harvested template for this screen.
+        
+        Args:
+            harvest: Whether the launch was actually observed (a new
+                Notepad window appeared). Without that evidence a wrong
+                heuristic hit would become a template that keeps matching
+                the same wrong icon, so only the position is cached.
+        """
+        pending, self._pending_detection = self._pending_detection, None
+        position, self._pending_position = self._pending_position, None
+        if position is not None:
+            with self._lock:
+                self._resources["notepad_position"] = position
+        if not harvest or pending is None or pending[1] is None:
+            return
+        strategy, crop = pending
+        with self._lock:
+            self.template_cache.store(NOTEPAD_TEMPLATE_NAME, self._current_screen_key(), crop, strategy)
+        print(f"Harvested Notepad template ({crop.shape[1]}x{crop.shape[0]}) from {strategy} detection")
+    
+    def reject_detection(self):
+        """The last find_notepad_icon result did not launch Notepad."""
+        pending, self._pending_detection = self._pending_detection, None
+        self._pending_position = None
+        if pending is not None and pending[0] == "cached_position":
+            with self._lock:
+                self._resources.pop("notepad_position", None)
+        if pending is not None and pending[0] == "learned_template":
+            with self._lock:
+                evicted = self.template_cache.record(NOTEPAD_TEMPLATE_NAME, self._current_screen_key(), False)
+            if evicted:
+                print("Harvested Notepad template missed repeatedly, evicted")
+    
+    def _notepad_strategies(self) -> List[Tuple[str, Callable[[], Optional[Tuple[int, int]]], str]]:
+        """(name, strategy, success message) for all strategies, in the default order."""
+        # Check if template image is available
+        template_path = config.NOTEPAD_ICON_TEMPLATE
+        
+        def template_match():
+            if template_path.exists():
+                return self._template_match(str(template_path))
+            return None
+        
+        return [
+            # Method 00: Position of the last confirmed detection, if the
+            # icon has not moved (cheapest)
+            ("cached_position", self._cached_position_match,
+             "Found Notepad icon at its last confirmed position"),
+            # Method 0: Template matching (MOST ACCURATE if template available)
+            ("template", template_match,
+             "Found Notepad icon using template matching"),
+            # Method 0a: Template harvested from an earlier confirmed detection
+            ("learned_template", self._learned_template_match,
+             "Found Notepad icon using harvested template"),
+            # Method 0b: Keypoint matching (tolerates scaled, re-themed or
+            # partially covered icons)
+            ("features", lambda: self._find_icon_by_features(template_path.stem),
+             "Found Notepad icon using feature matching"),
+            # Method 1: Find all icons and check text labels
+            ("label_text", lambda: self._find_icon_by_label_text("Notepad", self._notepad_icon_candidates()),
+             "Found Notepad icon using text label detection"),
+            # Method 2: Use Windows API to find Notepad shortcut
+            ("windows_api", self._find_icon_using_windows_api,
+             "Found Notepad icon using Windows API"),
+            # Method 3: Find all icons and filter by characteristics
+            ("characteristics", self._find_notepad_by_characteristics,
+             "Found Notepad icon using characteristic matching"),
+            # Method 4: Grid-based detection with text region checking
+            ("grid_text", self._find_icon_in_grid_with_text_check,
+             "Found Notepad icon using grid detection"),
+            # Method 5: Fallback to generic detection (last resort)
+            ("generic", self._detect_icon_generic,
+             "Warning: Using generic icon detection (may not be Notepad)"),
+        ]
+    
+    def find_icons(self, targets: Iterable[Union[str, IconTarget]],
+                   capture: bool = True) -> Dict[str, IconMatch]:
+        """
+        Locate several icons in one pass.
+        
+        The frame is captured once, icon candidates are extracted once and
+        every candidate's label is read once. Template and keypoint matches
+        and label evidence then fill one target x candidate confidence
+        matrix, and a single greedy assignment (highest confidence first,
+        each candidate used at most once) picks a position per target.
+        
+        Args:
+            targets: Label strings or IconTarget tuples
+            capture: Capture a new screenshot (False reuses the current one)
+            
+        Returns:
+            Target name -> IconMatch (screen positions); misses have
+            position None and a reason
+        """
+        if capture or self.screenshot is None:
+            self.capture_desktop_screenshot()
+        return self._match_icons(targets)
+    
+    def locate_icons(self, frame: GroundingFrame,
+                     targets: Iterable[Union[str, IconTarget]]) -> Dict[str, IconMatch]:
+        """Re-entrant find_icons on an explicit frame."""
+        return self._bind(frame)._match_icons(targets)
+    
+    def _match_icons(self, targets: Iterable[Union[str, IconTarget]]) -> Dict[str, IconMatch]:
+        """find_icons on the current frame."""
+        targets = [IconTarget(t) if isinstance(t, str) else t for t in targets]
+        gray = self._gray_frame()
+        
+        # Candidates once: (x, y, size) rows
+        points = np.array(self._find_all_icon_candidates(gray), dtype=np.int64).reshape(-1, 3)
+        positions = [(int(x), int(y)) for x, y, _ in points]
+        confidence = np.zeros((len(targets), len(points)))
+        methods = {}
+        
+        def column_for(position, size):
+            """Candidate column at a detected position (a new one if none is close)."""
+            nonlocal confidence
+            if positions:
+                distance = np.hypot(*(np.array(positions) - np.array(position)).T)
+                nearest = int(np.argmin(distance))
+                if distance[nearest] <= max(12, size // 2):
+                    return nearest
+            positions.append((int(position[0]), int(position[1])))
+            confidence = np.hstack([confidence, np.zeros((len(targets), 1))])
+            return len(positions) - 1
+        
+        # Templates: keypoint matches for all templates at once, then exact
+        # template matching for targets that have a template
+        template_paths = [self._target_template(target) for target in targets]
+        feature_matches = self._feature_matches() if any(template_paths) else {}
+        for row, template_path in enumerate(template_paths):
+            if template_path is None:
+                continue
+            template = cv2.imread(str(template_path), cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                continue
+            center, score = self._locate_template(gray, template)
+            if score >= config.ICON_CONFIDENCE:
+                column = column_for(center, max(template.shape))
+                if score > confidence[row, column]:
+                    confidence[row, column] = score
+                    methods[row, column] = "template"
+            match = feature_matches.get(template_path.stem)
+            if match is not None:
+                column = column_for(match.center, max(template.shape))
+                score = min(1.0, match.inliers / 20.0)
+                if score > confidence[row, column]:
+                    confidence[row, column] = score
+                    methods[row, column] = "features"
+        
+        # Labels once: OCR every candidate's label region, or match it
+        # against each target's rendered text when OCR is not available
+        ocr_available = False
+        if len(points):
+            boxes = self._label_boxes(points)
+            texts = [self._ocr_text(gray[y:y+height, x:x+width]) if width > 0 and height > 0 else None
+                     for x, y, width, height in boxes]
+            ocr_available = any(text is not None for text in texts)
+            for row, target in enumerate(targets):
+                label = target.label or target.name
+                if ocr_available:
+                    scores = [self._label_score(label, text) for text in texts]
+                    method = "label"
+                else:
+                    scores = label_matcher.matcher(label).scores(gray, boxes)
+                    method = "label-glyphs"
+                for column, score in enumerate(scores):
+                    if score > confidence[row, column]:
+                        confidence[row, column] = score
+                        methods[row, column] = method
+        
+        # Single assignment step over all targets
+        results = {}
+        taken = set()
+        min_confidence = min(MULTI_TARGET_MIN_CONFIDENCE, config.LABEL_MATCH_MIN_SCORE) \
+            if not ocr_available else MULTI_TARGET_MIN_CONFIDENCE
+        order = np.argsort(-confidence, axis=None, kind="stable")
+        for flat in order:
+            row, column = np.unravel_index(flat, confidence.shape)
+            score = confidence[row, column]
+            if score < min_confidence:
+                break
+            name = targets[row].name
+            if name in results or column in taken:
+                continue
+            results[name] = IconMatch(self._to_screen(positions[column]), float(score), methods[row, column])
+            taken.add(column)
+        
+        for row, target in enumerate(targets):
+            if target.name not in results:
+                results[target.name] = IconMatch(None, 0.0, None,
+                                                 self._miss_reason(confidence, row, taken, len(positions),
+                                                                   min_confidence))
+        return results
+    
+    @staticmethod
+    def _label_score(label: str, text: Optional[str]) -> float:
+        """
+        How well an OCR text reads as a target label: 1.0 when equal up to
+        case and whitespace, LABEL_SUBSTRING_SCORE when it contains the
+        label, otherwise their similarity ratio.
+        """
+        if text is None:
+            return 0.0
+        label, text = " ".join(label.lower().split()), " ".join(text.lower().split())
+        if text == label:
+            return 1.0
+        if label in text:
+            return LABEL_SUBSTRING_SCORE
+        return difflib.SequenceMatcher(None, label, text).ratio()
+    
+    @staticmethod
+    def _target_template(target: IconTarget) -> Optional[Path]:
+        """Template file of a target: explicit, or <name>_icon.png in the template directory."""
+        if target.template:
+            return Path(target.template)
+        path = config.ICON_TEMPLATE_DIR / f"{target.name.lower()}_icon.png"
+        return path if path.exists() else None
+    
+    @staticmethod
+    def _miss_reason(confidence: np.ndarray, row: int, taken: set, column_count: int,
+                     min_confidence: float) -> str:
+        """Why find_icons found nothing for a target."""
+        if column_count == 0:
+            return "no icon candidates in the frame"
+        scores = confidence[row]
+        best = int(np.argmax(scores))
+        if scores[best] >= min_confidence and best in taken:
+            return "best match was assigned to another target"
+        if scores[best] > 0:
+            return f"best match below threshold ({scores[best]:.2f})"
+        return "no template match and no matching label"
+    
+    def _find_icon_by_label_text(self, target_text: str = "Notepad",
+                                 icon_candidates: Optional[List[Tuple[int, int, int]]] = None
+                                 ) -> Optional[Tuple[int, int]]:
         """
         Find icon by detecting text labels below desktop icons.
         Desktop icons have text labels directly below them.
+        
+        Args:
+            target_text: Label to look for
+            icon_candidates: (x, y, size) candidates to check (default: all
+                icon candidates of the frame)
         """
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
+        gray = self._gray_frame()
         
         # Find all potential icon regions
-        icon_candidates = self._find_all_icon_candidates(gray)
+        if icon_candidates is None:
+            icon_candidates = self._find_all_icon_candidates(gray)
         
         if not icon_candidates:
             return None
         
-        # For each candidate, check the text region below the icon
+        # Join every candidate with its label and match all labels against
+        # the rendered target text in one batch
+        points = np.array(icon_candidates, dtype=np.int64)
+        boxes = self._label_boxes(points)
+        scores = label_matcher.matcher(target_text).scores(gray, boxes)
+        best = int(np.argmax(scores))
+        if scores[best] >= config.LABEL_MATCH_MIN_SCORE:
+            self._note_evidence(float(scores[best]), (points[best, 2], points[best, 2]))
+            return (int(points[best, 0]), int(points[best, 1]))
+        
+        # Labels in a font that was not rendered: OCR them (when available)
         target_text_lower = target_text.lower()
+        for index, (x, y, width, height) in enumerate(boxes):
+            if width <= 0 or height <= 0:
+                continue
+            text = self._ocr_text(gray[y:y+height, x:x+width])
+            if text is None:
+                break  # OCR is not available
+            if target_text_lower in text:
+                self._note_evidence(1.0, (points[index, 2], points[index, 2]))
+                return (int(points[index, 0]), int(points[index, 1]))
         
-        for icon_x, icon_y, icon_size in icon_candidates:
-            # Text label is typically 20-40 pixels below the icon
-            text_region_y = icon_y + icon_size // 2 + 30
-            text_region_height = 30
-            text_region_x = icon_x - icon_size
-            text_region_width = icon_size * 2
-            
-            # Ensure region is within image bounds
-            h, w = gray.shape
-            text_region_x = max(0, min(text_region_x, w - text_region_width))
-            text_region_y = max(0, min(text_region_y, h - text_region_height))
-            text_region_width = min(text_region_width, w - text_region_x)
-            text_region_height = min(text_region_height, h - text_region_y)
+        return None
+    
+    def _notepad_icon_candidates(self) -> List[Tuple[int, int, int]]:
+        """
+        Icon candidates of the current frame that can be the Notepad icon,
+        computed once per frame.
+        
+        With config.ICON_COLOR_PREFILTER, positions whose hue-saturation
+        back-projection score is below config.ICON_COLOR_MIN_SCORE (relative
+        to the template's own score) are dropped: grid cells before their
+        variance/edge check, other candidates right after the scan, so the
+        label OCR and the classifier only see plausibly coloured candidates.
+        """
+        if self._notepad_candidates is not None and self._notepad_candidates[0] == self._frame_version:
+            return self._notepad_candidates[1]
+        model = self._notepad_color_model() if config.ICON_COLOR_PREFILTER else None
+        checked = [0, 0]  # positions scored by colour, positions kept
+        keep = None
+        if model is not None:
+            projection = model.back_project(self.screenshot)
             
-            if text_region_width > 0 and text_region_height > 0:
-                # Extract text region
-                text_region = gray[text_region_y:text_region_y+text_region_height,
-                                  text_region_x:text_region_x+text_region_width]
-                
-                # Try simple text matching using template matching on text patterns
-                # Or use OCR if available
-                if self._check_text_region_matches(text_region, target_text_lower):
-                    return (icon_x, icon_y)
+            def keep(centers, sizes):
+                mask = model.scores(projection, centers, sizes) >= config.ICON_COLOR_MIN_SCORE
+                checked[0] += len(mask)
+                checked[1] += int(mask.sum())
+                return mask
         
-        return None
+        candidates = self._find_all_icon_candidates(self._gray_frame(), keep)
+        self.prefilter_stats = tuple(checked)
+        self._notepad_candidates = (self._frame_version, candidates)
+        return candidates
     
-    def _find_all_icon_candidates(self, gray: np.ndarray) -> List[Tuple[int, int, int]]:
+    def _notepad_color_model(self) -> Optional[color_prefilter.ColorModel]:
+        """Colour model of the Notepad template, or of the harvested one; None without either."""
+        path = config.NOTEPAD_ICON_TEMPLATE
+        if not path.exists():
+            cache = self.template_cache
+            if cache is None:
+                return None
+            with self._lock:
+                path = cache.path(NOTEPAD_TEMPLATE_NAME, self._current_screen_key())
+        if path is None:
+            return None
+        try:
+            # Harvesting rewrites the template in place: the file's mtime tells
+            key = (path, path.stat().st_mtime_ns)
+        except OSError:
+            return None  # evicted
+        cached = self._resources.get("color_model")  # ((template path, mtime), ColorModel or None)
+        if cached is None or cached[0] != key:
+            template = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            model = color_prefilter.ColorModel.from_template(template) if template is not None else None
+            cached = self._resources["color_model"] = (key, model)
+        return cached[1]
+    
+    def _find_all_icon_candidates(self, gray: np.ndarray,
+                                  keep: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None
+                                  ) -> List[Tuple[int, int, int]]:
         """Find all potential icon candidates on the desktop."""
+        candidates = self._scan_icon_candidates(gray, keep)
+        
+        # Return as (x, y, size) tuples, sorted by score
+        return [(x, y, size) for x, y, size, _ in candidates]
+    
+    def _scan_icon_candidates(self, gray: np.ndarray,
+                              keep: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None
+                              ) -> List[Tuple[int, int, int, float]]:
+        """
+        Scan the frame for icon-like windows.
+        
+        Uses the coarse-to-fine pyramid when ICON_PYRAMID_LEVELS > 0,
+        otherwise slides windows over the full-resolution frame. With
+        config.ICON_BACKGROUND_MODEL the foreground blobs replace both
+        scans, and grid cells that are mostly wallpaper are dropped like
+        those rejected by keep.
+        
+        Args:
+            gray: Grayscale frame
+            keep: Optional cheap filter, (N, 2) centres and (N,) sizes to a
+                boolean mask; grid cells it rejects are not scanned at all,
+                other candidates are filtered after the scan
+        
+        Returns:
+            De-duplicated (x, y, size, score) tuples, best score first
+        """
+        # The foreground mask belongs to the current frame, not to other planes
+        current = self.screenshot is not None and gray is self._gray_frame()
+        foreground = self._frame_foreground() if current else None
+        if foreground is not None:
+            keep = self._foreground_filter(foreground, keep)
+        
+        if config.ICON_GRID_INFERENCE:
+            model = self._grid_model(gray)
+            if model is not None:
+                cells = model.cell_centers()
+                if keep is not None and len(cells):
+                    cells = cells[keep(cells, np.full(len(cells), model.icon_size))]
+                    if not len(cells):
+                        return []  # the grid still fits, nothing on it passes the filter
+                candidates = self._score_grid_cells(gray, model, cells)
+                if candidates:
+                    return self._dedupe_candidates(candidates)
+                # Nothing on the grid: the layout probably changed
+                self._grid_models.pop((gray.shape[1], gray.shape[0]), None)
+        
+        if foreground is not None:
+            candidates = self._score_foreground_blobs(gray, foreground)
+        elif config.ICON_PYRAMID_LEVELS > 0:
+            candidates = self._find_icon_candidates_pyramid(gray, config.ICON_PYRAMID_LEVELS)
+        else:
+            candidates = self._scan_icon_windows(gray, ICON_SIZES)
+        if config.ICON_GRID_INFERENCE:
+            self._refit_grid(gray, candidates)
+        if keep is not None and candidates:
+            points = np.array([c[:3] for c in candidates], dtype=np.int64)
+            mask = keep(points[:, :2], points[:, 2])
+            candidates = [c for c, kept in zip(candidates, mask) if kept]
+        return self._dedupe_candidates(candidates)
+    
+    @staticmethod
+    def _foreground_filter(foreground: background_model.ForegroundMask,
+                           keep: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None
+                           ) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+        """Candidate filter dropping wallpaper windows first, then applying keep to the rest."""
+        def foreground_keep(centers, sizes):
+            mask = foreground.keep(centers, sizes)
+            if keep is not None and mask.any():
+                mask[mask] = keep(centers[mask], np.asarray(sizes)[mask])
+            return mask
+        return foreground_keep
+    
+    def _grid_model(self, gray: np.ndarray) -> Optional[icon_grid.GridModel]:
+        """
+        Desktop icon grid for this screen resolution, fitted on first use.
+        
+        A failed fit is cached too, so frames of the same resolution do not
+        pay for another candidate extraction; the grid is fitted again from
+        the candidates of the next full scan instead (_refit_grid).
+        
+        Returns:
+            Cached GridModel, or None if no consistent grid was found
+        """
+        key = (gray.shape[1], gray.shape[0])
+        if key not in self._grid_models:
+            candidates = self._extract_candidates(gray)
+            centers = candidate_extractor.candidate_centers(candidates)
+            sizes = np.maximum(candidates["w"], candidates["h"])
+            self._grid_models[key] = icon_grid.fit_grid(key, centers, sizes)
+        return self._grid_models[key]
+    
+    def _refit_grid(self, gray: np.ndarray, candidates: List[Tuple[int, int, int, float]]):
+        """Fit the grid of a resolution without one from the (x, y, size, score) candidates of a full scan."""
+        key = (gray.shape[1], gray.shape[0])
+        if self._grid_models.get(key) is not None or not candidates:
+            return
+        points = np.array([c[:3] for c in candidates], dtype=np.int64)
+        self._grid_models[key] = icon_grid.fit_grid(key, points[:, :2], points[:, 2])
+    
+    def _score_grid_cells(self, gray: np.ndarray, model: icon_grid.GridModel,
+                          cells: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, float]]:
+        """
+        Evaluate one icon window per grid cell instead of a full scan.
+        
+        Args:
+            gray: Grayscale frame
+            model: Fitted icon grid
+            cells: (N, 2) cell centres to evaluate (default: every cell)
+        
+        Returns:
+            (center_x, center_y, size, score) tuples for icon-like cells
+        """
+        size = model.icon_size
+        half = size // 2
         candidates = []
+        for cx, cy in (model.cell_centers() if cells is None else cells):
+            x0, y0 = int(cx) - half, int(cy) - half
+            # ROI one pixel larger than the window so exactly one window fits
+            roi = gray[y0:y0 + size + 1, x0:x0 + size + 1]
+            candidates.extend(self._scan_icon_windows(roi, [size], step_ratio=1.0, origin=(x0, y0)))
+        return candidates
+    
+    def _score_foreground_blobs(self, gray: np.ndarray,
+                                foreground: background_model.ForegroundMask) -> List[Tuple[int, int, int, float]]:
+        """
+        Evaluate one icon window per foreground blob instead of a scan.
         
-        # Use multiple methods to find icons
-        icon_sizes = [32, 48, 64, 96]
+        Returns:
+            (center_x, center_y, size, score) tuples for icon-like blobs
+        """
+        candidates = []
+        for x, y, width, height in foreground.blobs():
+            size = int(max(width, height))
+            x0, y0 = max(0, int(x + width // 2 - size // 2)), max(0, int(y + height // 2 - size // 2))
+            # ROI one pixel larger than the window so exactly one window fits
+            roi = gray[y0:y0 + size + 1, x0:x0 + size + 1]
+            candidates.extend(self._scan_icon_windows(roi, [size], step_ratio=1.0, origin=(x0, y0)))
+        return candidates
+    
+    def _scan_icon_windows(self, gray: np.ndarray, icon_sizes: List[int],
+                           step_ratio: float = 0.5,
+                           origin: Tuple[int, int] = (0, 0),
+                           thresholds: Optional[dict] = None) -> List[Tuple[int, int, int, float]]:
+        """
+        Slide square windows over a grayscale image and keep icon-like ones.
+        
+        Args:
+            gray: Grayscale image (full frame or an ROI)
+            icon_sizes: Window sizes in pixels
+            step_ratio: Window step as a fraction of the window size
+            origin: Offset added to positions (ROI origin in the frame)
+            thresholds: Feature thresholds (defaults to ICON_WINDOW_THRESHOLDS)
+            
+        Returns:
+            (center_x, center_y, size, score) tuples in frame coordinates
+        """
+        t = thresholds or ICON_WINDOW_THRESHOLDS
+        ox, oy = origin
+        candidates = []
         
         for icon_size in icon_sizes:
-            step = icon_size // 2
+            step = max(1, int(icon_size * step_ratio))
             
             for y in range(0, gray.shape[0] - icon_size, step):
                 for x in range(0, gray.shape[1] - icon_size, step):
@@ -314,18 +1471,28 @@ class IconGrounding:
                     mean = np.mean(roi)
                     std = np.std(roi)
                     
-                    # Icon characteristics
-                    if (300 < variance < 8000 and 40 < mean < 220 and std > 15):
+                    # Icon characteristics:
+                    # - Medium to high variance (detailed images)
+                    # - Reasonable brightness (not too dark or bright)
+                    # - Good contrast (high std)
+                    if (t["min_variance"] < variance < t["max_variance"] and
+                            t["min_mean"] < mean < t["max_mean"] and
+                            std > t["min_std"]):
+                        # Icons have moderate edge density
                         edges_roi = cv2.Canny(roi, 50, 150)
                         edge_density = np.sum(edges_roi > 0) / (icon_size * icon_size)
                         
-                        if 0.05 < edge_density < 0.5:
-                            center_x = x + icon_size // 2
-                            center_y = y + icon_size // 2
+                        if t["min_edge_density"] < edge_density < t["max_edge_density"]:
+                            center_x = ox + x + icon_size // 2
+                            center_y = oy + y + icon_size // 2
                             score = variance * edge_density * (std / mean if mean > 0 else 0)
                             candidates.append((center_x, center_y, icon_size, score))
         
-        # Remove duplicates and sort by score
+        return candidates
+    
+    def _dedupe_candidates(self, candidates: List[Tuple[int, int, int, float]],
+                           min_distance: float = 50) -> List[Tuple[int, int, int, float]]:
+        """Merge detections closer than min_distance, keeping the best score."""
         filtered = []
         for candidate in candidates:
             x, y, size, score = candidate
@@ -333,7 +1500,7 @@ class IconGrounding:
             for existing in filtered:
                 ex, ey, _, _ = existing
                 distance = np.sqrt((x - ex)**2 + (y - ey)**2)
-                if distance < 50:
+                if distance < min_distance:
                     is_duplicate = True
                     if score > existing[3]:
                         filtered.remove(existing)
@@ -342,59 +1509,161 @@ class IconGrounding:
             if not is_duplicate:
                 filtered.append(candidate)
         
-        # Return as (x, y, size) tuples, sorted by score
-        filtered.sort(key=lambda x: x[3], reverse=True)
-        return [(x, y, size) for x, y, size, _ in filtered]
+        filtered.sort(key=lambda c: c[3], reverse=True)
+        return filtered
+    
+    def _find_icon_candidates_pyramid(self, gray: np.ndarray,
+                                      levels: int = 1) -> List[Tuple[int, int, int, float]]:
+        """
+        Coarse-to-fine icon candidate search.
+        
+        Candidates are proposed on a frame downsampled by 2**levels, then
+        verified and re-centred at full resolution inside a small ROI around
+        each proposal. The downsampling factor is an exact integer, so a
+        low-resolution window (x, y, k) covers exactly the full-resolution
+        box (x*s, y*s, k*s) and positions map back without rounding drift.
+        
+        Args:
+            gray: Full-resolution grayscale frame
+            levels: Number of 2x pyramid levels
+            
+        Returns:
+            (center_x, center_y, size, score) tuples in frame coordinates
+        """
+        scale = 2 ** levels
+        small = self._buffer("pyramid", (gray.shape[0] // scale, gray.shape[1] // scale))
+        small = self._downsample(gray, scale, dst=small)
+        
+        # Propose at low resolution: dense window statistics from integral
+        # images, with relaxed thresholds (averaging lowers variance and
+        # edge density)
+        low_sizes = [size // scale for size in ICON_SIZES if size // scale >= 8]
+        proposals = []
+        for x, y, low_size, score in self._propose_icon_windows(small, low_sizes, PYRAMID_PROPOSAL_THRESHOLDS):
+            # Low-res window (x, y, k) is exactly the full-res box (x*s, y*s, k*s)
+            proposals.append((x * scale, y * scale, low_size * scale, score))
+        
+        # Verify each proposal at full resolution inside its ROI only; the
+        # proposal is exact up to one low-res pixel, so search +/- scale
+        verified = []
+        height, width = gray.shape[:2]
+        step = max(1, scale // 2)
+        for x0, y0, size, _ in proposals:
+            rx0, ry0 = max(0, x0 - scale), max(0, y0 - scale)
+            rx1 = min(width, x0 + size + scale + 1)
+            ry1 = min(height, y0 + size + scale + 1)
+            roi = gray[ry0:ry1, rx0:rx1]
+            matches = self._scan_icon_windows(roi, [size], step_ratio=step / float(size),
+                                              origin=(rx0, ry0))
+            if matches:
+                verified.append(max(matches, key=lambda c: c[3]))
+        
+        return verified
+    
+    @staticmethod
+    def _propose_icon_windows(gray: np.ndarray, sizes: List[int],
+                              thresholds: dict) -> List[Tuple[int, int, int, float]]:
+        """
+        Evaluate the icon window features at every position at once.
+        
+        Mean, variance and edge density of all windows come from integral
+        images computed in one O(pixels) pass; only local score maxima that
+        pass the thresholds are returned.
+        
+        Returns:
+            (x, y, size, score) tuples for window top-left corners
+        """
+        t = thresholds
+        sums, sq_sums = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        edge_sums = cv2.integral(cv2.Canny(gray, 50, 150) // 255, sdepth=cv2.CV_32S)
+        
+        proposals = []
+        for size in sizes:
+            if gray.shape[0] <= size or gray.shape[1] <= size:
+                continue
+            
+            def window_sum(integral):
+                return (integral[size:, size:] - integral[:-size, size:]
+                        - integral[size:, :-size] + integral[:-size, :-size])
+            
+            n = float(size * size)
+            mean = window_sum(sums) / n
+            variance = np.maximum(window_sum(sq_sums) / n - mean * mean, 0)
+            std = np.sqrt(variance)
+            edge_density = window_sum(edge_sums) / n
+            
+            valid = ((t["min_variance"] < variance) & (variance < t["max_variance"]) &
+                     (t["min_mean"] < mean) & (mean < t["max_mean"]) &
+                     (std > t["min_std"]) &
+                     (t["min_edge_density"] < edge_density) & (edge_density < t["max_edge_density"]))
+            score = np.where(valid, variance * edge_density * std / np.maximum(mean, 1e-6), 0)
+            score = score.astype(np.float32)
+            
+            # Non-maximum suppression over a window-sized neighbourhood
+            local_max = (score == cv2.dilate(score, np.ones((size, size), np.uint8))) & valid
+            ys, xs = np.nonzero(local_max)
+            proposals.extend((int(x), int(y), size, float(score[y, x])) for x, y in zip(xs, ys))
+        
+        return proposals
+    
+    @staticmethod
+    def _downsample(gray: np.ndarray, scale: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Downsample by an exact integer factor (box filter).
+        
+        Trailing rows/columns that do not fill a whole block are dropped, so
+        low-res pixel (u, v) is the mean of full-res block [u*s, (u+1)*s).
+        """
+        height, width = gray.shape[:2]
+        h, w = height // scale, width // scale
+        return cv2.resize(gray[:h * scale, :w * scale], (w, h), dst=dst, interpolation=cv2.INTER_AREA)
     
     def _check_text_region_matches(self, text_region: np.ndarray, target_text: str) -> bool:
         """
         Check if text region contains the target text.
-        Uses simple pattern matching since OCR may not be available.
+        
+        The region is first matched against the target text rendered in the
+        UI fonts (label_matcher), which needs no OCR; OCR is only tried when
+        that fails and pytesseract is installed.
+        """
+        if label_matcher.matcher(target_text).matches(text_region):
+            return True
+        return self._ocr_text_matches(text_region, target_text.lower())
+    
+    @classmethod
+    def _ocr_text_matches(cls, text_region: np.ndarray, target_text: str) -> bool:
+        """OCR the region with pytesseract (if installed) and look for the target text."""
+        text = cls._ocr_text(text_region)
+        return text is not None and target_text in text
+    
+    @staticmethod
+    def _ocr_text(text_region: np.ndarray) -> Optional[str]:
+        """
+        Lower-cased OCR text of a label region, None if OCR is not available.
+        
+        A missing pytesseract or tesseract binary is remembered, so later
+        regions do not retry the import or the subprocess.
         """
-        # Method 1: Try OCR if pytesseract is available
+        global _ocr_available
+        if _ocr_available is False:
+            return None
         try:
             import pytesseract
+        except ImportError:
+            _ocr_available = False
+            return None
+        try:
             # Preprocess for better OCR
             _, binary = cv2.threshold(text_region, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             binary = cv2.resize(binary, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
             text = pytesseract.image_to_string(binary, config='--psm 6').strip().lower()
-            if target_text in text:
-                return True
-        except:
-            pass
-        
-        # Method 2: Simple pattern matching using character width analysis
-        # Desktop icon text has consistent character spacing
-        # We can detect if the text region has the right "shape" for the target text
-        
-        # Calculate text-like features
-        # Text regions have horizontal lines and consistent spacing
-        horizontal_projection = np.sum(text_region < 128, axis=0)  # Dark pixels (text)
-        
-        # Check if there are multiple text-like regions (characters)
-        text_regions = []
-        in_text = False
-        start = 0
-        
-        for i, val in enumerate(horizontal_projection):
-            if val > text_region.shape[0] * 0.3:  # Threshold for text
-                if not in_text:
-                    start = i
-                    in_text = True
-            else:
-                if in_text:
-                    text_regions.append((start, i))
-                    in_text = False
-        
-        # Estimate character count based on text regions
-        # "Notepad" has 7 characters, so we expect ~7 text regions
-        if len(text_regions) >= 5 and len(text_regions) <= 10:
-            # Could be "Notepad" or similar length text
-            # For now, return True if it looks like text
-            # In a more sophisticated implementation, we'd use OCR
-            return True
-        
-        return False
+        except pytesseract.TesseractNotFoundError:
+            _ocr_available = False
+            return None
+        except Exception:
+            return None
+        _ocr_available = True
+        return text
     
     def _find_icon_using_windows_api(self) -> Optional[Tuple[int, int]]:
         """Use Windows API to find Notepad shortcut location."""
@@ -433,80 +1702,74 @@ class IconGrounding:
         """
         Find Notepad icon by analyzing icon characteristics.
         Notepad icon has specific visual features we can detect.
+
+        Candidates are scored in one batch by the trained HOG + linear
+        classifier (config.CANDIDATE_MODEL_PATH); without a model file the
+        hand-tuned rules in _characteristics_scores are used.
         """
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
-        candidates = self._find_all_icon_candidates(gray)
+        gray = self._gray_frame()
+        candidates = self._notepad_icon_candidates()
         
         if not candidates:
             return None
         
-        # Score each candidate based on Notepad-specific characteristics
-        scored_candidates = []
+        points = np.array(candidates, dtype=np.int32)
+        classifier = candidate_classifier.load_classifier(config.CANDIDATE_MODEL_PATH)
+        if classifier is not None:
+            probabilities = classifier.score(gray, points[:, :2], points[:, 2])
+            best = int(np.argmax(probabilities))
+            if probabilities[best] >= config.CANDIDATE_MIN_PROBABILITY:
+                self._note_evidence(probabilities[best], (points[best, 2], points[best, 2]))
+                return (int(points[best, 0]), int(points[best, 1]))
+            return None
         
-        for x, y, size in candidates:
-            score = 0
-            
-            # Extract icon region
-            icon_region = gray[max(0, y-size//2):min(gray.shape[0], y+size//2),
-                              max(0, x-size//2):min(gray.shape[1], x+size//2)]
-            
-            if icon_region.size > 0:
-                # Notepad icon characteristics:
-                # 1. Has document-like features (rectangular with lines)
-                # 2. Medium contrast
-                # 3. Text-like patterns inside
-                
-                # Check for horizontal lines (document lines)
-                edges = cv2.Canny(icon_region, 50, 150)
-                horizontal_lines = np.sum(edges, axis=1)
-                line_count = np.sum(horizontal_lines > np.mean(horizontal_lines) * 1.5)
-                
-                if 2 <= line_count <= 5:  # Document-like
-                    score += 10
-                
-                # Check contrast (Notepad icon has medium contrast)
-                contrast = np.std(icon_region)
-                if 20 < contrast < 60:
-                    score += 5
-                
-                # Check text region below
-                text_y = y + size // 2 + 30
-                if text_y < gray.shape[0] - 30:
-                    text_region = gray[text_y:text_y+30, max(0, x-size):min(gray.shape[1], x+size)]
-                    if text_region.size > 0:
-                        # Check if text region has text-like patterns
-                        text_variance = np.var(text_region)
-                        if text_variance > 500:  # Text has high variance
-                            score += 10
-            
-            scored_candidates.append((x, y, score))
+        # Score each candidate based on Notepad-specific characteristics
+        scores = self._characteristics_scores(gray, points[:, :2], points[:, 2])
         
         # Return highest scoring candidate
-        if scored_candidates:
-            scored_candidates.sort(key=lambda x: x[2], reverse=True)
-            best = scored_candidates[0]
-            if best[2] > 15:  # Minimum score threshold
-                return (best[0], best[1])
+        best = int(np.argmax(scores))
+        if scores[best] > 15:  # Minimum score threshold
+            self._note_evidence(scores[best] / CHARACTERISTICS_MAX_SCORE, (points[best, 2], points[best, 2]))
+            return (int(points[best, 0]), int(points[best, 1]))
         
         return None
     
+    @staticmethod
+    def _characteristics_scores(gray: np.ndarray, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Hand-tuned Notepad scores for all candidates (used without a classifier model).
+        
+        Notepad icon characteristics:
+        1. Has document-like features (rectangular with lines): 2-5 rows
+           of the icon crop have a Canny edge sum above 1.5x the mean
+        2. Medium contrast: 20 < std < 60
+        3. Text-like patterns below: label region variance > 500
+        """
+        measured = candidate_measure.measure_icons(gray, centers, sizes)
+        document_like = measured.icon_valid & (measured.line_count >= 2) & (measured.line_count <= 5)
+        medium_contrast = measured.icon_valid & (measured.contrast > 20) & (measured.contrast < 60)
+        has_label = measured.label_valid & (measured.label_variance > 500)
+        return document_like * 10 + medium_contrast * 5 + has_label * 10
+    
     def _find_icon_in_grid_with_text_check(self) -> Optional[Tuple[int, int]]:
-        """Find icon in grid and verify with text check."""
-        result = self._find_icon_in_grid()
-        if result:
-            # Verify it's Notepad by checking text
-            x, y = result
-            gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
-            
-            # Check text region
-            text_y = y + 40
-            if text_y < gray.shape[0] - 30:
-                text_region = gray[text_y:text_y+30, max(0, x-60):min(gray.shape[1], x+60)]
-                if self._check_text_region_matches(text_region, "notepad"):
-                    return result
+        """Find icon in grid (as _find_icon_in_grid) and verify its label text."""
+        if self.screenshot is None:
+            self.capture_desktop_screenshot()
+        
+        gray = self._gray_frame()
+        candidates = self._scan_icon_candidates(gray)
+        if not candidates:
+            return None
+        
+        # Verify it's Notepad by checking the text of its label
+        x, y, size, _ = candidates[0]
+        box_x, box_y, width, height = self._label_boxes(np.array([[x, y, size]], dtype=np.int64))[0]
+        if width > 0 and height > 0 and \
+                self._check_text_region_matches(gray[box_y:box_y+height, box_x:box_x+width], "Notepad"):
+            return (x, y)
         
         return None
     
@@ -519,91 +1782,35 @@ class IconGrounding:
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        gray = cv2.cvtColor(self.screenshot, cv2.COLOR_BGR2GRAY)
+        gray = self._gray_frame()
         
         # Use a multi-scale sliding window approach to find icon-like regions
-        # Desktop icons can be different sizes (small, medium, large)
-        icon_sizes = [32, 48, 64, 96]  # Different icon sizes in pixels
-        step_ratio = 0.5  # Overlap between windows
+        # Desktop icons can be different sizes (small, medium, large);
+        # nearby detections at multiple scales are merged
+        candidates = self._scan_icon_candidates(gray)
         
-        all_candidates = []
-        
-        for icon_size in icon_sizes:
-            step = int(icon_size * step_ratio)
-            candidates = []
-            
-            for y in range(0, gray.shape[0] - icon_size, step):
-                for x in range(0, gray.shape[1] - icon_size, step):
-                    roi = gray[y:y+icon_size, x:x+icon_size]
-                    
-                    # Calculate features that indicate an icon
-                    variance = np.var(roi)
-                    mean = np.mean(roi)
-                    std = np.std(roi)
-                    
-                    # Icons have specific characteristics:
-                    # - Medium to high variance (detailed images)
-                    # - Reasonable brightness (not too dark or bright)
-                    # - Good contrast (high std)
-                    if (300 < variance < 8000 and 
-                        40 < mean < 220 and 
-                        std > 15):
-                        
-                        # Additional check: icons often have edges
-                        edges_roi = cv2.Canny(roi, 50, 150)
-                        edge_density = np.sum(edges_roi > 0) / (icon_size * icon_size)
-                        
-                        # Icons have moderate edge density
-                        if 0.05 < edge_density < 0.5:
-                            center_x = x + icon_size // 2
-                            center_y = y + icon_size // 2
-                            # Score based on multiple factors
-                            score = variance * edge_density * (std / mean if mean > 0 else 0)
-                            candidates.append((center_x, center_y, score, icon_size))
-            
-            all_candidates.extend(candidates)
-        
-        if all_candidates:
-            # Remove duplicates (icons detected at multiple scales)
-            # Group nearby detections
-            filtered_candidates = []
-            for candidate in all_candidates:
-                x, y, score, size = candidate
-                is_duplicate = False
-                
-                for existing in filtered_candidates:
-                    ex, ey, _, _ = existing
-                    distance = np.sqrt((x - ex)**2 + (y - ey)**2)
-                    # If within 50 pixels, consider it a duplicate
-                    if distance < 50:
-                        is_duplicate = True
-                        # Keep the one with higher score
-                        if score > existing[2]:
-                            filtered_candidates.remove(existing)
-                            filtered_candidates.append(candidate)
-                        break
-                
-                if not is_duplicate:
-                    filtered_candidates.append(candidate)
-            
-            if filtered_candidates:
-                # Sort by score (higher = more likely to be an icon)
-                filtered_candidates.sort(key=lambda x: x[2], reverse=True)
-                # Return the best candidate
-                best = filtered_candidates[0]
-                return (best[0], best[1])
+        if candidates:
+            # Return the best candidate (higher score = more likely an icon)
+            best = candidates[0]
+            return (best[0], best[1])
         
         return None
     
-    def save_annotated_screenshot(self, icon_position: Tuple[int, int], 
-                                  output_path: str, 
-                                  label: str = "Icon Detected"):
-        """Save an annotated screenshot showing the detected icon."""
+    def annotate_screenshot(self, icon_position: Tuple[int, int],
+                            label: str = "Icon Detected") -> np.ndarray:
+        """
+        Copy of the screenshot with the detected icon (screen position)
+        marked (read-only, pooled: valid until the next annotation).
+        """
         if self.screenshot is None:
             self.capture_desktop_screenshot()
         
-        annotated = self.screenshot.copy()
-        x, y = icon_position
+        annotated = self._buffer("annotated", self.screenshot.shape)
+        if annotated is None:
+            annotated = self.screenshot.copy()
+        else:
+            np.copyto(annotated, self.screenshot)
+        x, y = icon_position[0] - self.origin[0], icon_position[1] - self.origin[1]
         
         # Draw circle at icon position
         cv2.circle(annotated, (x, y), 30, (0, 255, 0), 3)
@@ -612,9 +1819,17 @@ class IconGrounding:
         # Add label
         cv2.putText(annotated, label, (x + 40, y - 10),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(annotated, f"({x}, {y})", (x + 40, y + 20),
+        cv2.putText(annotated, f"({icon_position[0]}, {icon_position[1]})", (x + 40, y + 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        return buffer_pool.readonly(annotated)
+    
+    def save_annotated_screenshot(self, icon_position: Tuple[int, int], 
+                                  output_path: str, 
+                                  label: str = "Icon Detected"):
+        """Save an annotated screenshot showing the detected icon."""
+        annotated = self.annotate_screenshot(icon_position, label)
         
         # Save annotated screenshot
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         cv2.imwrite(output_path, annotated)
         print(f"Annotated screenshot saved to {output_path}")
@@ -0,0 +1,142 @@
+"""
+OCR-free label verification against rendered glyph templates.
+
+The target string is rendered with PIL in the desktop's UI fonts
+(config.LABEL_FONTS) at several pixel sizes, light-on-dark and
+dark-on-light, binarized, cropped to its ink and cached per string. A
+label crop is binarized with Otsu's threshold and cropped to its ink (the
+minority class) in the same way; every render whose size is close to the
+crop's ink is compared with it by normalized cross-correlation
+(cv2.matchTemplate with TM_CCOEFF_NORMED). The best correlation is the
+label's score, so "Notes" or "Notepad++" score low against "Notepad"
+where a count of character runs would accept both.
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+
+LABEL_FONT_SIZES = (11, 12, 13, 14, 15, 16)  # px; 9 pt labels at 100-150% scaling
+SIZE_TOLERANCE = 0.2  # renders within this relative width/height of the crop's ink are compared
+MATCH_MARGIN = 2  # px of background kept around the crop's ink
+MIN_INK_PIXELS = 8  # fewer ink pixels: the crop holds no text
+
+
+class GlyphTemplate(NamedTuple):
+    """One binarized render of a label string."""
+    image: np.ndarray  # uint8, 255 = light
+    font: str
+    size: int  # px
+    light_on_dark: bool
+
+
+_cache = {}
+
+
+def _fonts(size: int) -> List[Tuple[str, "ImageFont.FreeTypeFont"]]:
+    """(name, font) of every available UI font at size, PIL's default font if none is installed."""
+    fonts = []
+    for name in config.LABEL_FONTS:
+        try:
+            fonts.append((name, ImageFont.truetype(name, size)))
+        except OSError:
+            continue
+    if fonts:
+        return fonts
+    try:
+        return [("default", ImageFont.load_default(size=size))]
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return [("default", ImageFont.load_default())]
+
+
+def _ink_box(binary: np.ndarray, ink: int) -> Optional[Tuple[int, int, int, int]]:
+    """(x, y, width, height) bounding the pixels equal to ink, None if there are too few."""
+    ys, xs = np.nonzero(binary == ink)
+    if len(xs) < MIN_INK_PIXELS:
+        return None
+    return int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)
+
+
+def render_templates(text: str) -> List[GlyphTemplate]:
+    """Binarized renders of text in every UI font and size, both polarities (cached per string)."""
+    if text not in _cache:
+        templates = []
+        for size in LABEL_FONT_SIZES:
+            for name, font in _fonts(size):
+                left, top, right, bottom = font.getbbox(text)
+                image = Image.new("L", (right - left + 2, bottom - top + 2), 0)
+                ImageDraw.Draw(image).text((1 - left, 1 - top), text, font=font, fill=255)
+                light = np.where(np.asarray(image) >= 128, 255, 0).astype(np.uint8)
+                box = _ink_box(light, 255)
+                if box is None:
+                    continue
+                x, y, width, height = box
+                light = np.ascontiguousarray(light[y:y + height, x:x + width])
+                templates.append(GlyphTemplate(light, name, size, True))
+                templates.append(GlyphTemplate(255 - light, name, size, False))
+        _cache[text] = templates
+    return _cache[text]
+
+
+class LabelMatcher:
+    """Scores label crops against the renders of one target string."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.templates = render_templates(text)
+
+    def score(self, region: np.ndarray) -> float:
+        """
+        Best normalized cross-correlation of a grayscale label crop with the renders.
+
+        Returns:
+            -1..1; 0 when the crop holds no text of a comparable size
+        """
+        if region.size == 0:
+            return 0.0
+        _, binary = cv2.threshold(region, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        ink = 255 if np.count_nonzero(binary) * 2 < binary.size else 0
+        box = _ink_box(binary, ink)
+        if box is None:
+            return 0.0
+        x, y, width, height = box
+        crop = binary[y:y + height, x:x + width]
+
+        best = 0.0
+        for template in self.templates:
+            t_height, t_width = template.image.shape
+            if abs(t_width - width) > SIZE_TOLERANCE * width or abs(t_height - height) > SIZE_TOLERANCE * height:
+                continue
+            # Pad the crop with its background so the render fits at every offset
+            pad_x = max(0, t_width - width) // 2 + MATCH_MARGIN
+            pad_y = max(0, t_height - height) // 2 + MATCH_MARGIN
+            padded = cv2.copyMakeBorder(crop, pad_y, pad_y, pad_x, pad_x, cv2.BORDER_CONSTANT, value=255 - ink)
+            correlation = cv2.matchTemplate(padded, template.image, cv2.TM_CCOEFF_NORMED)
+            best = max(best, float(correlation.max()))
+        return best
+
+    def scores(self, gray: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """
+        Score of every (x, y, width, height) box of a grayscale frame.
+
+        Returns:
+            (N,) scores; 0 for empty boxes
+        """
+        scores = np.zeros(len(boxes))
+        for index, (x, y, width, height) in enumerate(boxes):
+            if width > 0 and height > 0:
+                scores[index] = self.score(gray[y:y + height, x:x + width])
+        return scores
+
+    def matches(self, region: np.ndarray) -> bool:
+        """Whether a label crop reads as the target string (config.LABEL_MATCH_MIN_SCORE)."""
+        return self.score(region) >= config.LABEL_MATCH_MIN_SCORE
+
+
+def matcher(text: str) -> LabelMatcher:
+    """LabelMatcher for text, sharing the cached renders."""
+    return LabelMatcher(text)
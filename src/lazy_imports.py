@@ -0,0 +1,101 @@
+"""
+Lazy module loading and cached backend detection.
+
+Heavy dependencies (cv2, numpy, PIL, pyautogui, requests) are only imported
+the first time one of their attributes is used, so importing the bot modules
+stays cheap. The BotCity/pyautogui backend is detected once per process.
+"""
+import importlib
+import sys
+import types
+from typing import Any, NamedTuple, Optional
+
+
+class _LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        # Module settings (e.g. pyautogui.PAUSE) must reach the real module
+        if attr.startswith("__") and attr.endswith("__"):
+            super().__setattr__(attr, value)
+        else:
+            setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str):
+        if attr.startswith("__") and attr.endswith("__"):
+            super().__delattr__(attr)
+        else:
+            delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Return a module that is imported on first use.
+
+    If the module was already imported elsewhere, the real module is returned.
+    A missing module only raises ImportError when it is first used.
+
+    Args:
+        name: Fully qualified module name (e.g. "cv2", "PIL.Image")
+
+    Returns:
+        The real module if already loaded, otherwise a lazy proxy
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """Check whether a module has actually been imported."""
+    return name in sys.modules
+
+
+class Backend(NamedTuple):
+    """Result of the one-time BotCity backend detection."""
+    desktop_bot: type
+    maestro_sdk: type
+    botcity_available: bool
+
+
+_backend: Optional[Backend] = None
+
+
+def detect_backend() -> Backend:
+    """
+    Detect whether the BotCity framework is installed.
+
+    Falls back to the pyautogui-based compatibility wrapper. The result is
+    cached, so the (slow) import attempt only happens once per process.
+    """
+    global _backend
+    if _backend is None:
+        try:
+            from botcity.core import DesktopBot, BotCityMaestroSDK
+            _backend = Backend(DesktopBot, BotCityMaestroSDK, True)
+        except ImportError:
+            from botcity_compat import DesktopBot, BotCityMaestroSDK
+            _backend = Backend(DesktopBot, BotCityMaestroSDK, False)
+    return _backend
@@ -2,7 +2,6 @@
 Main automation bot for desktop icon grounding and Notepad automation.
 """
 import sys
-import pyautogui
 from pathlib import Path
 
 # Add src to path before other imports
@@ -10,19 +9,22 @@ src_path = Path(__file__).parent
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
-try:
-    from botcity.core import DesktopBot, BotCityMaestroSDK
-    from botcity.core.backend import Backend
-    BOTCITY_AVAILABLE = True
-except ImportError:
+from lazy_imports import detect_backend, lazy_import
+
+DesktopBot, BotCityMaestroSDK, BOTCITY_AVAILABLE = detect_backend()
+if not BOTCITY_AVAILABLE:
     # Use compatible wrapper if BotCity is not available
     print("WARNING: BotCity framework not found. Using compatible wrapper with pyautogui.")
-    from botcity_compat import DesktopBot, BotCityMaestroSDK
-    BOTCITY_AVAILABLE = False
+
+pyautogui = lazy_import("pyautogui")
+evidence_archive = lazy_import("evidence_archive")
 
 from icon_grounding import IconGrounding
 from notepad_automation import NotepadAutomation
 from api_client import APIClient
+from action_plan import ActionPlan
+from stage_timer import StageTimer
+from memory_monitor import MemoryMonitor
 import config
 
 class DesktopAutomationBot(DesktopBot):
@@ -30,11 +32,16 @@ class DesktopAutomationBot(DesktopBot):
     
     def action(self, execution=None):
         """Main bot action."""
+        timer = StageTimer(sample_rss=config.MEMORY_PROFILE)
+        memory = MemoryMonitor(config.MEMORY_TOP_ALLOCATIONS).start() if config.MEMORY_PROFILE else None
         try:
             # Initialize components
-            icon_grounding = IconGrounding(self)
             notepad_automation = NotepadAutomation(self)
+            icon_grounding = IconGrounding(self, window_tracker=notepad_automation.window_tracker)
             api_client = APIClient(config.API_BASE_URL)
+            evidence = None
+            if config.EVIDENCE_DIR is not None:
+                evidence = evidence_archive.EvidenceArchive(config.EVIDENCE_DIR)
             
             print("=" * 60)
             print("Desktop Automation Bot - Starting")
@@ -42,118 +49,31 @@ class DesktopAutomationBot(DesktopBot):
             
             # Fetch posts from API
             print("\n[1/5] Fetching blog posts from API...")
-            posts = api_client.fetch_posts(limit=config.MAX_POSTS)
+            with timer.stage("fetch"):
+                posts = api_client.fetch_posts(limit=config.MAX_POSTS)
             
             if not posts:
                 print("ERROR: No posts fetched from API. Exiting.")
                 return
             
-            print(f"✓ Successfully fetched {len(posts)} posts")
+            print(f"✓ Successfully fetched {len(posts)} posts ({api_client.metrics})")
             
             # Process each post
             for idx, post in enumerate(posts, 1):
-                print(f"\n{'=' * 60}")
-                print(f"Processing Post {idx}/{len(posts)} (ID: {post['id']})")
-                print(f"{'=' * 60}")
-                
-                # Step 1: Capture screenshot and find icon
-                print("\n[2/5] Capturing desktop screenshot...")
-                icon_grounding.capture_desktop_screenshot()
-                print("✓ Screenshot captured")
-                
-                print("\n[3/5] Locating Notepad icon...")
-                icon_position = icon_grounding.find_notepad_icon(
-                    retry_attempts=config.ICON_RETRY_ATTEMPTS,
-                    retry_delay=config.ICON_RETRY_DELAY
-                )
-                
-                if not icon_position:
-                    print("ERROR: Could not locate Notepad icon. Skipping post.")
-                    continue
-                
-                x, y = icon_position
-                print(f"✓ Icon found at coordinates: ({x}, {y})")
-                
-                # Save annotated screenshot for first 3 posts in different positions
-                if idx <= 3:
-                    screen_width, screen_height = pyautogui.size()
-                    x, y = icon_position
-
-                    if x < screen_width * 0.33 and y < screen_height * 0.33:
-                        location = "top_left"
-                    elif x > screen_width * 0.66 and y > screen_height * 0.66:
-                        location = "bottom_right"
-                    else:
-                        location = "center"
-
-                    screenshot_name = f"icon_detected_{location}.png"
-                    screenshot_path = config.SCREENSHOT_DIR / screenshot_name
-                    icon_grounding.save_annotated_screenshot(
-                        icon_position,
-                        str(screenshot_path),
-                        label=f"Icon detected in {location.replace('_', ' ')}"
-                    )
-
-                
-                # Step 2: Launch Notepad
-                print("\n[4/5] Launching Notepad...")
-                if not notepad_automation.launch_notepad(icon_position):
-                    print("ERROR: Failed to launch Notepad. Skipping post.")
-                    continue
-                print("✓ Notepad launched successfully")
-                
-                # Step 3: Type post content
-                print("\n[5/5] Typing post content...")
-                post_content = config.FILE_FORMAT.format(
-                    title=post['title'],
-                    body=post['body']
-                )
-                
-                # Clear any existing text
-                self.control_a()
-                self.wait(200)
-
-                # Create new file
-                self.control_n()
-                self.wait(200)
-
-
-
-
-                
-                # Type the content
-                notepad_automation.type_text(post_content, delay=0.03)
-                print("✓ Content typed")
-                
-                # Step 4: Save file
-                print("\nSaving file...")
-                filename = f"post_{post['id']}.txt"
-                notepad_automation.save_file(filename, config.PROJECT_DIR)
-                print(f"✓ File saved: {filename}")
-
-                self.wait(500)
-
-                self.yes()
-
-                self.wait(500)
-
-                # Step 5: Close Notepad
-                print("\nClosing Notepad...")
-                notepad_automation.close_notepad()
-                print("✓ Notepad closed")
-                
-                # Wait before next iteration
-                self.wait(500)
-
-                #deselect notepad icon
-                self.move_to(100, 100)
-                self.double_click()
+                with timer.stage("post", post['id']):
+                    self._process_post(idx, len(posts), post, timer, icon_grounding, notepad_automation, evidence)
+                if memory is not None:
+                    print(f"\nMemory after post {post['id']}: {memory.format_sample(memory.sample(post['id']))}")
             
             print("\n" + "=" * 60)
             print("Automation completed successfully!")
             print("=" * 60)
             print(f"\nFiles saved to: {config.PROJECT_DIR}")
-            print(f"Screenshots saved to: {config.SCREENSHOT_DIR}")
+            if evidence is not None:
+                print(f"Evidence saved to: {config.EVIDENCE_DIR}")
+                print(evidence.format_summary())
+            else:
+                print(f"Screenshots saved to: {config.SCREENSHOT_DIR}")
 
             
             
@@ -162,6 +82,145 @@ class DesktopAutomationBot(DesktopBot):
             import traceback
             traceback.print_exc()
             raise
+        finally:
+            self._report_timings(timer)
+            if memory is not None:
+                self._report_memory(memory)
+    
+    def _process_post(self, idx, total, post, timer, icon_grounding, notepad_automation, evidence=None):
+        """Ground, launch, type, save and close for one post; every step is a timed stage."""
+        post_id = post['id']
+        print(f"\n{'=' * 60}")
+        print(f"Processing Post {idx}/{total} (ID: {post_id})")
+        print(f"{'=' * 60}")
+        
+        # Step 1: Capture screenshot and find icon
+        print("\n[2/5] Capturing desktop screenshot...")
+        with timer.stage("capture", post_id):
+            icon_grounding.capture_desktop_screenshot()
+        print(f"✓ Screenshot captured ({icon_grounding.scan_stats})")
+        
+        print("\n[3/5] Locating Notepad icon...")
+        with timer.stage("ground", post_id):
+            icon_position = icon_grounding.find_notepad_icon(
+                retry_attempts=config.ICON_RETRY_ATTEMPTS,
+                retry_delay=config.ICON_RETRY_DELAY,
+                budget=config.GROUNDING_BUDGET
+            )
+        
+        if evidence is not None:
+            # Crop, thumbnail and delta-encoded frame for every post, found or not
+            with timer.stage("evidence", post_id):
+                frame_position = None
+                if icon_position:
+                    origin = icon_grounding.origin
+                    frame_position = (icon_position[0] - origin[0], icon_position[1] - origin[1])
+                record = evidence.record(post_id, icon_grounding.screenshot, frame_position, label="Notepad")
+            print(f"✓ Evidence saved ({record.kind} frame, {record.bytes:,} bytes, {record.encode_ms:.1f} ms)")
+        
+        if not icon_position:
+            print("ERROR: Could not locate Notepad icon. Skipping post.")
+            return
+        
+        x, y = icon_position
+        print(f"✓ Icon found at coordinates: ({x}, {y})")
+        
+        # Without evidence mode: full annotated screenshots for the first
+        # 3 posts in different positions
+        if evidence is None and idx <= 3:
+            screen_width, screen_height = pyautogui.size()
+            x, y = icon_position
+
+            if x < screen_width * 0.33 and y < screen_height * 0.33:
+                location = "top_left"
+            elif x > screen_width * 0.66 and y > screen_height * 0.66:
+                location = "bottom_right"
+            else:
+                location = "center"
+
+            screenshot_name = f"icon_detected_{location}.png"
+            screenshot_path = config.SCREENSHOT_DIR / screenshot_name
+            icon_grounding.save_annotated_screenshot(
+                icon_position,
+                str(screenshot_path),
+                label=f"Icon detected in {location.replace('_', ' ')}"
+            )
+
+        
+        # Step 2: Launch Notepad
+        print("\n[4/5] Launching Notepad...")
+        with timer.stage("launch", post_id):
+            launched = notepad_automation.launch_notepad(icon_position)
+        if not launched:
+            icon_grounding.reject_detection()
+            print("ERROR: Failed to launch Notepad. Skipping post.")
+            return
+        # Harvest a template only if a new Notepad window was seen
+        icon_grounding.confirm_detection(harvest=notepad_automation.launch_observed)
+        print("✓ Notepad launched successfully")
+        
+        # Step 3: Type post content
+        print("\n[5/5] Typing post content...")
+        post_content = config.FILE_FORMAT.format(
+            title=post['title'],
+            body=post['body']
+        )
+        
+        with timer.stage("type", post_id):
+            # Clear any existing text, then create a new file
+            with ActionPlan("new file") as plan:
+                plan.hotkey('ctrl', 'a').pause(200)
+                plan.hotkey('ctrl', 'n').pause(200)
+            
+            # Type the content
+            notepad_automation.type_text(post_content, delay=0.03)
+        print("✓ Content typed")
+        
+        # Step 4: Save file
+        print("\nSaving file...")
+        filename = f"post_{post_id}.txt"
+        with timer.stage("save", post_id):
+            notepad_automation.save_file(filename, config.ensure_dir(config.PROJECT_DIR))
+        print(f"✓ File saved: {filename}")
+
+        with timer.stage("confirm", post_id):
+            with ActionPlan("confirm save") as plan:
+                plan.pause(500).hotkey('alt', 'y').pause(500)
+
+        # Step 5: Close Notepad
+        print("\nClosing Notepad...")
+        with timer.stage("close", post_id):
+            notepad_automation.close_notepad()
+            
+            # Wait before next iteration, then deselect the notepad icon
+            with ActionPlan("deselect") as plan:
+                plan.pause(500).move(100, 100).double_click()
+        print("✓ Notepad closed")
+    
+    @staticmethod
+    def _report_timings(timer):
+        """Print per-stage p50/p95/max and export the spans (config.TIMINGS_DIR)."""
+        if not timer.spans:
+            return
+        print("\nStage timings:")
+        print(timer.format_summary())
+        if config.TIMINGS_DIR is not None:
+            try:
+                paths = timer.export(config.TIMINGS_DIR)
+                print(f"Timings written to {paths[0]} and {paths[1]}")
+            except OSError as e:
+                print(f"Could not write timings: {e}")
+
+    @staticmethod
+    def _report_memory(memory):
+        """Print RSS and traced memory per post and warn when steady-state growth exceeds the budget."""
+        memory.stop()
+        if not memory.samples:
+            return
+        print("\nMemory per post:")
+        print(memory.format_summary(config.MEMORY_WARMUP_POSTS))
+        if not memory.within_budget(config.MEMORY_GROWTH_BUDGET, config.MEMORY_WARMUP_POSTS):
+            print(f"WARNING: memory grows by more than {config.MEMORY_GROWTH_BUDGET / 1024:.0f} KB per post")
 
 def main():
     """Main entry point."""
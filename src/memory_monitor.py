@@ -0,0 +1,201 @@
+"""
+Per-post memory instrumentation for long runs.
+
+rss_bytes() reads the resident set size of the process (psutil when it is
+installed, /proc/self/statm on Linux, GetProcessMemoryInfo on Windows);
+StageTimer records it after every stage when asked to. MemoryMonitor takes a
+tracemalloc snapshot after every post and keeps the top allocation sites
+that grew since the previous post, so a frame or candidate list that
+outlives its post shows up with its file and line. growth_per_post() fits
+a line through the samples after a warm-up, which is the steady-state
+growth a budget can be checked against (bench_memory.py).
+"""
+import importlib.util
+import os
+import sys
+import tracemalloc
+from typing import List, NamedTuple, Optional
+
+# Allocation sites that are part of the instrumentation itself
+_IGNORED = (__file__, tracemalloc.__file__, importlib.util.__file__, "<frozen importlib._bootstrap>",
+            "<frozen importlib._bootstrap_external>", "<unknown>")
+
+_HAS_PSUTIL = importlib.util.find_spec("psutil") is not None
+_HAS_RESET_PEAK = hasattr(tracemalloc, "reset_peak")  # Python 3.9+; no per-post peak before
+
+
+class AllocationDiff(NamedTuple):
+    """Growth of one allocation site between two posts."""
+    location: str  # "file:line"
+    size_diff: int  # bytes
+    count_diff: int  # blocks
+    size: int  # bytes allocated at the site after the post
+
+
+class MemorySample(NamedTuple):
+    """Memory after one post."""
+    post: Optional[int]
+    rss: Optional[int]  # bytes, None if RSS cannot be read on this platform
+    traced: int  # bytes currently allocated through tracemalloc
+    traced_peak: Optional[int]  # high-water mark of traced since the previous sample (None on Python 3.8)
+    top: List[AllocationDiff]  # largest growth since the previous post, biggest first
+
+
+def _windows_rss() -> Optional[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = Counters()
+    counters.cb = ctypes.sizeof(Counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return int(counters.WorkingSetSize)
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process in bytes, None if it cannot be read."""
+    if _HAS_PSUTIL:
+        import psutil
+        return int(psutil.Process().memory_info().rss)
+    try:
+        if sys.platform == "win32":
+            return _windows_rss()
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+def _slope(values: List[float]) -> float:
+    """Least-squares slope of values against their index."""
+    n = len(values)
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / n
+    numerator = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    denominator = sum((i - mean_x) ** 2 for i in range(n))
+    return numerator / denominator if denominator else 0.0
+
+
+class MemoryMonitor:
+    """tracemalloc snapshot and RSS sample after every post."""
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        """
+        Args:
+            top: Allocation sites kept per sample
+            frames: Stack frames tracemalloc stores per allocation (more
+                frames locate leaks better and cost more)
+        """
+        self.top = top
+        self.frames = frames
+        self.samples: List[MemorySample] = []
+        self._snapshot = None
+        self._started_tracing = False
+
+    def start(self) -> "MemoryMonitor":
+        """Start tracemalloc (if nobody else did) and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._snapshot = self._take_snapshot()
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+        return self
+
+    def stop(self):
+        """Stop tracemalloc if start() started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    def __enter__(self) -> "MemoryMonitor":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+
+    def sample(self, post: Optional[int] = None) -> MemorySample:
+        """Record memory after a post and the allocation sites that grew since the last one."""
+        if self._snapshot is None:
+            self.start()
+        traced, peak = tracemalloc.get_traced_memory()
+        snapshot = self._take_snapshot()
+        top = []
+        for stat in snapshot.compare_to(self._snapshot, "lineno"):
+            if len(top) == self.top:
+                break
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            top.append(AllocationDiff(f"{frame.filename}:{frame.lineno}", stat.size_diff,
+                                      stat.count_diff, stat.size))
+        self._snapshot = snapshot
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+        else:
+            peak = None  # only the peak since tracing started is known
+        sample = MemorySample(post, rss_bytes(), traced, peak, top)
+        self.samples.append(sample)
+        return sample
+
+    def growth_per_post(self, warmup: int = 3, field: str = "rss") -> Optional[float]:
+        """
+        Steady-state growth in bytes per post.
+
+        Args:
+            warmup: Samples skipped while caches, pools and lazy imports fill up
+            field: "rss" or "traced"
+
+        Returns:
+            Slope of a least-squares line through the remaining samples,
+            None with fewer than two of them (or no RSS)
+        """
+        values = [getattr(s, field) for s in self.samples[warmup:]]
+        if len(values) < 2 or any(v is None for v in values):
+            return None
+        return _slope(values)
+
+    def within_budget(self, budget: float, warmup: int = 3) -> bool:
+        """Whether RSS and traced growth per post both stay within budget (bytes per post)."""
+        for field in ("rss", "traced"):
+            growth = self.growth_per_post(warmup, field)
+            if growth is not None and growth > budget:
+                return False
+        return True
+
+    def format_sample(self, sample: MemorySample) -> str:
+        """One line per sample plus its top allocation diffs."""
+        rss = f"{sample.rss / 2**20:.1f} MB" if sample.rss is not None else "n/a"
+        peak = f"{sample.traced_peak / 2**20:.1f} MB" if sample.traced_peak is not None else "n/a"
+        lines = [f"RSS {rss}, traced {sample.traced / 2**20:.1f} MB (peak {peak})"]
+        for diff in sample.top:
+            lines.append(f"  +{diff.size_diff / 1024:9.1f} KB {diff.count_diff:+6d} blocks  {diff.location}")
+        return "\n".join(lines)
+
+    def format_summary(self, warmup: int = 3) -> str:
+        """RSS and traced memory per post and the steady-state growth."""
+        lines = [f"{'post':>6s} {'RSS MB':>9s} {'traced MB':>10s} {'peak MB':>9s}"]
+        for s in self.samples:
+            rss = f"{s.rss / 2**20:9.1f}" if s.rss is not None else f"{'n/a':>9s}"
+            post = "-" if s.post is None else str(s.post)
+            peak = f"{s.traced_peak / 2**20:9.1f}" if s.traced_peak is not None else f"{'':>9s}"
+            lines.append(f"{post:>6s} {rss} {s.traced / 2**20:10.2f} {peak}")
+        for field in ("rss", "traced"):
+            growth = self.growth_per_post(warmup, field)
+            if growth is not None:
+                lines.append(f"{field} growth after {warmup} posts: {growth / 1024:+.1f} KB/post")
+        return "\n".join(lines)
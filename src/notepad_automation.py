@@ -1,23 +1,44 @@
 """Notepad automation using BotCity."""
+from __future__ import annotations
+
 import time
 from pathlib import Path
-from typing import Optional
-try:
-    from botcity.core import DesktopBot
-    from botcity.core.backend import Backend
-except ImportError:
+from typing import TYPE_CHECKING, Optional
+
+import config
+from action_plan import ActionPlan
+from window_tracker import WindowTracker
+
+if TYPE_CHECKING:
     from botcity_compat import DesktopBot
-try:
-    import pygetwindow as gw
-except ImportError:
-    gw = None
 
 class NotepadAutomation:
     """Handles automation of Notepad application."""
     
-    def __init__(self, bot: DesktopBot):
+    def __init__(self, bot: DesktopBot, window_tracker: Optional[WindowTracker] = None):
         self.bot = bot
         self.notepad_window = None
+        # Whether the last launch_notepad saw a new Notepad window appear
+        # (False without a window tracker, where the launch is assumed)
+        self.launch_observed = False
+        self._window_tracker = window_tracker
+        self._tracker_checked = window_tracker is not None
+    
+    @property
+    def window_tracker(self) -> Optional[WindowTracker]:
+        """Window tracker, created and started on first use (None if unsupported)."""
+        if not self._tracker_checked:
+            self._tracker_checked = True
+            self._window_tracker = WindowTracker.create_default()
+        if self._window_tracker is not None:
+            self._window_tracker.start()
+        return self._window_tracker
+    
+    def _ensure_focused(self):
+        """Focus the Notepad window unless it already has focus."""
+        tracker = self.window_tracker
+        if tracker and self.notepad_window:
+            tracker.activate(self.notepad_window)
     
     def launch_notepad(self, icon_position: tuple) -> bool:
         """
@@ -29,55 +50,61 @@ class NotepadAutomation:
         Returns:
             True if Notepad launched successfully, False otherwise
         """
+        self.launch_observed = False
         try:
             x, y = icon_position
+            tracker = self.window_tracker
+            existing = ({w.window_id for w in tracker.find(title=config.NOTEPAD_WINDOW_TITLE)}
+                        if tracker is not None else set())
             
-            # Move mouse to icon position
-            self.bot.move_to(x, y)
-            time.sleep(0.2)
-            
-            # Double-click to launch
-            self.bot.double_click()
-            time.sleep(1.0)  # Wait for Notepad to launch
+            # Move to the icon and double-click it in one batch
+            with ActionPlan("launch") as plan:
+                plan.move(x, y).double_click()
             
-            # Verify Notepad launched
-            return self.verify_notepad_launched()
+            # Verify Notepad launched (waits for the window-created event)
+            return self.verify_notepad_launched(timeout=config.NOTEPAD_LAUNCH_TIMEOUT, existing=existing)
             
         except Exception as e:
             print(f"Error launching Notepad: {e}")
             return False
     
-    def verify_notepad_launched(self, timeout: float = 5.0) -> bool:
+    def verify_notepad_launched(self, timeout: float = 5.0, existing=()) -> bool:
         """
         Verify that Notepad window is open.
         
+        A window not in existing sets launch_observed. If none appears, a
+        Notepad window that was already open is still used (the launch may
+        have opened a tab in it), but the launch does not count as observed.
+        
         Args:
             timeout: Maximum time to wait for window
+            existing: Ids of the Notepad windows open before the launch
             
         Returns:
             True if Notepad window found, False otherwise
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                if gw:
-                    windows = gw.getWindowsWithTitle("Notepad")
-                    if windows:
-                        self.notepad_window = windows[0]
-                        # Activate the window
-                        self.notepad_window.activate()
-                        time.sleep(0.3)
-                        return True
-                else:
-                    # Fallback: just wait and assume it launched
-                    time.sleep(1.0)
-                    return True
-            except Exception as e:
-                print(f"Error checking for Notepad window: {e}")
-            
-            time.sleep(0.2)
+        tracker = self.window_tracker
+        if tracker is None:
+            # Fallback: just wait and assume it launched
+            time.sleep(1.0)
+            return True
+        
+        try:
+            window = tracker.wait_for_window(title=config.NOTEPAD_WINDOW_TITLE, timeout=timeout,
+                                             exclude=existing)
+            self.launch_observed = window is not None
+            if window is None and existing:
+                window = tracker.wait_for_window(title=config.NOTEPAD_WINDOW_TITLE, timeout=0)
+        except Exception as e:
+            print(f"Error checking for Notepad window: {e}")
+            return False
+        
+        if window is None:
+            return False
         
-        return False
+        self.notepad_window = window
+        self._ensure_focused()
+        return True
     
     def type_text(self, text: str, delay: float = 0.05):
         """
@@ -89,9 +116,7 @@ class NotepadAutomation:
         """
         try:
             # Ensure Notepad is active
-            if self.notepad_window:
-                self.notepad_window.activate()
-                time.sleep(0.2)
+            self._ensure_focused()
             
             # Type the text
             self.bot.type_text(text, delay=delay)
@@ -110,9 +135,7 @@ class NotepadAutomation:
         """
         try:
             # Ensure Notepad is active
-            if self.notepad_window:
-                self.notepad_window.activate()
-                time.sleep(0.2)
+            self._ensure_focused()
             
             # Press Ctrl+S to open Save dialog
             self.bot.control_a()  # Select all (to ensure we're in the text area)
@@ -140,11 +163,15 @@ class NotepadAutomation:
     def close_notepad(self):
         """Close Notepad window."""
         try:
-            if gw and self.notepad_window:
+            tracker = self.window_tracker
+            if tracker and self.notepad_window:
                 try:
-                    self.notepad_window.close()
-                    time.sleep(0.5)
-                except:
+                    tracker.close(self.notepad_window)
+                    closed = tracker.wait_for_close(self.notepad_window, timeout=config.NOTEPAD_CLOSE_DELAY)
+                except Exception as e:
+                    print(f"Error closing Notepad window: {e}")
+                    closed = False
+                if not closed:
                     # Fallback: use Alt+F4
                     self.bot.alt_f4()
                     time.sleep(0.5)
@@ -152,5 +179,6 @@ class NotepadAutomation:
                 # Fallback: use Alt+F4
                 self.bot.alt_f4()
                 time.sleep(0.5)
+            self.notepad_window = None
         except Exception as e:
             print(f"Error closing Notepad: {e}")
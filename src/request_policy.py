@@ -0,0 +1,244 @@
+"""
+Request policy for the HTTP API: timeouts, retries, hedging, circuit breaker.
+
+An attempt gets short connect/read timeouts. Transient failures (connection
+errors, timeouts, 429 and 5xx responses) are retried with full-jitter
+exponential backoff until the attempts or the total deadline run out. With
+hedging, an attempt that has not answered after the observed p95 latency is
+duplicated and whichever copy answers first wins. A circuit breaker stops
+calling an upstream whose calls failed transiently several times in a row
+(a non-transient failure such as a 404 means the upstream is answering);
+callers serve their last cached response while it is open.
+"""
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, TypeVar
+
+from stage_timer import percentile
+
+T = TypeVar("T")
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+HEDGE_MIN_SAMPLES = 10  # latencies needed before the observed p95 is trusted
+LATENCY_WINDOW = 200  # most recent latencies kept for the p95
+
+
+class RequestPolicy(NamedTuple):
+    """How one logical request is attempted (seconds)."""
+    connect_timeout: float = 2.0
+    read_timeout: float = 3.0
+    max_attempts: int = 4
+    deadline: float = 10.0  # for all attempts and backoff together
+    backoff_base: float = 0.2
+    backoff_max: float = 2.0
+    hedge: bool = True
+    hedge_delay: float = 1.0  # until HEDGE_MIN_SAMPLES latencies are known
+    hedge_min_delay: float = 0.05
+
+
+class RetryableError(Exception):
+    """A failure worth another attempt (e.g. an HTTP 503)."""
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker rejected the call without trying it."""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failed calls; open ->
+    half-open after reset_after seconds, where exactly one trial call is let
+    through (others are rejected while it is in flight); a successful trial
+    closes it again, a failed one re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False  # a half-open trial call is in flight
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half-open"."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (in half-open state, the one trial call)."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "open" or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()  # (re-)open, also after a failed half-open trial
+            self._trial = False
+
+
+class RequestMetrics:
+    """Latency and retry counters of one client (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []  # seconds per successful attempt, most recent last
+        self.counts: Dict[str, int] = dict.fromkeys(
+            ("calls", "attempts", "retries", "hedges", "hedge_wins", "failures", "short_circuits", "cache_served"), 0)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+            del self.latencies[:-LATENCY_WINDOW]
+
+    def p95(self) -> Optional[float]:
+        """Observed p95 attempt latency, None until HEDGE_MIN_SAMPLES are known."""
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            return percentile(self.latencies, 95)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counters plus p50/p95/max attempt latency in milliseconds."""
+        with self._lock:
+            data: Dict[str, float] = dict(self.counts)
+            if self.latencies:
+                data.update(p50_ms=percentile(self.latencies, 50) * 1000,
+                            p95_ms=percentile(self.latencies, 95) * 1000,
+                            max_ms=max(self.latencies) * 1000)
+        return data
+
+    def __str__(self) -> str:
+        data = self.snapshot()
+        text = ", ".join(f"{name} {data[name]}" for name in self.counts if data[name])
+        if "p50_ms" in data:
+            text += f"; latency p50 {data['p50_ms']:.0f} ms, p95 {data['p95_ms']:.0f} ms, max {data['max_ms']:.0f} ms"
+        return text or "no requests"
+
+
+def backoff(attempt: int, policy: RequestPolicy) -> float:
+    """Full-jitter delay before retry number attempt (1-based)."""
+    return random.uniform(0.0, min(policy.backoff_max, policy.backoff_base * 2 ** (attempt - 1)))
+
+
+class PolicyExecutor:
+    """Runs calls under a RequestPolicy, a CircuitBreaker and RequestMetrics."""
+
+    def __init__(self, policy: RequestPolicy = RequestPolicy(),
+                 breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[RequestMetrics] = None):
+        self.policy = policy
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def call(self, send: Callable[[float], T], is_retryable: Callable[[BaseException], bool]) -> T:
+        """
+        Run send(timeout) until it succeeds.
+
+        Args:
+            send: One attempt; gets the read timeout left for it (seconds)
+            is_retryable: Whether a failure is transient
+
+        Raises:
+            CircuitOpenError: The breaker is open, nothing was sent
+            The last attempt's exception once attempts or the deadline run out
+        """
+        policy = self.policy
+        self.metrics.count("calls")
+        if not self.breaker.allow():
+            self.metrics.count("short_circuits")
+            raise CircuitOpenError("circuit open after repeated failures")
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            try:
+                result = self._attempt(send, min(policy.read_timeout, max(remaining, 0.001)))
+            except Exception as e:
+                transient = is_retryable(e)
+                delay = backoff(attempt, policy)
+                if (not transient or attempt >= policy.max_attempts
+                        or time.monotonic() + delay >= deadline):
+                    self.metrics.count("failures")
+                    if transient:
+                        self.breaker.failure()
+                    else:
+                        # The upstream answered (e.g. a 404): not an outage
+                        self.breaker.success()
+                    raise
+                self.metrics.count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.success()
+            return result
+
+    def _attempt(self, send: Callable[[float], T], timeout: float) -> T:
+        """One attempt, hedged with a duplicate after the p95 latency when enabled."""
+        self.metrics.count("attempts")
+        hedge_after = self._hedge_delay()
+        if hedge_after is None or hedge_after >= timeout:
+            return self._timed(send, timeout)
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge")
+        first = self._pool.submit(self._timed, send, timeout)
+        done, _ = wait([first], timeout=hedge_after)
+        if done:
+            return first.result()
+        self.metrics.count("hedges")
+        second = self._pool.submit(self._timed, send, timeout - hedge_after)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self.metrics.count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _timed(self, send: Callable[[float], T], timeout: float) -> T:
+        started = time.perf_counter()
+        result = send(timeout)
+        self.metrics.latency(time.perf_counter() - started)
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which an attempt is duplicated, None without hedging."""
+        if not self.policy.hedge:
+            return None
+        p95 = self.metrics.p95()
+        return max(self.policy.hedge_min_delay, p95 if p95 is not None else self.policy.hedge_delay)
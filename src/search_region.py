@@ -0,0 +1,145 @@
+"""
+Where on the screen icons are searched.
+
+The search area is config.ICON_SEARCH_REGION clipped to the desktop work
+area (the screen minus the taskbar), and is captured on its own where the
+capture backend supports regions. Visible application windows inside it are
+masked out: their pixels are replaced by a flat value in the gray plane, so
+no edge, variance, template or keypoint evidence is found there. Window
+rectangles come from the window manager through a WindowTracker.
+"""
+import os
+import sys
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+Rect = Tuple[int, int, int, int]  # (left, top, width, height) in screen pixels
+
+DWMWA_CLOAKED = 14  # DwmGetWindowAttribute: nonzero if DWM does not draw the window
+
+_x_display = None  # X connection kept open for work_area()
+
+
+class ScanStats(NamedTuple):
+    """Pixels looked at by one capture."""
+    captured: int  # pixels in the captured frame
+    masked: int  # pixels covered by windows
+
+    @property
+    def scanned(self) -> int:
+        """Pixels left to search."""
+        return self.captured - self.masked
+
+    def __str__(self) -> str:
+        return f"{self.scanned:,} of {self.captured:,} px scanned ({self.masked:,} masked)"
+
+
+def intersect(a: Optional[Rect], b: Optional[Rect]) -> Optional[Rect]:
+    """Intersection of two rects; None stands for "unbounded"."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    return (left, top, max(0, right - left), max(0, bottom - top))
+
+
+def work_area() -> Optional[Rect]:
+    """
+    Desktop area not covered by the taskbar/panels, None if unknown.
+
+    Cheap enough to query on every capture (the taskbar can be moved or
+    the resolution changed at any time): one system call on Windows, one
+    round trip over a kept connection on X11.
+    """
+    global _x_display
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            rect = wintypes.RECT()
+            if ctypes.windll.user32.SystemParametersInfoW(0x0030, 0, ctypes.byref(rect), 0):  # SPI_GETWORKAREA
+                return (rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top)
+        except Exception:
+            pass
+        return None
+
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            from Xlib import X, display
+
+            if _x_display is None:
+                _x_display = display.Display()
+            root = _x_display.screen().root
+            value = root.get_full_property(_x_display.intern_atom("_NET_WORKAREA"), X.AnyPropertyType)
+            if value is not None and len(value.value) >= 4:
+                return tuple(int(v) for v in value.value[:4])
+        except Exception:
+            _x_display = None  # reconnect on the next call
+    return None
+
+
+def cloaked(window_id: int) -> bool:
+    """
+    Whether DWM hides a window that still has a rectangle (suspended UWP
+    apps, windows on other virtual desktops). Always False off Windows.
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        value = wintypes.DWORD()
+        result = ctypes.windll.dwmapi.DwmGetWindowAttribute(
+            wintypes.HWND(window_id), DWMWA_CLOAKED, ctypes.byref(value), ctypes.sizeof(value))
+        return result == 0 and value.value != 0
+    except Exception:
+        return False
+
+
+def window_rects(windows: Iterable, ignore_titles: Iterable[str] = (),
+                 bounds: Optional[Rect] = None) -> List[Rect]:
+    """
+    Rectangles of visible windows (WindowInfo), skipping ignored titles,
+    cloaked windows and windows entirely outside bounds (e.g. minimized
+    windows parked at -32000, -32000 on Windows).
+    """
+    ignored = {title.lower() for title in ignore_titles}
+    rects = []
+    for window in windows:
+        rect = window.rect
+        if rect is None or rect[2] <= 0 or rect[3] <= 0 or window.title.lower() in ignored:
+            continue
+        if bounds is not None:
+            overlap = intersect(rect, bounds)
+            if overlap[2] == 0 or overlap[3] == 0:
+                continue
+        if cloaked(window.window_id):
+            continue
+        rects.append(rect)
+    return rects
+
+
+def window_mask(shape: Tuple[int, int], origin: Tuple[int, int], rects: Iterable[Rect]) -> Optional[np.ndarray]:
+    """
+    Boolean mask (True = covered by a window) of a frame captured at origin.
+
+    Returns:
+        The mask, or None if no window overlaps the frame
+    """
+    height, width = shape
+    mask = None
+    for left, top, rect_width, rect_height in rects:
+        x0, y0 = max(0, left - origin[0]), max(0, top - origin[1])
+        x1 = min(width, left - origin[0] + rect_width)
+        y1 = min(height, top - origin[1] + rect_height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        if mask is None:
+            mask = np.zeros((height, width), dtype=bool)
+        mask[y0:y1, x0:x1] = True
+    return mask
@@ -0,0 +1,146 @@
+"""
+Recording of grounding sessions for offline replay.
+
+Every captured frame is written as a PNG (lossless, so replays see exactly
+the production pixels) and described by one line of index.jsonl holding the
+strategies that ran on it, their results and timings, and the final result,
+plus what the replay needs to take the same path: the screen origin of the
+captured area, the scheduler statistics the strategy order was derived
+from and the remaining budget. Other IconGrounding state (wallpaper and
+grid models, the position cache, harvested templates) is not recorded, so
+replays are approximate where it matters. replay_grounding.py re-runs any
+IconGrounding version on a recording and diffs positions and latencies.
+
+Layout:
+    <directory>/index.jsonl
+    <directory>/frames/000001.png
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+INDEX_NAME = "index.jsonl"
+FRAMES_DIR = "frames"
+PNG_COMPRESSION = 1  # fast, frames are still ~5x smaller than raw
+
+
+class StrategyResult(NamedTuple):
+    """One strategy run on a recorded frame."""
+    name: str
+    position: Optional[Tuple[int, int]]
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+class FrameRecord(NamedTuple):
+    """One line of index.jsonl."""
+    frame: str  # PNG path relative to the recording directory
+    timestamp: float
+    attempt: int
+    strategies: List[StrategyResult]
+    result: Optional[Tuple[int, int]]
+    elapsed_ms: float
+    origin: Tuple[int, int] = (0, 0)  # screen position of the frame's top-left pixel
+    stats: Optional[Dict[str, Tuple[int, int, float]]] = None  # scheduler (runs, hits, seconds) before grounding
+    budget: Optional[float] = None  # seconds left for grounding, None without a deadline
+
+    def to_json(self) -> str:
+        data = self._asdict()
+        data["strategies"] = [s._asdict() for s in self.strategies]
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, line: str) -> "FrameRecord":
+        data = json.loads(line)
+        strategies = [StrategyResult(s["name"], _position(s["position"]), s["elapsed_ms"], s.get("error"))
+                      for s in data["strategies"]]
+        stats = data.get("stats")
+        if stats is not None:
+            stats = {name: (int(s[0]), int(s[1]), float(s[2])) for name, s in stats.items()}
+        return cls(data["frame"], data["timestamp"], data["attempt"], strategies,
+                   _position(data["result"]), data["elapsed_ms"], tuple(data.get("origin", (0, 0))),
+                   stats, data.get("budget"))
+
+
+def _position(value) -> Optional[Tuple[int, int]]:
+    return (int(value[0]), int(value[1])) if value else None
+
+
+class SessionRecorder:
+    """
+    Appends frames and strategy results to a recording directory.
+
+    Usage per capture: begin(frame, attempt), strategy(...) for every
+    strategy run, end(result).
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._frames_dir = self.directory / FRAMES_DIR
+        self._frames_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.directory / INDEX_NAME
+        self._count = sum(1 for _ in self._frames_dir.glob("*.png"))
+        self._current = None
+
+    def begin(self, frame: np.ndarray, attempt: int = 0, origin: Tuple[int, int] = (0, 0),
+              stats: Optional[Dict[str, Sequence]] = None, budget: Optional[float] = None):
+        """
+        Store a captured frame; following strategy() calls refer to it.
+
+        Args:
+            frame: BGR frame as grounded (the captured search area)
+            attempt: Retry attempt of the call
+            origin: Screen position of the frame's top-left pixel
+            stats: Scheduler statistics (name -> (runs, hits, seconds))
+                the strategy order of this frame is derived from
+            budget: Seconds left for grounding the frame (None: no deadline)
+        """
+        self._count += 1
+        name = f"{self._count:06d}.png"
+        cv2.imwrite(str(self._frames_dir / name), frame, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION])
+        self._current = {"frame": f"{FRAMES_DIR}/{name}", "timestamp": time.time(),
+                         "attempt": attempt, "strategies": [], "started": time.perf_counter(),
+                         "origin": (int(origin[0]), int(origin[1])), "budget": budget,
+                         "stats": ({name: [int(s[0]), int(s[1]), float(s[2])] for name, s in stats.items()}
+                                   if stats is not None else None)}
+
+    def strategy(self, name: str, position: Optional[Tuple[int, int]], elapsed: float,
+                 error: Optional[BaseException] = None):
+        """Record one strategy result (elapsed in seconds)."""
+        if self._current is None:
+            return
+        self._current["strategies"].append(StrategyResult(
+            name, _position(position), round(elapsed * 1000.0, 3),
+            f"{type(error).__name__}: {error}" if error is not None else None))
+
+    def end(self, result: Optional[Tuple[int, int]]):
+        """Finish the current frame and append it to the index."""
+        if self._current is None:
+            return
+        current, self._current = self._current, None
+        record = FrameRecord(current["frame"], current["timestamp"], current["attempt"],
+                             current["strategies"], _position(result),
+                             round((time.perf_counter() - current["started"]) * 1000.0, 3),
+                             current["origin"], current["stats"], current["budget"])
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.write(record.to_json() + "\n")
+
+
+def read_recording(directory: Union[str, Path]) -> Iterator[FrameRecord]:
+    """Records of a recording directory, in capture order."""
+    with open(Path(directory) / INDEX_NAME, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield FrameRecord.from_json(line)
+
+
+def load_frame(directory: Union[str, Path], record: FrameRecord) -> np.ndarray:
+    """BGR frame of a record."""
+    frame = cv2.imread(str(Path(directory) / record.frame), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise FileNotFoundError(f"Recorded frame missing: {record.frame}")
+    return frame
@@ -0,0 +1,142 @@
+"""
+Per-stage timing of the automation loop.
+
+Every stage of every post (fetch, capture, ground, launch, type, save,
+confirm, close) is recorded as a span. At the end of a run the spans are
+summarised per stage (count, p50, p95, max) and exported as JSONL (one span
+per line) and in Chrome trace-event format, which chrome://tracing or
+https://ui.perfetto.dev show as a timeline. With sample_rss the resident
+set size after every stage is recorded too and exported as an "rss"
+counter track next to the spans.
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+from memory_monitor import rss_bytes
+
+
+class Span(NamedTuple):
+    """One timed stage."""
+    stage: str
+    post: Optional[int]  # post id, None for run-level stages
+    start: float  # seconds since the run started
+    duration: float  # seconds
+    error: Optional[str] = None
+    rss: Optional[int] = None  # bytes after the stage, with sample_rss
+
+
+class StageSummary(NamedTuple):
+    """Run-level statistics of one stage (seconds)."""
+    stage: str
+    count: int
+    p50: float
+    p95: float
+    max: float
+    max_rss: Optional[int] = None  # bytes, highest RSS after the stage
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageTimer:
+    """Records stage spans for one run."""
+
+    def __init__(self, sample_rss: bool = False):
+        """
+        Args:
+            sample_rss: Record the process RSS after every stage
+        """
+        self.sample_rss = sample_rss
+        self.spans: List[Span] = []
+        self.started_at = time.time()  # wall clock, for file names and trace metadata
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, post: Optional[int] = None) -> Iterator[None]:
+        """Time the enclosed block as a stage; exceptions are recorded and re-raised."""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            self.spans.append(Span(name, post, started - self._origin, duration, error,
+                                   rss_bytes() if self.sample_rss else None))
+
+    def summary(self) -> List[StageSummary]:
+        """Per-stage statistics, in first-seen stage order."""
+        durations: Dict[str, List[float]] = {}
+        rss: Dict[str, List[int]] = {}
+        for span in self.spans:
+            durations.setdefault(span.stage, []).append(span.duration)
+            if span.rss is not None:
+                rss.setdefault(span.stage, []).append(span.rss)
+        return [StageSummary(stage, len(values), percentile(values, 50), percentile(values, 95), max(values),
+                             max(rss[stage]) if stage in rss else None)
+                for stage, values in durations.items()]
+
+    def format_summary(self) -> str:
+        """Summary table (milliseconds)."""
+        summary = self.summary()
+        with_rss = any(s.max_rss is not None for s in summary)
+        lines = [f"{'stage':10s} {'count':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s}"
+                 + (f" {'max RSS MB':>10s}" if with_rss else "")]
+        for s in summary:
+            line = f"{s.stage:10s} {s.count:5d} {s.p50 * 1000:9.1f} {s.p95 * 1000:9.1f} {s.max * 1000:9.1f}"
+            if with_rss:
+                line += f" {s.max_rss / 2**20:10.1f}" if s.max_rss is not None else f" {'-':>10s}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write_jsonl(self, path: Union[str, Path]):
+        """One JSON object per span (times in milliseconds)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps({"stage": span.stage, "post": span.post,
+                                    "start_ms": round(span.start * 1000, 3),
+                                    "duration_ms": round(span.duration * 1000, 3),
+                                    "error": span.error,
+                                    "rss_mb": None if span.rss is None else round(span.rss / 2**20, 2)}) + "\n")
+
+    def write_chrome_trace(self, path: Union[str, Path]):
+        """Chrome trace-event JSON: one complete ("X") event per span."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": tid,
+                   "args": {"name": "desktop automation"}}]
+        for span in self.spans:
+            args = {"post": span.post}
+            if span.error:
+                args["error"] = span.error
+            events.append({"name": span.stage, "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round(span.start * 1e6), "dur": round(span.duration * 1e6),
+                           "args": args})
+            if span.rss is not None:
+                events.append({"name": "rss", "ph": "C", "pid": pid, "tid": tid,
+                               "ts": round((span.start + span.duration) * 1e6),
+                               "args": {"MB": round(span.rss / 2**20, 2)}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"started_at": self.started_at}}, f)
+
+    def export(self, directory: Union[str, Path]) -> List[Path]:
+        """Write <run>.jsonl and <run>.trace.json into directory; returns the paths."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        run = time.strftime("run_%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        jsonl, trace = directory / f"{run}.jsonl", directory / f"{run}.trace.json"
+        self.write_jsonl(jsonl)
+        self.write_chrome_trace(trace)
+        return [jsonl, trace]
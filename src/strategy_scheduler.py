@@ -0,0 +1,137 @@
+"""
+Adaptive ordering of grounding strategies.
+
+find_notepad_icon tries strategies one after another until one returns a
+position, so the expected time to a result is smallest when strategies are
+tried in increasing order of cost / success probability. The scheduler
+keeps per-strategy run counts, hits and total latency (persisted as JSON
+across runs) and orders strategies by that ratio, using an optimistic (UCB)
+success estimate so that rarely tried strategies still get explored.
+Strategies that never ran go first (in their default order), so every
+strategy is measured at least once.
+
+Deadline-bounded (anytime) grounding instead needs the cheapest strategies
+first and an estimate of what each costs: cheapest_first() orders by
+measured mean latency, falling back to a prior for strategies that never
+ran, and also keeps the fallback strategies last.
+"""
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+EXPLORATION = 0.5  # weight of the UCB bonus on the success estimate
+STATS_VERSION = 1
+
+
+class StrategyStats(NamedTuple):
+    """Accumulated results of one strategy."""
+    runs: int = 0
+    hits: int = 0
+    seconds: float = 0.0  # total latency
+
+    @property
+    def mean_cost(self) -> float:
+        return self.seconds / self.runs if self.runs else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Laplace-smoothed success probability (0.5 without data)."""
+        return (self.hits + 1.0) / (self.runs + 2.0)
+
+
+class StrategyScheduler:
+    """Orders strategies by expected time-to-success and learns from every run."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 stats: Optional[Dict[str, StrategyStats]] = None):
+        """
+        Args:
+            path: JSON file the statistics are loaded from and saved to
+                (None keeps them in memory)
+            stats: Initial statistics (default: loaded from path)
+        """
+        self.path = Path(path) if path is not None else None
+        self.stats: Dict[str, StrategyStats] = stats if stats is not None else self._load()
+
+    def _load(self) -> Dict[str, StrategyStats]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATS_VERSION:
+                return {}
+            return {name: StrategyStats(int(s["runs"]), int(s["hits"]), float(s["seconds"]))
+                    for name, s in data["strategies"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable strategy statistics ({e})")
+            return {}
+
+    def save(self):
+        """Write the statistics (atomically) to the stats file."""
+        if self.path is None:
+            return
+        data = {"version": STATS_VERSION,
+                "strategies": {name: s._asdict() for name, s in self.stats.items()}}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Could not save strategy statistics: {e}")
+
+    def record(self, name: str, hit: bool, seconds: float):
+        """Add one strategy run."""
+        s = self.stats.get(name, StrategyStats())
+        self.stats[name] = StrategyStats(s.runs + 1, s.hits + int(hit), s.seconds + seconds)
+
+    def expected_cost(self, name: str, total_runs: int) -> float:
+        """Latency per success, with an optimistic success estimate (0 if never run)."""
+        s = self.stats.get(name, StrategyStats())
+        bonus = EXPLORATION * math.sqrt(math.log(total_runs + 1.0) / (s.runs + 1.0))
+        return s.mean_cost / min(1.0, s.hit_rate + bonus)
+
+    def estimated_latency(self, name: str, prior: float) -> float:
+        """Mean measured latency of a strategy (seconds), prior if it never ran."""
+        s = self.stats.get(name, StrategyStats())
+        return s.mean_cost if s.runs else prior
+
+    def cheapest_first(self, names: Sequence[str], priors: Dict[str, float],
+                       default_prior: float, last: Iterable[str] = ()) -> List[str]:
+        """
+        Strategy names by estimated latency (priors for the unmeasured
+        ones), cheapest first, followed by the last (fallback) strategies
+        in their default order.
+        """
+        last = set(last)
+        ranked = sorted((name for name in names if name not in last),
+                        key=lambda name: self.estimated_latency(name, priors.get(name, default_prior)))
+        return ranked + [name for name in names if name in last]
+
+    def order(self, names: Sequence[str], fixed: Optional[Iterable[str]] = None,
+              last: Iterable[str] = ()) -> List[str]:
+        """
+        Order strategy names.
+
+        Args:
+            names: Available strategies in their default order
+            fixed: Forced order; only these strategies run, in this order
+            last: Fallback strategies that always run after the others, in
+                their default order (e.g. ones that return any icon)
+
+        Returns:
+            Strategy names to try, first to last
+        """
+        if fixed is not None:
+            available = set(names)
+            return [name for name in fixed if name in available]
+        last = set(last)
+        adaptive = [name for name in names if name not in last]
+        total_runs = sum(self.stats.get(name, StrategyStats()).runs for name in adaptive)
+        # sorted() is stable: ties (e.g. strategies that never ran) keep the default order
+        adaptive = sorted(adaptive, key=lambda name: self.expected_cost(name, total_runs))
+        return adaptive + [name for name in names if name in last]
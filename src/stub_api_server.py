@@ -0,0 +1,121 @@
+"""
+Local stand-in for the JSONPlaceholder API with programmable delays and faults.
+
+Serves /posts and /posts/<id> from 127.0.0.1 on a free port. Every request
+is answered according to a Fault: a delay, an HTTP status, or a dropped
+connection. Faults come from a queue (one per request, in arrival order)
+and fall back to a callable of the request number, so tests and benchmarks
+can script outages, slow tails and flaky responses:
+
+    with StubAPIServer() as server:
+        server.program(Fault(status=503), Fault(delay=2.0))
+        APIClient(server.url).fetch_posts()
+"""
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class Fault(NamedTuple):
+    """How the stub answers one request."""
+    delay: float = 0.0  # seconds before answering
+    status: int = 200
+    drop: bool = False  # close the connection without a response
+
+
+def sample_posts(count: int = 100) -> List[Dict]:
+    """Posts shaped like JSONPlaceholder's."""
+    return [{"userId": i // 10 + 1, "id": i, "title": f"post {i}", "body": f"body of post {i}"}
+            for i in range(1, count + 1)]
+
+
+class StubAPIServer:
+    """JSONPlaceholder stub running on a background thread."""
+
+    def __init__(self, posts: Optional[List[Dict]] = None,
+                 fault_for: Callable[[int], Fault] = lambda n: Fault()):
+        """
+        Args:
+            posts: Posts to serve (default: sample_posts())
+            fault_for: Fault of request number n (0-based) when the queue is empty
+        """
+        self.posts = posts if posts is not None else sample_posts()
+        self.fault_for = fault_for
+        self.requests = 0  # requests received
+        self._faults = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def program(self, *faults: Fault):
+        """Queue faults for the next requests, in order."""
+        with self._lock:
+            self._faults.extend(faults)
+
+    def _next_fault(self) -> Fault:
+        with self._lock:
+            number = self.requests
+            self.requests += 1
+            return self._faults.popleft() if self._faults else self.fault_for(number)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fault = stub._next_fault()
+                if fault.delay:
+                    threading.Event().wait(fault.delay)
+                if fault.drop:
+                    self.close_connection = True
+                    return
+                body, status = stub._route(self.path)
+                if fault.status != 200:
+                    body, status = {"error": "injected fault"}, fault.status
+                payload = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # the client gave up (timeout or lost hedge)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _route(self, path: str):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if parts == ["posts"]:
+            return self.posts, 200
+        if len(parts) == 2 and parts[0] == "posts" and parts[1].isdigit():
+            post = next((p for p in self.posts if p["id"] == int(parts[1])), None)
+            if post is not None:
+                return post, 200
+        return {}, 404
+
+    def start(self) -> "StubAPIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,213 @@
+"""
+Synthetic desktop frames for benchmarks and offline training.
+
+Renders a wallpaper with desktop icons laid out on a regular grid, each with
+a text label below it, and returns the ground truth positions. The Notepad
+icon is taken from the captured template in resources/icons, the other icons
+are procedurally drawn distractors.
+"""
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+
+# Windows 10 desktop grid at 100% scaling with medium icons
+GRID_ORIGIN = (2, 2)
+GRID_CELL = (76, 100)
+ICON_SIZE = 48
+
+# Rows of the captured template that contain the icon (the rest is the label)
+_TEMPLATE_ICON_ROWS = 56
+
+DISTRACTOR_LABELS = [
+    "Recycle Bin", "This PC", "Chrome", "Documents", "Paint", "Calculator",
+    "Notes", "Spotify", "Steam", "Word", "Excel", "Terminal", "Photos",
+    "Network", "Downloads", "Zoom", "Teams", "VLC", "Notepad++", "Settings",
+]
+
+
+class IconPlacement(NamedTuple):
+    """Ground truth for one rendered icon."""
+    label: str
+    center: Tuple[int, int]
+    bbox: Tuple[int, int, int, int]  # (x, y, w, h) of the icon image
+    label_bbox: Tuple[int, int, int, int]  # (x, y, w, h) of the label text
+
+
+_notepad_icon = None
+
+
+def notepad_icon_image() -> np.ndarray:
+    """The Notepad icon (BGRA) cut out of the captured template."""
+    global _notepad_icon
+    if _notepad_icon is None:
+        template = cv2.imread(str(config.NOTEPAD_ICON_TEMPLATE))
+        if template is None:
+            raise FileNotFoundError(f"Template not found: {config.NOTEPAD_ICON_TEMPLATE}")
+        icon = template[:_TEMPLATE_ICON_ROWS]
+        # The template was captured on a dark wallpaper: treat pixels close
+        # to the corner colour as transparent
+        background = icon[0, 0].astype(np.int16)
+        distance = np.abs(icon.astype(np.int16) - background).sum(axis=2)
+        alpha = np.where(distance > 60, 255, 0).astype(np.uint8)
+        _notepad_icon = np.dstack([icon, alpha])
+    return _notepad_icon
+
+
+def label_font(size: int = 12):
+    """Font used for icon labels."""
+    for name in ("segoeui.ttf", "DejaVuSans.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _wallpaper(width: int, height: int, rng: np.random.Generator, style: str) -> np.ndarray:
+    if style == "flat":
+        color = rng.integers(20, 120, size=3)
+        return np.full((height, width, 3), color, dtype=np.uint8)
+
+    # Dark blue diagonal gradient with a little low-frequency texture
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    t = (xx / width + yy / height) / 2.0
+    base = np.array([90, 40, 10], dtype=np.float32)  # BGR
+    top = np.array([200, 120, 40], dtype=np.float32)
+    frame = base + (top - base) * t[..., None]
+    if style == "textured":
+        noise = rng.normal(0, 1, size=(height // 16 + 1, width // 16 + 1)).astype(np.float32)
+        noise = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+        frame += noise[..., None] * 12.0
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def _distractor_icon(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Procedural BGRA icon: coloured tile, disc or document shape."""
+    icon = np.zeros((size, size, 4), dtype=np.uint8)
+    color = tuple(int(c) for c in rng.integers(30, 255, size=3))
+    accent = tuple(int(c) for c in rng.integers(0, 255, size=3))
+    kind = rng.integers(0, 3)
+    pad = size // 8
+    if kind == 0:
+        cv2.rectangle(icon, (pad, pad), (size - pad, size - pad), color + (255,), -1)
+        cv2.circle(icon, (size // 2, size // 2), size // 5, accent + (255,), -1)
+    elif kind == 1:
+        cv2.circle(icon, (size // 2, size // 2), size // 2 - pad, color + (255,), -1)
+        cv2.rectangle(icon, (size // 3, size // 3), (2 * size // 3, 2 * size // 3), accent + (255,), -1)
+    else:
+        cv2.rectangle(icon, (pad * 2, pad), (size - pad * 2, size - pad), (235, 235, 235, 255), -1)
+        cv2.rectangle(icon, (pad * 2, pad), (size - pad * 2, pad * 2), color + (255,), -1)
+        for row in range(pad * 3, size - pad * 2, max(3, size // 10)):
+            cv2.line(icon, (pad * 3, row), (size - pad * 3, row), accent + (255,), 1)
+    return icon
+
+
+def _paste(frame: np.ndarray, icon: np.ndarray, x: int, y: int):
+    h, w = icon.shape[:2]
+    region = frame[y:y + h, x:x + w]
+    alpha = icon[:region.shape[0], :region.shape[1], 3:4].astype(np.float32) / 255.0
+    rgb = icon[:region.shape[0], :region.shape[1], :3].astype(np.float32)
+    region[:] = (rgb * alpha + region.astype(np.float32) * (1.0 - alpha)).astype(np.uint8)
+
+
+def _draw_labels(frame: np.ndarray, labels: List[Tuple[str, int, int]], font) -> List[Tuple[int, int, int, int]]:
+    """Draw centred white labels with a dark shadow; returns their boxes."""
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(image)
+    boxes = []
+    for text, center_x, top in labels:
+        left, upper, right, lower = draw.textbbox((0, 0), text, font=font)
+        width, height = right - left, lower - upper
+        x = center_x - width // 2 - left
+        y = top - upper
+        draw.text((x + 1, y + 1), text, font=font, fill=(0, 0, 0))
+        draw.text((x, y), text, font=font, fill=(255, 255, 255))
+        boxes.append((center_x - width // 2, top, width + 1, height + 1))
+    frame[:] = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+    return boxes
+
+
+def render_desktop(width: int = 1920, height: int = 1080, n_icons: int = 12,
+                   seed: int = 0, include_notepad: bool = True,
+                   wallpaper: str = "gradient",
+                   icon_size: int = ICON_SIZE,
+                   grid_origin: Tuple[int, int] = GRID_ORIGIN,
+                   grid_cell: Tuple[int, int] = GRID_CELL,
+                   distractor_labels: Optional[List[str]] = None,
+                   notepad_scale: float = 1.0,
+                   wallpaper_seed: Optional[int] = None) -> Tuple[np.ndarray, List[IconPlacement]]:
+    """
+    Render a synthetic desktop.
+
+    Icons are placed in random cells of a regular grid, like a Windows desktop
+    with auto-arrange turned off.
+
+    Args:
+        width: Frame width in pixels
+        height: Frame height in pixels
+        n_icons: Total number of icons (including Notepad)
+        seed: Random seed, the same seed gives the same frame
+        include_notepad: Whether one of the icons is the Notepad icon
+        wallpaper: "gradient", "textured" or "flat"
+        icon_size: Size of the distractor icons
+        grid_origin: (x, y) of the first grid cell
+        grid_cell: (width, height) of a grid cell
+        distractor_labels: Label pool for distractor icons
+        notepad_scale: Scale factor for the Notepad icon
+        wallpaper_seed: Seed of the wallpaper texture (default: drawn from
+            seed), so different layouts can share one wallpaper
+
+    Returns:
+        (BGR frame, list of IconPlacement)
+    """
+    rng = np.random.default_rng(seed)
+    wallpaper_rng = rng if wallpaper_seed is None else np.random.default_rng(wallpaper_seed)
+    frame = _wallpaper(width, height, wallpaper_rng, wallpaper)
+    labels_pool = distractor_labels or DISTRACTOR_LABELS
+
+    cols = (width - grid_origin[0]) // grid_cell[0]
+    rows = (height - grid_origin[1]) // grid_cell[1]
+    n_icons = min(n_icons, cols * rows)
+    cells = rng.choice(cols * rows, size=n_icons, replace=False)
+    notepad_index = int(rng.integers(0, n_icons)) if include_notepad and n_icons else -1
+
+    placements = []
+    pending_labels = []
+    for i, cell in enumerate(cells):
+        col, row = int(cell) // rows, int(cell) % rows
+        cell_x = grid_origin[0] + col * grid_cell[0]
+        cell_y = grid_origin[1] + row * grid_cell[1]
+
+        if i == notepad_index:
+            icon = notepad_icon_image()
+            if notepad_scale != 1.0:
+                icon = cv2.resize(icon, None, fx=notepad_scale, fy=notepad_scale,
+                                  interpolation=cv2.INTER_AREA if notepad_scale < 1 else cv2.INTER_LINEAR)
+            label = "Notepad"
+        else:
+            icon = _distractor_icon(icon_size, rng)
+            label = str(labels_pool[int(rng.integers(0, len(labels_pool)))])
+
+        h, w = icon.shape[:2]
+        x = cell_x + (grid_cell[0] - w) // 2
+        y = cell_y + 4
+        _paste(frame, icon, x, y)
+        placements.append((label, (x + w // 2, y + h // 2), (x, y, w, h)))
+        pending_labels.append((label, cell_x + grid_cell[0] // 2, y + h + 4))
+
+    label_boxes = _draw_labels(frame, pending_labels, label_font())
+    truth = [IconPlacement(label, center, bbox, label_box)
+             for (label, center, bbox), label_box in zip(placements, label_boxes)]
+    return frame, truth
+
+
+def save_desktop(path: Path, **kwargs) -> List[IconPlacement]:
+    """Render a desktop and write it to an image file."""
+    frame, truth = render_desktop(**kwargs)
+    cv2.imwrite(str(path), frame)
+    return truth
@@ -0,0 +1,194 @@
+"""
+Icon templates harvested from confirmed detections.
+
+When a heuristic strategy finds the Notepad icon and double-clicking it
+really launches Notepad, a tight crop of the icon is stored here, so later
+frames can use plain template matching (milliseconds) instead of the
+heuristic strategies. Templates are keyed by screen resolution and DPI,
+since both change how the icon is rendered. A template that misses several
+times in a row (new theme, icon replaced) is evicted and harvested again.
+
+Layout:
+    <directory>/index.json
+    <directory>/notepad_1920x1080_96dpi.png
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+INDEX_NAME = "index.json"
+DEFAULT_DPI = 96
+CROP_PADDING = 2  # px kept around the icon's edge bounding box
+
+
+def screen_dpi() -> int:
+    """Logical DPI of the primary screen (DEFAULT_DPI if unknown)."""
+    if sys.platform == "win32":
+        try:
+            import ctypes
+
+            dpi = ctypes.windll.user32.GetDpiForSystem()  # Windows 10+
+            if dpi:
+                return int(dpi)
+        except Exception:
+            pass
+    elif sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            from Xlib import display
+
+            connection = display.Display()
+            try:
+                screen = connection.screen()
+                if screen.width_in_mms:
+                    return int(round(screen.width_in_pixels * 25.4 / screen.width_in_mms))
+            finally:
+                connection.close()
+        except Exception:
+            pass
+    return DEFAULT_DPI
+
+
+def screen_key(resolution: Tuple[int, int], dpi: int) -> str:
+    """Cache key of a screen configuration, e.g. "1920x1080_96dpi"."""
+    return f"{resolution[0]}x{resolution[1]}_{dpi}dpi"
+
+
+def tight_crop(frame: np.ndarray, center: Tuple[int, int], size: int) -> Optional[np.ndarray]:
+    """
+    Crop of the icon at center: a size x size window shrunk to the bounding
+    box of its edges (plus CROP_PADDING), so little background is kept.
+
+    Returns:
+        Copy of the crop, or None if the window holds no edges
+    """
+    height, width = frame.shape[:2]
+    half = size // 2
+    x0, y0 = max(0, center[0] - half), max(0, center[1] - half)
+    x1, y1 = min(width, center[0] + half), min(height, center[1] + half)
+    window = frame[y0:y1, x0:x1]
+    if window.size == 0:
+        return None
+    gray = cv2.cvtColor(window, cv2.COLOR_BGR2GRAY) if window.ndim == 3 else window
+    points = cv2.findNonZero(cv2.Canny(gray, 50, 150))
+    if points is None:
+        return None
+    x, y, w, h = cv2.boundingRect(points)
+    left, top = max(0, x - CROP_PADDING), max(0, y - CROP_PADDING)
+    right, bottom = min(window.shape[1], x + w + CROP_PADDING), min(window.shape[0], y + h + CROP_PADDING)
+    return window[top:bottom, left:right].copy()
+
+
+class TemplateCache:
+    """Harvested templates with hit/miss bookkeeping."""
+
+    def __init__(self, directory: Union[str, Path], max_misses: int = 3):
+        """
+        Args:
+            directory: Where templates and index.json are stored
+            max_misses: Consecutive misses after which a template is evicted
+        """
+        self.directory = Path(directory)
+        self.max_misses = max_misses
+        self._index_path = self.directory / INDEX_NAME
+        self._index: Dict[str, dict] = self._load_index()
+        self._templates: Dict[str, np.ndarray] = {}  # gray templates by entry name
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = self._index_path.with_suffix(".tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, indent=1)
+            os.replace(temporary, self._index_path)
+        except OSError as e:
+            print(f"Could not save template cache index: {e}")
+
+    @staticmethod
+    def _entry(name: str, key: str) -> str:
+        return f"{name}_{key}"
+
+    def has(self, name: str, key: str) -> bool:
+        """Whether a template for this icon and screen configuration exists."""
+        entry = self._index.get(self._entry(name, key))
+        return entry is not None and (self.directory / entry["file"]).exists()
+
+    def path(self, name: str, key: str) -> Optional[Path]:
+        """File of the template for this icon and screen configuration, if any."""
+        if not self.has(name, key):
+            return None
+        return self.directory / self._index[self._entry(name, key)]["file"]
+
+    def load(self, name: str, key: str) -> Optional[np.ndarray]:
+        """Gray template, read from disk once."""
+        entry_name = self._entry(name, key)
+        template = self._templates.get(entry_name)
+        path = self.path(name, key) if template is None else None
+        if path is not None:
+            template = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if template is not None:
+                self._templates[entry_name] = template
+        return template
+
+    def store(self, name: str, key: str, crop: np.ndarray, source: str):
+        """Save a harvested crop (BGR) as the template for this configuration."""
+        entry_name = self._entry(name, key)
+        file_name = f"{entry_name}.png"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not cv2.imwrite(str(self.directory / file_name), crop):
+                raise OSError(f"cv2.imwrite failed for {file_name}")
+        except OSError as e:
+            print(f"Could not store harvested template: {e}")
+            return
+        self._index[entry_name] = {"file": file_name, "source": source, "created": time.time(),
+                                   "size": [int(crop.shape[1]), int(crop.shape[0])],
+                                   "hits": 0, "misses": 0}
+        self._templates.pop(entry_name, None)
+        self._save_index()
+
+    def record(self, name: str, key: str, hit: bool) -> bool:
+        """
+        Count a hit (resets the miss streak) or a miss of a template.
+
+        Returns:
+            True if the template was evicted by this miss
+        """
+        entry_name = self._entry(name, key)
+        entry = self._index.get(entry_name)
+        if entry is None:
+            return False
+        if hit:
+            entry["hits"] += 1
+            entry["misses"] = 0
+        else:
+            entry["misses"] += 1
+            if entry["misses"] >= self.max_misses:
+                self.evict(name, key)
+                return True
+        self._save_index()
+        return False
+
+    def evict(self, name: str, key: str):
+        """Delete a template."""
+        entry_name = self._entry(name, key)
+        entry = self._index.pop(entry_name, None)
+        self._templates.pop(entry_name, None)
+        if entry is not None:
+            try:
+                (self.directory / entry["file"]).unlink()
+            except OSError:
+                pass
+            self._save_index()
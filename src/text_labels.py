@@ -0,0 +1,159 @@
+"""
+Text labels of a frame, detected once and joined to icon candidates.
+
+Desktop icon labels are short lines of high-contrast glyphs. A
+morphological gradient turns every glyph stroke (light text on dark
+shadow or the reverse) into a thick edge, a horizontal closing merges the
+glyphs of a line into one blob and the outer contours of all blobs are
+traced in one pass (cv2.findContours is several times faster than
+connectedComponentsWithStats on a mostly empty 1080p mask). Blobs that are
+text-sized and wider than tall are kept as labels.
+
+LabelIndex keeps the labels sorted by their top edge, so the label below
+every icon candidate is found with two searchsorted calls and one
+vectorized join over the labels in each candidate's band, instead of a
+fixed-offset box measured per candidate.
+"""
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+# One row per text label, in frame coordinates
+LABEL_DTYPE = np.dtype([
+    ("x", np.int32),
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("area", np.int32),  # area enclosed by the blob's outer contour
+])
+
+TEXT_CONTRAST = 60  # minimum gradient of a glyph stroke
+GLYPH_GAP = 7  # px; wider gaps between glyphs split a line into several labels
+MIN_TEXT_HEIGHT = 6  # px
+MAX_TEXT_HEIGHT = 40  # px
+MIN_TEXT_ASPECT = 1.2  # width / height
+MIN_TEXT_FILL = 0.3  # contour area / box area
+LABEL_PADDING = 2  # px added around a label box for measuring and OCR
+
+# Association: the label's top edge lies between LABEL_OVERLAP * size above
+# and LABEL_MAX_GAP * size below the icon's bottom edge, and its centre is
+# within LABEL_CENTER_TOLERANCE * size of the icon's centre column
+LABEL_OVERLAP = 0.25
+LABEL_MAX_GAP = 1.0
+LABEL_CENTER_TOLERANCE = 0.5
+
+
+def empty_labels() -> np.ndarray:
+    """An empty label array."""
+    return np.zeros(0, dtype=LABEL_DTYPE)
+
+
+def detect_labels(gray: np.ndarray) -> np.ndarray:
+    """
+    All text-like regions of a grayscale frame.
+
+    Returns:
+        Structured label array (x, y, w, h, area)
+    """
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, binary = cv2.threshold(gradient, TEXT_CONTRAST, 255, cv2.THRESH_BINARY)
+    closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE,
+                              cv2.getStructuringElement(cv2.MORPH_RECT, (GLYPH_GAP, 1)))
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return empty_labels()
+    boxes = np.array([cv2.boundingRect(contour) for contour in contours], dtype=np.int32).reshape(-1, 4)
+    x, y, w, h = boxes.T
+    keep = np.flatnonzero((h >= MIN_TEXT_HEIGHT) & (h <= MAX_TEXT_HEIGHT) & (w >= h * MIN_TEXT_ASPECT))
+    area = np.array([cv2.contourArea(contours[i]) for i in keep], dtype=np.int32)
+    filled = area >= w[keep] * h[keep] * MIN_TEXT_FILL
+    keep, area = keep[filled], area[filled]
+
+    labels = np.zeros(len(keep), dtype=LABEL_DTYPE)
+    for column, name in enumerate(("x", "y", "w", "h")):
+        labels[name] = boxes[keep, column]
+    labels["area"] = area
+    return labels
+
+
+class LabelIndex:
+    """Labels of one frame sorted by top edge, for joins with icon candidates."""
+
+    def __init__(self, labels: np.ndarray, frame_shape: Tuple[int, int]):
+        self.labels = labels[np.argsort(labels["y"], kind="stable")]
+        self.frame_shape = tuple(frame_shape[:2])
+        self._tops = self.labels["y"].astype(np.int64)
+
+    @classmethod
+    def detect(cls, gray: np.ndarray) -> "LabelIndex":
+        """Index of the labels detected on a grayscale frame."""
+        return cls(detect_labels(gray), gray.shape)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def below(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        The label directly below every icon candidate.
+
+        Only labels whose top edge falls in the candidate's band below the
+        icon are compared (a contiguous slice of the sorted index); the
+        closest one to the icon's bottom centre wins.
+
+        Args:
+            centers: (N, 2) icon centres
+            sizes: (N,) icon sizes
+
+        Returns:
+            (N,) row in self.labels, -1 where no label qualifies
+        """
+        count = len(centers)
+        found = np.full(count, -1, dtype=np.int64)
+        if not count or not len(self.labels):
+            return found
+        x = centers[:, 0].astype(np.int64)
+        bottom = centers[:, 1].astype(np.int64) + sizes.astype(np.int64) // 2
+        sizes = sizes.astype(np.float64)
+        start = np.searchsorted(self._tops, bottom - sizes * LABEL_OVERLAP, side="left")
+        stop = np.searchsorted(self._tops, bottom + sizes * LABEL_MAX_GAP, side="right")
+        band = int((stop - start).max())
+        if band <= 0:
+            return found
+
+        # (N, band) join of each candidate with the labels of its band
+        rows = start[:, None] + np.arange(band)
+        in_band = rows < stop[:, None]
+        rows = np.minimum(rows, len(self.labels) - 1)
+        labels = self.labels[rows]
+        offset = np.abs(labels["x"] + labels["w"] // 2 - x[:, None])
+        gap = np.abs(labels["y"] - bottom[:, None])
+        valid = in_band & (offset <= sizes[:, None] * LABEL_CENTER_TOLERANCE)
+        cost = np.where(valid, gap + offset, np.inf)
+        best = np.argmin(cost, axis=1)
+        hit = np.isfinite(cost[np.arange(count), best])
+        found[hit] = rows[hit, best[hit]]
+        return found
+
+    def boxes_below(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Padded label box below every icon candidate, clipped to the frame.
+
+        Returns:
+            (N, 4) int64 array of (x, y, width, height); zero-sized where a
+            candidate has no label
+        """
+        boxes = np.zeros((len(centers), 4), dtype=np.int64)
+        found = self.below(centers, sizes)
+        hit = found >= 0
+        if not hit.any():
+            return boxes
+        labels = self.labels[found[hit]]
+        height, width = self.frame_shape
+        x0 = np.maximum(0, labels["x"].astype(np.int64) - LABEL_PADDING)
+        y0 = np.maximum(0, labels["y"].astype(np.int64) - LABEL_PADDING)
+        x1 = np.minimum(width, labels["x"].astype(np.int64) + labels["w"] + LABEL_PADDING)
+        y1 = np.minimum(height, labels["y"].astype(np.int64) + labels["h"] + LABEL_PADDING)
+        boxes[hit] = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+        return boxes
@@ -0,0 +1,528 @@
+"""
+Event-driven window tracking.
+
+Keeps an indexed cache of top-level windows (by id, title and PID) that is
+updated from window manager events instead of polling in a sleep loop:
+
+- On Linux, X11 property/substructure events on the root window trigger a
+  refresh (create, destroy, title change, focus change). This works on any
+  X server, including a headless Xvfb.
+- Elsewhere (or if python-xlib is missing), pygetwindow is polled in a
+  background thread as a fallback.
+
+Callers can block until a window appears, and activation is skipped when the
+window is already focused.
+"""
+import os
+import select
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class WindowInfo(NamedTuple):
+    """Snapshot of a top-level window."""
+    window_id: int
+    title: str
+    pid: Optional[int]
+    rect: Optional[Tuple[int, int, int, int]]  # (left, top, width, height), None if not on screen
+
+
+# Event names passed to subscribers
+WINDOW_CREATED = "created"
+WINDOW_DESTROYED = "destroyed"
+WINDOW_TITLE_CHANGED = "title_changed"
+WINDOW_FOCUS_CHANGED = "focus_changed"
+
+
+class PollingWindowSource:
+    """Window source that polls pygetwindow (Windows/macOS fallback)."""
+
+    event_driven = False
+
+    def __init__(self, gw_module, interval: float = 0.1):
+        self.gw = gw_module
+        self.interval = interval
+        self._handles = {}
+
+    def _window_id(self, window) -> int:
+        """
+        The native handle (pygetwindow keeps it in _hWnd on Windows and
+        macOS), else the identity of the window object: the source holds
+        on to the objects of the last poll, so the id is not reused while
+        the backend returns the same object. Never the title, which
+        changes (e.g. on save) and is shared by several windows.
+        """
+        handle = getattr(window, "_hWnd", None)
+        if handle:
+            return int(handle)
+        return id(window)
+
+    def _window_pid(self, window) -> Optional[int]:
+        try:
+            import win32process
+            return win32process.GetWindowThreadProcessId(window._hWnd)[1]
+        except Exception:
+            return None
+
+    def snapshot(self) -> Tuple[List[WindowInfo], Optional[int]]:
+        """Return all visible windows and the id of the active one."""
+        windows = []
+        handles = {}
+        for window in self.gw.getAllWindows():
+            title = window.title or ""
+            if not title:
+                continue
+            pid = self._window_pid(window)
+            window_id = self._window_id(window)
+            handles[window_id] = window
+            if getattr(window, "isMinimized", False):
+                rect = None
+            else:
+                rect = (window.left, window.top, window.width, window.height)
+            windows.append(WindowInfo(window_id, title, pid, rect))
+        self._handles = handles
+
+        active = self.gw.getActiveWindow()
+        active_id = self._window_id(active) if active is not None else None
+        return windows, active_id
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """Polling has no change notification, just wait one interval."""
+        time.sleep(min(timeout, self.interval))
+        return True
+
+    def activate(self, window_id: int):
+        window = self._handles.get(window_id)
+        if window is not None:
+            window.activate()
+
+    def close(self, window_id: int):
+        window = self._handles.get(window_id)
+        if window is not None:
+            window.close()
+
+    def shutdown(self):
+        self._handles = {}
+
+
+class X11WindowSource:
+    """Window source driven by X11 property and substructure events."""
+
+    event_driven = True
+
+    def __init__(self, display_name: Optional[str] = None):
+        from Xlib import X, display
+
+        self.X = X
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self._lock = threading.RLock()
+        self._watched = set()
+        self._atoms = {}
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask | X.SubstructureNotifyMask)
+        self.display.flush()
+
+    def _atom(self, name: str) -> int:
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self.display.intern_atom(name)
+            self._atoms[name] = atom
+        return atom
+
+    def _property(self, window, name: str, prop_type=None):
+        try:
+            prop = window.get_full_property(self._atom(name), prop_type or self.X.AnyPropertyType)
+        except Exception:
+            return None
+        return prop.value if prop is not None else None
+
+    def _client_ids(self) -> List[int]:
+        ids = self._property(self.root, "_NET_CLIENT_LIST")
+        if ids is not None:
+            return [int(wid) for wid in ids]
+        # No EWMH window manager: fall back to the root's children
+        return [child.id for child in self.root.query_tree().children]
+
+    def _title(self, window) -> str:
+        name = self._property(window, "_NET_WM_NAME", self._atom("UTF8_STRING"))
+        if name is None:
+            name = self._property(window, "WM_NAME")
+        if isinstance(name, bytes):
+            name = name.decode("utf-8", "replace")
+        return name or ""
+
+    def _hidden(self, window) -> bool:
+        """Minimized windows and desktop (wallpaper) windows are not on screen."""
+        state = self._property(window, "_NET_WM_STATE")
+        if state is not None and self._atom("_NET_WM_STATE_HIDDEN") in state:
+            return True
+        window_type = self._property(window, "_NET_WM_WINDOW_TYPE")
+        return window_type is not None and self._atom("_NET_WM_WINDOW_TYPE_DESKTOP") in window_type
+
+    def _window_info(self, window_id: int) -> Optional[WindowInfo]:
+        window = self.display.create_resource_object("window", window_id)
+        title = self._title(window)
+        if not title:
+            return None
+
+        pid_value = self._property(window, "_NET_WM_PID")
+        pid = int(pid_value[0]) if pid_value is not None and len(pid_value) else None
+
+        rect = None
+        if not self._hidden(window):
+            try:
+                geometry = window.get_geometry()
+                origin = self.root.translate_coords(window, 0, 0)
+                rect = (origin.x, origin.y, geometry.width, geometry.height)
+            except Exception:
+                pass
+
+        if window_id not in self._watched:
+            # Title changes are property events on the client window itself
+            try:
+                window.change_attributes(event_mask=self.X.PropertyChangeMask)
+                self._watched.add(window_id)
+            except Exception:
+                pass
+
+        return WindowInfo(window_id, title, pid, rect)
+
+    def snapshot(self) -> Tuple[List[WindowInfo], Optional[int]]:
+        """Return all titled client windows and the id of the active one."""
+        with self._lock:
+            windows = []
+            client_ids = self._client_ids()
+            for window_id in client_ids:
+                info = self._window_info(window_id)
+                if info is not None:
+                    windows.append(info)
+            self._watched.intersection_update(client_ids)
+
+            active = self._property(self.root, "_NET_ACTIVE_WINDOW")
+            active_id = int(active[0]) if active is not None and len(active) and active[0] else None
+            return windows, active_id
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """
+        Block until X events arrive or the timeout expires.
+
+        Returns:
+            True if any event was received (and drained)
+        """
+        with self._lock:
+            pending = self.display.pending_events()
+        if not pending:
+            readable, _, _ = select.select([self.display.fileno()], [], [], timeout)
+            if not readable:
+                return False
+        with self._lock:
+            received = False
+            while self.display.pending_events():
+                self.display.next_event()
+                received = True
+            return received
+
+    def _send_client_message(self, window_id: int, message: str, data: List[int]):
+        from Xlib.protocol import event
+
+        with self._lock:
+            window = self.display.create_resource_object("window", window_id)
+            message_event = event.ClientMessage(
+                window=window,
+                client_type=self._atom(message),
+                data=(32, data + [0] * (5 - len(data)))
+            )
+            self.root.send_event(
+                message_event,
+                event_mask=self.X.SubstructureRedirectMask | self.X.SubstructureNotifyMask
+            )
+            self.display.flush()
+
+    def activate(self, window_id: int):
+        # Source indication 2 = pager/automation, honoured by focus-stealing prevention
+        self._send_client_message(window_id, "_NET_ACTIVE_WINDOW", [2, self.X.CurrentTime])
+
+    def close(self, window_id: int):
+        self._send_client_message(window_id, "_NET_CLOSE_WINDOW", [self.X.CurrentTime, 2])
+
+    def shutdown(self):
+        with self._lock:
+            try:
+                self.display.close()
+            except Exception:
+                pass
+
+
+def create_default_source(poll_interval: float = 0.1):
+    """
+    Pick the best available window source for this platform.
+
+    Returns:
+        An X11 source on Linux with a display, a pygetwindow polling source
+        elsewhere, or None if neither is available
+    """
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            return X11WindowSource()
+        except Exception as e:
+            print(f"X11 window events unavailable ({e}), falling back to polling")
+
+    try:
+        import pygetwindow
+        return PollingWindowSource(pygetwindow, interval=poll_interval)
+    except (ImportError, NotImplementedError):
+        return None
+
+
+class WindowTracker:
+    """
+    Indexed cache of top-level windows kept current by a background thread.
+
+    The cache is indexed by window id, exact title and PID. Subscribers are
+    called with (event, WindowInfo) for create, destroy, title-change and
+    focus-change events.
+    """
+
+    # Safety-net refresh interval for event-driven sources, in case an
+    # event is missed (e.g. a window manager without EWMH support)
+    EVENT_RESYNC_INTERVAL = 1.0
+
+    def __init__(self, source, poll_interval: float = 0.1):
+        """
+        Args:
+            source: Window source (X11WindowSource, PollingWindowSource or
+                any object with snapshot/wait_for_change/activate/close)
+            poll_interval: Refresh interval for polling sources
+        """
+        self.source = source
+        self.poll_interval = poll_interval
+
+        self._windows: Dict[int, WindowInfo] = {}
+        self._by_title: Dict[str, Set[int]] = {}
+        self._by_pid: Dict[int, Set[int]] = {}
+        self._active_id: Optional[int] = None
+
+        self._cond = threading.Condition()
+        self._listeners: List[Callable[[str, WindowInfo], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def create_default(cls, poll_interval: float = 0.1) -> Optional["WindowTracker"]:
+        """Create a tracker with the platform's default source (None if unsupported)."""
+        source = create_default_source(poll_interval)
+        if source is None:
+            return None
+        return cls(source, poll_interval=poll_interval)
+
+    # Lifecycle
+
+    def start(self):
+        """Populate the cache and start listening for window events."""
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="WindowTracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and release the source."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.source.shutdown()
+
+    def _run(self):
+        if getattr(self.source, "event_driven", False):
+            interval = self.EVENT_RESYNC_INTERVAL
+        else:
+            interval = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                self.source.wait_for_change(interval)
+                self.refresh()
+            except Exception as e:
+                print(f"Window tracker error: {e}")
+                time.sleep(self.poll_interval)
+
+    def subscribe(self, callback: Callable[[str, WindowInfo], None]):
+        """Register a callback(event, window) for window events."""
+        self._listeners.append(callback)
+
+    # Cache maintenance
+
+    def refresh(self):
+        """Take a snapshot from the source and apply the differences to the cache."""
+        windows, active_id = self.source.snapshot()
+        events = []
+
+        with self._cond:
+            current = {w.window_id: w for w in windows}
+            for window_id, old in self._windows.items():
+                if window_id not in current:
+                    events.append((WINDOW_DESTROYED, old))
+            for window_id, new in current.items():
+                old = self._windows.get(window_id)
+                if old is None:
+                    events.append((WINDOW_CREATED, new))
+                elif old.title != new.title:
+                    events.append((WINDOW_TITLE_CHANGED, new))
+            if active_id != self._active_id and active_id in current:
+                events.append((WINDOW_FOCUS_CHANGED, current[active_id]))
+
+            self._windows = current
+            self._active_id = active_id
+            self._by_title = {}
+            self._by_pid = {}
+            for window in windows:
+                self._by_title.setdefault(window.title, set()).add(window.window_id)
+                if window.pid is not None:
+                    self._by_pid.setdefault(window.pid, set()).add(window.window_id)
+
+            if events:
+                self._cond.notify_all()
+
+        for event, window in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event, window)
+                except Exception as e:
+                    print(f"Window tracker listener failed: {e}")
+
+    # Queries
+
+    def windows(self) -> List[WindowInfo]:
+        """All cached windows."""
+        with self._cond:
+            return list(self._windows.values())
+
+    def find(self, title: Optional[str] = None, pid: Optional[int] = None,
+             exact: bool = False) -> List[WindowInfo]:
+        """
+        Find cached windows by title and/or PID.
+
+        Args:
+            title: Title to look for (case-insensitive substring unless exact)
+            pid: Owning process id
+            exact: Require an exact title match (uses the title index)
+
+        Returns:
+            Matching windows
+        """
+        with self._cond:
+            ids = set(self._windows)
+            if pid is not None:
+                ids &= self._by_pid.get(pid, set())
+            if title is not None:
+                if exact:
+                    ids &= self._by_title.get(title, set())
+                else:
+                    needle = title.lower()
+                    matching = set()
+                    for window_title, title_ids in self._by_title.items():
+                        if needle in window_title.lower():
+                            matching |= title_ids
+                    ids &= matching
+            return [self._windows[i] for i in ids]
+
+    def active_window(self) -> Optional[WindowInfo]:
+        """The currently focused window, if it is tracked."""
+        with self._cond:
+            return self._windows.get(self._active_id)
+
+    def is_focused(self, window: WindowInfo) -> bool:
+        """Check whether the window currently has focus."""
+        with self._cond:
+            return self._active_id == window.window_id
+
+    def wait_for_window(self, title: Optional[str] = None, pid: Optional[int] = None,
+                        timeout: float = 5.0, exclude: Iterable[int] = ()) -> Optional[WindowInfo]:
+        """
+        Block until a matching window exists.
+
+        Args:
+            title: Title substring to wait for
+            pid: Owning process id to wait for
+            timeout: Maximum time to wait in seconds
+            exclude: Window ids that do not count (e.g. windows that
+                existed before a launch, to wait for a new one)
+
+        Returns:
+            The matching window, or None on timeout
+        """
+        exclude = set(exclude)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._thread is None:
+                # Not started: refresh inline instead of waiting on events
+                self.refresh()
+            with self._cond:
+                matches = [w for w in self.find(title=title, pid=pid) if w.window_id not in exclude]
+                if matches:
+                    return matches[0]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._thread is not None:
+                    self._cond.wait(remaining)
+                    continue
+            time.sleep(min(self.poll_interval, remaining))
+
+    def wait_for_close(self, window: WindowInfo, timeout: float = 5.0) -> bool:
+        """Block until the window is gone. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._thread is None:
+                self.refresh()
+            with self._cond:
+                if window.window_id not in self._windows:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if self._thread is not None:
+                    self._cond.wait(remaining)
+                    continue
+            time.sleep(min(self.poll_interval, remaining))
+
+    # Actions
+
+    def activate(self, window: WindowInfo, timeout: float = 1.0) -> bool:
+        """
+        Focus a window, skipping the round trip if it already has focus.
+
+        Args:
+            window: Window to focus
+            timeout: Maximum time to wait for the focus change
+
+        Returns:
+            True if an activation was actually sent
+        """
+        if self.is_focused(window):
+            return False
+
+        self.source.activate(window.window_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._thread is None:
+                self.refresh()
+            with self._cond:
+                if self._active_id == window.window_id:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._thread is not None:
+                    self._cond.wait(remaining)
+                    continue
+            time.sleep(min(self.poll_interval, remaining))
+        return True
+
+    def close(self, window: WindowInfo):
+        """Ask the window manager to close a window."""
+        self.source.close(window.window_id)
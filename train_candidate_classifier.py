@@ -0,0 +1,160 @@
+"""
+Train the Notepad candidate classifier on synthetic desktops.
+
+Renders labelled desktops (different wallpapers, icon counts and Notepad
+icon scales), collects icon candidates with the same pipeline the bot uses,
+labels a candidate positive when it lies on the planted Notepad icon and
+fits the HOG + logistic model in candidate_classifier. Held-out frames are
+then used to compare the classifier with the hand-tuned rules of
+_find_notepad_by_characteristics, and scoring time for 1000 candidates is
+reported. The model is written to config.CANDIDATE_MODEL_PATH.
+
+Usage:
+    python train_candidate_classifier.py [--train-frames 60] [--test-frames 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import cv2
+import numpy as np
+
+import config
+from candidate_classifier import (CONTEXT, CROP_SIZE, CandidateClassifier,
+                                  batch_features, sample_crops, train_logistic)
+from icon_grounding import IconGrounding
+from synthetic_desktop import render_desktop
+
+WALLPAPERS = ["gradient", "textured", "flat"]
+NOTEPAD_SCALES = [0.75, 1.0, 1.25]
+POSITIVE_RADIUS = 12  # px from the Notepad centre to count as a hit
+JITTER_SAMPLES = 8  # extra jittered positives per frame
+
+
+def render_frames(count, seed_offset, width, height):
+    """Labelled frames: (gray, notepad centre, notepad size)."""
+    frames = []
+    for i in range(count):
+        seed = seed_offset + i
+        rng = np.random.default_rng(seed)
+        frame, truth = render_desktop(
+            width, height, n_icons=int(rng.integers(8, 30)), seed=seed,
+            wallpaper=WALLPAPERS[seed % len(WALLPAPERS)],
+            notepad_scale=NOTEPAD_SCALES[(seed // len(WALLPAPERS)) % len(NOTEPAD_SCALES)])
+        notepad = next(icon for icon in truth if icon.label == "Notepad")
+        size = max(notepad.bbox[2], notepad.bbox[3])
+        frames.append((cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), notepad.center, size))
+    return frames
+
+
+def frame_candidates(grounding, gray):
+    """(N, 3) array of (x, y, size) candidates from the bot's pipeline."""
+    grounding._grid_models.clear()  # every synthetic frame is a new layout
+    candidates = grounding._find_all_icon_candidates(gray)
+    return np.array(candidates, dtype=np.int32).reshape(-1, 3)
+
+
+def is_hit(x, y, center):
+    return np.hypot(x - center[0], y - center[1]) <= POSITIVE_RADIUS
+
+
+def build_dataset(grounding, frames, rng):
+    features, labels = [], []
+    for gray, center, size in frames:
+        candidates = frame_candidates(grounding, gray)
+        # Jittered crops of the planted icon so positives are not limited to
+        # the few candidates the extractor happens to produce on it
+        jitter = np.column_stack([
+            center[0] + rng.integers(-4, 5, JITTER_SAMPLES),
+            center[1] + rng.integers(-4, 5, JITTER_SAMPLES),
+            (size * rng.uniform(0.8, 1.3, JITTER_SAMPLES)).astype(np.int32),
+        ])
+        points = np.vstack([candidates, jitter]) if len(candidates) else jitter
+        crops = sample_crops(gray, points[:, :2], points[:, 2])
+        features.append(batch_features(crops))
+        labels.append(np.hypot(points[:, 0] - center[0], points[:, 1] - center[1]) <= POSITIVE_RADIUS)
+    return np.vstack(features), np.concatenate(labels)
+
+
+def evaluate(grounding, classifier, frames):
+    """Frame-level accuracy of the classifier and the legacy rules."""
+    model_hits = rule_hits = 0
+    for gray, center, _ in frames:
+        candidates = frame_candidates(grounding, gray)
+        if len(candidates) == 0:
+            continue
+        probabilities = classifier.score(gray, candidates[:, :2], candidates[:, 2])
+        best = int(np.argmax(probabilities))
+        if probabilities[best] >= config.CANDIDATE_MIN_PROBABILITY and is_hit(*candidates[best, :2], center):
+            model_hits += 1
+
+        scores = grounding._characteristics_scores(gray, candidates[:, :2], candidates[:, 2])
+        best = int(np.argmax(scores))
+        if scores[best] > 15 and is_hit(*candidates[best, :2], center):
+            rule_hits += 1
+    return model_hits / len(frames), rule_hits / len(frames)
+
+
+def time_scoring(classifier, gray, count=1000, repeats=5):
+    """Median seconds to score `count` candidates, and the matmul alone."""
+    rng = np.random.default_rng(0)
+    centers = np.column_stack([rng.integers(40, gray.shape[1] - 40, count),
+                               rng.integers(40, gray.shape[0] - 40, count)])
+    sizes = rng.integers(32, 96, count)
+    features = batch_features(sample_crops(gray, centers, sizes))
+    totals, matmuls = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        classifier.score(gray, centers, sizes)
+        totals.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        classifier.predict_features(features)
+        matmuls.append(time.perf_counter() - start)
+    return float(np.median(totals)), float(np.median(matmuls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Notepad candidate classifier")
+    parser.add_argument("--train-frames", type=int, default=60)
+    parser.add_argument("--test-frames", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--output", type=Path, default=config.CANDIDATE_MODEL_PATH)
+    args = parser.parse_args()
+
+    grounding = IconGrounding(bot=None)
+    rng = np.random.default_rng(0)
+
+    print(f"Rendering {args.train_frames} training and {args.test_frames} test frames...")
+    train = render_frames(args.train_frames, 0, args.width, args.height)
+    test = render_frames(args.test_frames, 10000, args.width, args.height)
+
+    features, labels = build_dataset(grounding, train, rng)
+    print(f"Training on {len(labels)} samples ({int(labels.sum())} positive, {features.shape[1]} features)")
+    weights, bias, mean, std = train_logistic(features, labels)
+    classifier = CandidateClassifier(weights, bias, mean, std, CROP_SIZE, CONTEXT)
+
+    train_accuracy = np.mean((classifier.predict_features(features) >= 0.5) == labels)
+    model_accuracy, rule_accuracy = evaluate(grounding, classifier, test)
+    total, matmul = time_scoring(classifier, train[0][0])
+
+    print("=" * 60)
+    print(f"Candidate accuracy (train):      {train_accuracy:6.1%}")
+    print(f"Notepad found, classifier (test): {model_accuracy:6.1%}")
+    print(f"Notepad found, legacy rules (test): {rule_accuracy:6.1%}")
+    print(f"Scoring 1000 candidates: {total * 1000:.1f} ms (features + matmul), "
+          f"{matmul * 1000:.3f} ms (matmul)")
+    print("=" * 60)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(str(args.output), weights=weights, bias=np.float32(bias),
+             feature_mean=mean, feature_std=std,
+             crop_size=np.int32(CROP_SIZE), context=np.float32(CONTEXT))
+    print(f"Model saved to {args.output} ({args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()